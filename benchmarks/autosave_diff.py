@@ -0,0 +1,163 @@
+"""
+Check and size report for the `diff` autosave mode.
+
+Runs the note submit scenarios against the local stub in the `full` and in the `diff`
+autosave mode. Per submit it checks that the stub accepted both AutoSaves, that they carry
+the same header, that every field of the `diff` payload is sent with the same value in the
+`full` one, and that the fields it leaves out are exactly those the `full` payload sends
+as they are on the note page, so that the page values and the `diff` fields add up to
+the `full` payload. Prints the `sNameValues` fields and request body bytes per
+mode. Exits non-zero on any difference.
+
+Usage:
+    python benchmarks/autosave_diff.py
+"""
+import asyncio
+import contextlib
+import io
+import json
+import sys
+from urllib.request import urlopen
+
+import fixtures
+from run_benchmarks import _submit_fields, stub_server
+
+from submodule_integrations.oncoemr.oncoemr_integration import AUTOSAVE_MODES, OncoEmrIntegration
+from submodule_integrations.oncoemr.oncoemr_parsing import DEFAULT_HTML_PARSER
+
+# leading `%02` segments of `sNameValues` before the form fields
+HEADER_SEGMENTS = 17
+
+NOTE_PAGE = "/WebForms/PD_DocOncoNoteDB.aspx"
+
+
+async def _submit(integration: OncoEmrIntegration, fields: dict):
+    return [await integration.generic_notes_submit(
+        note_name=fixtures.NOTE_NAME, patient_id=fixtures.PATIENT_ID, fields=fields
+    )]
+
+
+async def _submit_many(integration: OncoEmrIntegration, fields: dict):
+    items = [
+        {"note_name": fixtures.NOTE_NAME, "patient_id": f"{fixtures.PATIENT_ID}{i:02d}", "fields": fields}
+        for i in range(8)
+    ]
+    return await integration.generic_notes_submit_many(items)
+
+
+SCENARIOS = {
+    "generic_notes_submit": _submit,
+    "generic_notes_submit_many": _submit_many,
+}
+
+
+def _split(name_values: str):
+    segments = name_values.split("%02")
+    fields = {}
+    for part in segments[HEADER_SEGMENTS:]:
+        if part:
+            key, _, value = part.partition("%01")
+            fields[key] = value
+    return segments[:HEADER_SEGMENTS], fields
+
+
+def _page_fields(base_url: str) -> dict:
+    """The note page values the stub serves, encoded the way the submit encodes them."""
+    with urlopen(f"{base_url}{NOTE_PAGE}") as response:
+        values = OncoEmrIntegration._extract_form_data_bs(response.read().decode("utf-8"), DEFAULT_HTML_PARSER)
+    if values.get("FD_grdMedicationsGrid"):
+        values["FD_grdMedicationsGrid"] = OncoEmrIntegration._quote_uppercase(
+            values["FD_grdMedicationsGrid"], safe="*()"
+        )
+    fields = {}
+    for key, value in values.items():
+        value = OncoEmrIntegration._encode_spaces_only(value)
+        fields[key] = OncoEmrIntegration._quote_uppercase(value, safe="%*()'").replace("%27", "%22")
+    return fields
+
+
+def _received(base_url: str) -> dict:
+    """The AutoSaves the stub received since the last call, by patient id."""
+    with urlopen(f"{base_url}/__stats") as response:
+        autosaves = json.load(response)["autosaves"]
+    with urlopen(f"{base_url}/__payloads") as response:
+        payloads = json.load(response)
+    with urlopen(f"{base_url}/__reset", data=b"") as response:
+        response.read()
+    return {
+        autosave["patient_id"]: {"bytes": autosave["bytes"], "name_values": name_values}
+        for autosave, name_values in zip(autosaves, payloads)
+    }
+
+
+async def _run(base_url: str, autosave_mode: str, scenario, fields: dict) -> tuple:
+    async with OncoEmrIntegration(
+            domain=base_url.split("://", 1)[1],
+            token="ASP.NET_SessionId=autosave-diff",
+            location_id=fixtures.LOCATION_ID,
+            user_agent="oncoemr-autosave-diff",
+            autosave_mode=autosave_mode,
+    ) as integration:
+        integration.url = base_url
+        await integration._load_state_data()
+        _received(base_url)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await scenario(integration, fields)
+    return results, _received(base_url)
+
+
+def _compare(label: str, full: dict, diff: dict, page_fields: dict) -> list:
+    failures = []
+    full_header, full_fields = _split(full["name_values"])
+    diff_header, diff_fields = _split(diff["name_values"])
+    if full_header != diff_header:
+        failures.append(f"{label}: the diff payload header differs from the full one")
+    for key, value in diff_fields.items():
+        if full_fields.get(key) != value:
+            failures.append(f"{label}: {key} is {value!r} in the diff payload but {full_fields.get(key)!r} in full")
+    for key, value in full_fields.items():
+        if key in diff_fields and page_fields.get(key) == value:
+            failures.append(f"{label}: the diff payload sends unchanged {key}")
+        if key not in diff_fields and page_fields.get(key) != value:
+            failures.append(f"{label}: the diff payload leaves out changed {key}")
+    return failures
+
+
+def main():
+    failures = []
+    rows = []
+    with stub_server(latency_ms=0) as base_url:
+        page_fields = _page_fields(base_url)
+        for name, scenario in SCENARIOS.items():
+            runs = {mode: asyncio.run(_run(base_url, mode, scenario, _submit_fields())) for mode in AUTOSAVE_MODES}
+            for mode, (results, _) in runs.items():
+                if not all(result.get("success") for result in results):
+                    failures.append(f"{name} {mode}: not every submit succeeded: {results}")
+            full, diff = runs["full"][1], runs["diff"][1]
+            if not full or full.keys() != diff.keys():
+                failures.append(f"{name}: the runs saved notes of different patients")
+                continue
+            for patient_id in full:
+                failures.extend(_compare(f"{name} {patient_id}", full[patient_id], diff[patient_id], page_fields))
+            per_submit = {
+                label: (
+                    sum(len(_split(saved["name_values"])[1]) for saved in received.values()) / len(received),
+                    sum(saved["bytes"] for saved in received.values()) / len(received),
+                )
+                for label, received in (("full", full), ("diff", diff))
+            }
+            rows.append((name, per_submit))
+
+    print(f"{'scenario':<28}{'full fields':>12}{'diff fields':>12}{'full bytes':>12}{'diff bytes':>12}")
+    for name, per_submit in rows:
+        (full_fields, full_bytes), (diff_fields, diff_bytes) = per_submit["full"], per_submit["diff"]
+        print(f"{name:<28}{full_fields:>12.0f}{diff_fields:>12.0f}{full_bytes:>12.0f}{diff_bytes:>12.0f}")
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    if failures:
+        sys.exit(1)
+    print("diff payloads send exactly the changed fields of the full payloads")
+
+
+if __name__ == "__main__":
+    main()
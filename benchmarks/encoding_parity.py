@@ -0,0 +1,126 @@
+"""
+Golden check and timing for the `sNameValues` encoder in `oncoemr_encoding`.
+
+Encodes the form values of the fixture note pages, the benchmark submit fields, a set
+of edge cases and seeded random strings with the encoder and with the string pipeline
+`generic_notes_submit` used before it (`_encode_spaces_only`, `urllib.parse.quote`, a
+regex uppercasing the escapes, `%27` to `%22` and the `<br/>` rewrite of the whole
+payload), and compares the results. Then times both on the fixture note page values.
+Exits non-zero on any difference.
+
+Usage:
+    python benchmarks/encoding_parity.py [--seed 0] [--random 20000]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+import urllib.parse
+
+import fixtures
+from run_benchmarks import _submit_fields
+
+from submodule_integrations.oncoemr.oncoemr_encoding import (
+    FIELD_VALUE_SAFE,
+    encode_field_value,
+    encode_name_values,
+    quote_uppercase,
+)
+from submodule_integrations.oncoemr.oncoemr_integration import OncoEmrIntegration
+from submodule_integrations.oncoemr.oncoemr_parsing import DEFAULT_HTML_PARSER
+
+QUOTE_SAFES = ("", "*()", FIELD_VALUE_SAFE)
+
+EDGE_CASES = [
+    "", " ", "+", "a+b c", "%", "%%", "%2b", "%2B", "%ab%cd", "%%ab", "%a", "%g1", "%27", "%2527", "'",
+    '"', "it's", "<br/>", "<br>", "<BR/>", "%3cbr%2f%3e", "%3Cbr%2F%3E", "<br/><br/>", "a\nb\r\n", "\t",
+    "Dose: 5 mg/m² × 2", "naïve café", "日本語", "😀 emoji", "\x00\x7f", "100% (approx.) *", "~_.-",
+    "a%01b%02c", "x" * 1000, "<b>bold</b> & <i>it</i>",
+]
+
+_ALPHABET = list("abcdefABCDEF0123456789%+ '\"<>/br*()~_.-\n&;=?#") + ["é", "²", "日", "😀", " "]
+
+
+def reference_quote_uppercase(text, safe=""):
+    encoded = urllib.parse.quote(text, safe=safe)
+    return re.sub(r"%([a-f0-9]{2})", lambda m: f"%{m.group(1).upper()}", encoded)
+
+
+def reference_name_values(fields: dict) -> str:
+    applied_parts = []
+    for k, v in fields.items():
+        v = OncoEmrIntegration._encode_spaces_only(v)
+        encoded_value = reference_quote_uppercase(v, safe="%*()'")
+        encoded_value = encoded_value.replace("%27", "%22")
+        applied_parts.append(f"{k}%01{encoded_value}")
+    return "%02".join(applied_parts).replace("%3Cbr%2F%3E", "%3Cbr%3E")
+
+
+def page_values() -> dict:
+    values = {}
+    for name, page in (("note_page", fixtures.note_page(fixtures.Scale())), ("quirks", fixtures.quirks_note_page())):
+        for key, value in OncoEmrIntegration._extract_form_data_bs(page, DEFAULT_HTML_PARSER).items():
+            values[f"{name}:{key}"] = value
+    return values
+
+
+def samples(seed: int, count: int) -> list:
+    rng = random.Random(seed)
+    texts = list(EDGE_CASES)
+    texts += list(page_values().values())
+    for fields in _submit_fields().values():
+        texts += [str(value) for value in fields.values()]
+    texts += ["".join(rng.choices(_ALPHABET, k=rng.randint(1, 24))) for _ in range(count)]
+    return texts
+
+
+def check(texts: list) -> list:
+    failures = []
+    for text in texts:
+        for safe in QUOTE_SAFES:
+            expected, actual = reference_quote_uppercase(text, safe), quote_uppercase(text, safe)
+            if expected != actual:
+                failures.append(f"quote_uppercase({text!r}, safe={safe!r}): {expected!r} != {actual!r}")
+        expected, actual = reference_name_values({"FD_x": text}), encode_name_values({"FD_x": text})
+        if expected != actual:
+            failures.append(f"encode_field_value({text!r}): {expected!r} != {encode_field_value(text)!r}")
+    fields = {f"FD_{index}": text for index, text in enumerate(texts)}
+    if reference_name_values(fields) != encode_name_values(fields):
+        failures.append("encode_name_values of all samples differs")
+    return failures
+
+
+def _best_of(function, fields: dict, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(fields)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--random", type=int, default=20000, help="random strings to compare")
+    args = parser.parse_args()
+
+    texts = samples(args.seed, args.random)
+    failures = check(texts)
+    for failure in failures[:50]:
+        print(f"MISMATCH {failure}")
+    if failures:
+        sys.exit(1)
+
+    fields = page_values()
+    reference, encoder = _best_of(reference_name_values, fields), _best_of(encode_name_values, fields)
+    print(f"{len(texts)} strings encode identically")
+    print(
+        f"{len(fields)} note page fields: {reference * 1000:.2f} ms before, {encoder * 1000:.2f} ms with the encoder "
+        f"({reference / encoder:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
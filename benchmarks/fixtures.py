@@ -0,0 +1,452 @@
+"""
+Scrubbed, synthetic OncoEMR fixtures for the offline benchmark stub.
+
+The markup mirrors the structure the integration parses (ids, classes, attributes and
+nesting of the real pages) but every name, id and value is generated. Sizes scale with
+`Scale` so the same fixtures can model a small clinic or a large practice.
+"""
+import html
+import json
+from dataclasses import dataclass
+
+USER_ID = "U_BENCH00001"
+GROUP_ID = "G_BENCH00001"
+LOCATION_ID = "L_BENCH00001"
+PATIENT_ID = "P_BENCH00001"
+NOTE_NAME = "Progress Note"
+NOTE_TEMPLATE_ID = "DO_BENCHPROGRESSNOTE01"
+LATEST_NOTE_ID = "DN_BENCHLATEST0001"
+PHYSICIAN_ID = "U_BENCHMD0000"
+PHYSICIAN_LAST_NAME = "Bench"
+ORDER_NAME = "CBC"
+CPT_CODE = "99214"
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Fixture sizes; the defaults approximate a large practice."""
+
+    note_sections: int = 25
+    textareas_per_section: int = 2
+    checkboxes_per_section: int = 6
+    radios_per_section: int = 4
+    medication_rows: int = 40
+    note_history: int = 500
+    visit_rows: int = 300
+    physicians: int = 60
+    note_types: int = 80
+    search_results: int = 50
+
+
+def field_name(section: int, index: int) -> str:
+    return f"S{section:02d}Q{index:02d}"
+
+
+def checkbox_id(section: int, index: int) -> str:
+    return f"S{section:02d}Opt{index:02d}"
+
+
+def radio_id(section: int, index: int) -> str:
+    return f"S{section:02d}Rdo{index:02d}"
+
+
+def nav_page() -> str:
+    options = json.dumps({"userId": USER_ID, "groupId": GROUP_ID, "siteId": 1})
+    return (
+        "<!DOCTYPE html><html><head><title>OncoEMR</title>"
+        f'<script type="application/json" id="json:piwikOptions">{options}</script>'
+        "</head><body><div id=\"app\"></div></body></html>"
+    )
+
+
+def partial_page_info(patient_id: str) -> dict:
+    return {
+        "HeaderData": {
+            "PatientMrn": f"MRN-{patient_id[-5:]}",
+            "PatientDisplayName": "Doe, Jane",
+            "PatientId": patient_id,
+        },
+        "PageInfo": {"sRequestedPage": "$default$"},
+    }
+
+
+def demographics(patient_id: str) -> dict:
+    return {
+        "patientId": patient_id,
+        "firstName": "Jane",
+        "lastName": "Doe",
+        "middleName": "Q",
+        "preferredName": "",
+        "pronouns": None,
+        "dateOfBirth": "1960-01-01T00:00:00",
+        "gender": "F",
+        "hasMedicare": True,
+        "birthDetails": None,
+        "deceasedDate": None,
+        "preferredLanguageCode": "en",
+        "ethnicityCodes": ["2186-5"],
+        "mothersMaidenName": "",
+        "mrn": f"MRN-{patient_id[-5:]}",
+        "ssn": "***-**-0000",
+        "tribalAffiliation": None,
+        "maritalStatusCode": "M",
+        "isTestPatient": True,
+    }
+
+
+def demographics_page(patient_id: str) -> str:
+    spans = {
+        "lblEmployer": "Acme Corp",
+        "lblOccupation": "Engineer",
+        "lblDoc": f"{PHYSICIAN_LAST_NAME}, Alex",
+        "lblAdvancedDirective": "None on file",
+        "lblIndustry": "Manufacturing",
+        "lblLocation": "Main Clinic",
+        "lblStatus": "Active",
+        "lblBenefitStatus": "Eligible",
+    }
+    rows = "".join(
+        f'<tr><td class="label">{key[3:]}</td><td><span id="{key}">{value}</span></td></tr>'
+        for key, value in spans.items()
+    )
+    filler = "".join(f'<tr><td>Row {i}</td><td><span>value {i}</span></td></tr>' for i in range(200))
+    return f"<html><body><form><table>{rows}{filler}</table></form></body></html>"
+
+
+def physicians(scale: Scale) -> list:
+    result = [
+        {
+            "UserId": PHYSICIAN_ID,
+            "FirstName": "Alex",
+            "LastName": PHYSICIAN_LAST_NAME,
+            "UserName": "abench",
+            "LastNameCommaFirstName": f"{PHYSICIAN_LAST_NAME}, Alex",
+            "UserType": 1,
+            "IsEnabled": True,
+            "IsSuspended": False,
+            "LocationId": LOCATION_ID,
+            "Npi": "0000000000",
+            "Spi": None,
+        }
+    ]
+    for i in range(1, scale.physicians):
+        result.append({
+            **result[0],
+            "UserId": f"U_BENCHMD{i:04d}",
+            "FirstName": f"First{i}",
+            "LastName": f"Last{i}",
+            "UserName": f"user{i}",
+            "LastNameCommaFirstName": f"Last{i}, First{i}",
+        })
+    return result
+
+
+def note_types(scale: Scale) -> dict:
+    options = ['<option value="">-- Select --</option>']
+    options.append(f'<option value="{NOTE_TEMPLATE_ID}">{NOTE_NAME}</option>')
+    for i in range(scale.note_types):
+        options.append(f'<option value="DO_BENCHTYPE{i:06d}">Template Note {i}</option>')
+    return {"Success": True, "Payload": f'<select id="ddlSwitch">{"".join(options)}</select>'}
+
+
+def notes_list_page(scale: Scale) -> str:
+    unsigned = [
+        f'<a class="PDMenu" href="#" onclick=\'editDoc("{LATEST_NOTE_ID}")\'>01/02/2025 {NOTE_NAME}</a><br/>'
+    ]
+    for i in range(9):
+        unsigned.append(
+            f'<a class="PDMenu" href="#" onclick=\'editDoc("DN_BENCHUNSIGNED{i:02d}")\'>'
+            f"12/{i + 1:02d}/2024 Template Note {i}</a><br/>"
+        )
+    history = []
+    for i in range(scale.note_history):
+        history.append(
+            "<tr><td>"
+            f'<a class="PDMenu" href="#" onclick=\'window.openDocumentViewer("{PATIENT_ID}", "DH_BENCHDOC{i:06d}")\'>'
+            f"{(i % 12) + 1:02d}/01/{2024 - i // 12} Template Note {i % 40}</a>"
+            f"</td><td>Signed</td><td>{PHYSICIAN_LAST_NAME}, Alex</td><td>{'x' * 40}</td></tr>"
+        )
+    return (
+        "<html><body><div id=\"pnlTabs\">"
+        f'<div id="pnlEditUnsigned">{"".join(unsigned)}</div>'
+        f'<div id="pnlSigned"><table class="grid">{"".join(history)}</table></div>'
+        "</div></body></html>"
+    )
+
+
+def _question(section: int, index: int, editable: bool) -> str:
+    name = field_name(section, index)
+    if editable:
+        controls = (
+            f'<div id="inlineEditorMount{name}" class="rte"></div>'
+            f'<a id="inlineEditButton{name}" class="text_bar" onclick="editText(\'{name}\')">Edit</a>'
+        )
+    else:
+        controls = f'<div id="labelNoEdit{name}">Read only</div>'
+    return (
+        f"<!-- begin question {name} -->"
+        '<table style="margin-left:10px"><tr><td class="bold_text_bar">'
+        f'<span class="question-name">Question {section}.{index}:</span> '
+        '<a class="text_bar" href="#">Clear</a></td></tr></table>'
+        f'<div id="div{name}"><table><tr><td>{controls}'
+        f'<textarea id="FD_txt{name}" rows="4">Existing history for {name}.&lt;br&gt;'
+        f"Second line with &amp; and quotes ' \".</textarea>"
+        "</td></tr></table></div>"
+    )
+
+
+def _checkboxes(section: int, count: int) -> str:
+    target = field_name(section, 0)
+    parts = []
+    for index in range(count):
+        cid = checkbox_id(section, index)
+        checked = " checked" if index % 3 == 0 else ""
+        parts.append(
+            f'<span><input type="checkbox" id="FD_chk{cid}" prnt="{target}"{checked}/>'
+            f'<label for="FD_chk{cid}">Finding {section}-{index}</label>'
+        )
+        if index % 2 == 0:
+            parts.append(f'<input type="text" id="FD_itb{cid}" value="" oldvalue="noted {index}"/>')
+        parts.append("</span>")
+    return f'<div class="checkbox-list">{"".join(parts)}</div>'
+
+
+def _radios(section: int, count: int) -> str:
+    target = field_name(section, 0)
+    parts = []
+    for index in range(count):
+        rid = radio_id(section, index)
+        checked = " checked" if index == 0 else ""
+        parts.append(
+            f'<input type="radio" id="FD_rdo{rid}" name="FD_rdoS{section:02d}Group" prnt="{target}"{checked}/>'
+            f'<label for="FD_rdo{rid}">Choice {section}-{index}</label>'
+        )
+    return f'<div class="radio-list">{"".join(parts)}</div>'
+
+
+def _medication_grid(rows: int) -> str:
+    header = "<tr><th></th><th>Name</th><th>Dose</th><th>Route</th><th>Start Date</th></tr>"
+    body = []
+    grid_values = []
+    for i in range(rows):
+        checked = " checked" if i % 4 == 0 else ""
+        body.append(
+            f'<tr id="med{i:03d}"><td><input type="Checkbox" id="FD_chkMed{i:03d}"{checked}/></td>'
+            f'<td id="td_{i:03d}_Name">Medication {i} (oral)</td>'
+            f'<td id="td_{i:03d}_Dose">{(i % 9 + 1) * 5} mg</td>'
+            f'<td id="td_{i:03d}_Route">PO</td>'
+            f'<td id="td_{i:03d}_StartDate">01/{(i % 28) + 1:02d}/2024</td></tr>'
+        )
+        grid_values.append(f"Medication {i} (oral)*{(i % 9 + 1) * 5} mg*PO*01/{(i % 28) + 1:02d}/2024")
+    grid_text = html.escape("|".join(grid_values), quote=False)
+    return (
+        f'<table id="tblMedicationsGrid" class="grid">{header}{"".join(body)}</table>'
+        f'<textarea id="FD_grdMedicationsGrid" style="display:none">{grid_text}</textarea>'
+    )
+
+
+def _pain_scale() -> str:
+    rows = "".join(f"<tr><td>{score}</td>\n<td>Pain level {score}</td></tr>" for score in range(11))
+    return (
+        '<table id="tbl_gsGSPaiComparativePainScale">'
+        f"{rows}</table>"
+        '<input type="hidden" id="FD_gsGSPaiComparativePainScale" value="3"/>'
+    )
+
+
+def _ont_script(scale: Scale) -> str:
+    lines = ["var oNT = {};"]
+    for section in range(scale.note_sections):
+        for index in range(scale.checkboxes_per_section):
+            lines.append(
+                f"oNT['{checkbox_id(section, index)}']=\"Patient reports %% (finding {section}-{index})\\u0027s.\";"
+            )
+    lines.append("oNT['GSPaiComparativePainScale']=\"Pain score:\";")
+    return f"<script type=\"text/javascript\">{''.join(lines)}</script>"
+
+
+def note_page(scale: Scale, note_guid: str = "GUID-BENCH-0001") -> str:
+    """A note form with questions, toggles, a medication grid and ONT templates."""
+    sections = []
+    for section in range(scale.note_sections):
+        questions = "".join(
+            _question(section, index, editable=(section + index) % 5 != 4)
+            for index in range(scale.textareas_per_section)
+        )
+        sections.append(
+            f'<h2 class="container-name-header">Section {section} <a href="#">Hide</a></h2>'
+            f'<div id="divOOH_S{section:02d}">{questions}'
+            f"{_checkboxes(section, scale.checkboxes_per_section)}"
+            f"{_radios(section, scale.radios_per_section)}</div>"
+        )
+    scripts = "".join(
+        f'<script type="text/javascript">var cfg{i} = {{"key": "value{i}", "items": [{i}, {i + 1}]}};</script>'
+        for i in range(20)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Note</title>"
+        f"{scripts}{_ont_script(scale)}</head><body><form id=\"frmNote\">"
+        f'<span id="spnPageTitle">{NOTE_NAME}</span>'
+        f'<input type="hidden" id="txtNoteGUID" value="{note_guid}"/>'
+        f'<input type="hidden" id="txtFormID" value="{NOTE_TEMPLATE_ID}"/>'
+        '<input type="hidden" id="txtCategory" value="MD Visit Note"/>'
+        f'{"".join(sections)}'
+        '<h2 class="container-name-header">Medications</h2>'
+        f'<div id="divOOH_Medications">{_medication_grid(scale.medication_rows)}</div>'
+        '<span class="SectionDivider">Pain Clear All</span>'
+        f'<div id="divOOH_Pain">{_pain_scale()}</div>'
+        "</form></body></html>"
+    )
+
+
+def visit_list(scale: Scale) -> dict:
+    header = (
+        '<tr><th id="thTime">Time</th><th id="thPatient">Patient</th><th id="thRoom">Room</th>'
+        '<th id="thProvider">Provider</th><th id="thVisitType">Visit Type</th>'
+        '<th id="thStatus">Status</th><th id="thIns"></th><th>Notes (Internal)</th></tr>'
+    )
+    rows = []
+    for i in range(scale.visit_rows):
+        hour = 8 + (i // 12) % 10
+        minute = (i * 5) % 60
+        rows.append(
+            f'<tr pid="P_BENCH{i:05d}" pnam="Patient{i}, Test" location="{LOCATION_ID}">'
+            f'<td><a class="gts" href="#">{hour:02d}:{minute:02d} AM</a></td>'
+            f'<td><a id="ancp{i:05d}" href="#">Patient{i}, Test <span>MRN-{i:05d}</span></a>'
+            f"<div class=\"age\">{40 + i % 40}y</div></td>"
+            f'<td><a class="room-name" href="#">Room {i % 12}</a> <span>ready</span></td>'
+            f"<td>{PHYSICIAN_LAST_NAME}, Alex</td><td>Follow Up</td>"
+            f"<td>{'Arrived' if i % 3 else 'Scheduled'}</td><td>&nbsp;</td>"
+            f"<td>Note for visit {i} &amp; labs</td></tr>"
+        )
+    return {
+        "sViewHtml": f'<table id="tblPatientVisits" class="visits">{header}{"".join(rows)}</table>',
+        "iCount": scale.visit_rows,
+    }
+
+
+def patient_search(scale: Scale) -> dict:
+    rows = []
+    for i in range(scale.search_results):
+        rows.append(
+            "<tr>"
+            f'<td><a href="#" mrn="MRN-{i:05d}" onclick=\'selectPatient("P_BENCH{i:05d}", 1)\'>Doe{i}, Jane</a></td>'
+            f"<td>01/{(i % 28) + 1:02d}/1960</td><td>MRN-{i:05d}</td>"
+            f"<td>{PHYSICIAN_LAST_NAME}, Alex</td></tr>"
+        )
+    table = (
+        '<table id="tblPatientList"><thead><tr><th>Name</th><th>DOB</th><th>MRN</th><th>MD</th></tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody></table>'
+    )
+    return {"sViewHtml": table}
+
+
+def header_data(patient_id: str) -> dict:
+    return {
+        "PatientId": patient_id,
+        "PrimaryPhysicianId": PHYSICIAN_ID,
+        "SelectedUserLocation": {"LocationId": LOCATION_ID, "Name": "Main Clinic"},
+    }
+
+
+def order_types() -> dict:
+    def order(order_id: str) -> dict:
+        return {
+            "Id": order_id,
+            "Details": [
+                {"title": "Instructions", "value": f"Instructions for {order_id}"},
+                {"title": "CPT Code", "value": "85025"},
+                {"title": "Financial", "value": "Billable"},
+            ],
+            "IsNgsTest": False,
+        }
+
+    return {
+        "orders": {
+            "Tests": [order(ORDER_NAME)] + [order(f"TEST{i:03d}") for i in range(300)],
+            "Activities": [order(f"ACT{i:03d}") for i in range(100)],
+            "Drugs": [order(f"DRUG{i:03d}") for i in range(300)],
+            "Radiology": [order(f"RAD{i:03d}") for i in range(100)],
+        }
+    }
+
+
+def order_sets() -> dict:
+    return {"OrderSets": [{"Id": f"SET{i:03d}", "Name": f"Order Set {i}", "Activities": [], "Tests": [],
+                           "Drugs": [], "Radiology": []} for i in range(50)]}
+
+
+def treatment_plan() -> dict:
+    dates = [f"2025-01-{day:02d}" for day in range(1, 29)]
+    today = dates[-1]
+    components = []
+    for i in range(30):
+        cells = [None] * len(dates)
+        if i == 7:
+            cells[-1] = {"value": f"{PHYSICIAN_LAST_NAME}/MD Visit"}
+        elif i % 5 == 0:
+            cells[-1] = {"value": "*"}
+        components.append({"protCompID": f"PC_BENCH{i:04d}", "name": f"Component {i}", "cells": cells})
+    return {
+        "dates": dates,
+        "today": today,
+        "flowsheets": [
+            {"name": "General", "components": components},
+            {"name": "Chemo", "components": components[:5]},
+        ],
+    }
+
+
+def patient_orders(order_id: str) -> list:
+    return [{
+        "Item1": {
+            "OrderName": "MD Visit",
+            "IcdTenCodesCommaDelimited": "C50.911",
+            "OrderingClinicianUserId": PHYSICIAN_ID,
+            "Priority": "Routine",
+            "Instructions": "",
+            "LocationId": LOCATION_ID,
+            "PlannedDurationMinutes": 30,
+            "Sequence": 1,
+            "ProtocolComponentId": order_id,
+        },
+        "Item2": None,
+    }]
+
+
+def activity_order_dialog() -> str:
+    options = "".join(f'<option value="992{i:02d}">992{i:02d} Office visit</option>' for i in range(10, 16))
+    return (
+        "<html><body><form>"
+        f'<select id="ddlChargeCodes">{options}</select>'
+        '<span id="lblLocation">Main Clinic</span><span id="lblFlowsheet">General</span>'
+        f'<span id="spanOrderingMD">{PHYSICIAN_LAST_NAME}, Alex</span>'
+        '<input id="orderComponentId" value="ROW_BENCH0001"/>'
+        '<input name="txtCPTQty" value="1"/><input id="txtNoteID" value=""/>'
+        '<input id="txtCD" value="C1D1"/><input id="txtKitQty" value="0"/>'
+        '<input id="txtSupplyKit" value=""/>'
+        "</form></body></html>"
+    )
+
+
+def quirks_note_page() -> str:
+    """Markup quirks seen on real note pages that HTML parser backends treat differently."""
+    return (
+        "<html><head><script>oNT['Quirk']=\"It\\u0027s %%\";</script></head><body><FORM>"
+        '<span id="spnPageTitle">Quirks</span><input type="hidden" id="txtNoteGUID" value="GUID-Q"/>'
+        '<TEXTAREA ID="FD_txtRawTags">Line one<BR>Line <b>two</b> &amp; <i>three</i></TEXTAREA>'
+        "<textarea id='FD_txtSingleQuoted'>Escaped &lt;br&gt; stays text<br/>real break</textarea>"
+        '<textarea id=FD_txtUnquoted>  leading and trailing whitespace  </textarea>'
+        '<textarea id="FD_txtEntities">&quot;quoted&quot; &#39;single&#39; &nbsp;&copy; caf&eacute;</textarea>'
+        '<textarea id="FD_txtEmpty"></textarea>'
+        '<textarea id="FD_txtDuplicate">first</textarea><textarea id="FD_txtDuplicate">second</textarea>'
+        '<textarea id="FD_txtAttributes" rows="3" data-x="a>b">attribute with &gt; inside</textarea>'
+        '<INPUT TYPE="Checkbox" ID="FD_chkUpper" CHECKED>'
+        '<input type="checkbox" id="FD_chkUnchecked">'
+        '<input type="RADIO" id="FD_rdoOne" name="FD_rdoGroup" checked="checked"/>'
+        '<input type="text" id="FD_itbText" value="a &amp; b"/>'
+        '<input type="text" id="FD_itbNoValue"/>'
+        '<input id="FD_noType" value="ignored"/>'
+        "<p>unclosed paragraph<div><table><tr><td>cell<td>next cell</table></div>"
+        "</FORM></body></html>"
+    )
@@ -0,0 +1,73 @@
+"""
+Cold-import budget for the OncoEMR integration.
+
+Imports the integration module in fresh interpreters and reports the median wall time,
+plus any heavy dependency that got loaded eagerly. Exits non-zero when the budget is
+exceeded, so it can gate deploys of autoscaled workers.
+
+Usage:
+    python benchmarks/import_budget.py [--budget-ms 400] [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULE = "submodule_integrations.oncoemr.oncoemr_integration"
+
+# modules that must not be executed by a plain import of the integration
+LAZY_MODULES = [
+    "bs4",
+    "fake_useragent",
+    "pydantic",
+    "submodule_integrations.oncoemr.oncoemr_models",
+    "submodule_integrations.oncoemr.consultation_models",
+    "submodule_integrations.oncoemr.oncoemr_mapping",
+    "submodule_integrations.oncoemr.consultation_mappings",
+]
+
+_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import {MODULE}
+elapsed = time.perf_counter() - started
+loaded = [
+    name for name in {LAZY_MODULES!r}
+    if name in sys.modules and type(sys.modules[name]).__name__ != "_LazyModule"
+]
+print(json.dumps({{"ms": elapsed * 1000, "eager": loaded}}))
+"""
+
+
+def measure(runs: int) -> tuple[float, list[str]]:
+    timings = []
+    eager = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE], check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        eager.update(result["eager"])
+    return statistics.median(timings), sorted(eager)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    median_ms, eager = measure(args.runs)
+    print(f"import {MODULE}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    if eager:
+        print(f"eagerly loaded: {', '.join(eager)}")
+
+    if median_ms > args.budget_ms or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Differential check for the HTML parser backends and parse modes.
+
+Extracts form data from the fixture note pages with every backend in `HTML_PARSERS`,
+checks that note pages read against a cached template schema (only the per-patient
+values parsed) give the same snapshot as a full read, then runs the benchmark scenarios
+against the local stub once per backend and once per parse mode in `PARSE_MODES` (thread
+and process pools return plain page snapshots instead of parse trees) and compares the
+return values and the AutoSave payloads the stub received. Exits non-zero on any difference.
+
+Usage:
+    python benchmarks/parser_parity.py
+"""
+import asyncio
+import contextlib
+import io
+import json
+import sys
+from urllib.request import urlopen
+
+import fixtures
+from run_benchmarks import SCENARIOS, stub_server
+
+from submodule_integrations.oncoemr.oncoemr_integration import OncoEmrIntegration
+from submodule_integrations.oncoemr.oncoemr_note_page import NotePage, note_value_strainer, read_note_page
+from submodule_integrations.oncoemr.oncoemr_parsing import (
+    DEFAULT_HTML_PARSER,
+    HTML_PARSERS,
+    PARSE_MODES,
+    ParseExecutor,
+)
+
+PAGES = {
+    "note_page": fixtures.note_page(fixtures.Scale()),
+    "quirks_note_page": fixtures.quirks_note_page(),
+}
+
+
+def _describe_difference(expected, actual, path="") -> str:
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in expected.keys() | actual.keys():
+            if expected.get(key) != actual.get(key):
+                return _describe_difference(expected.get(key), actual.get(key), f"{path}[{key!r}]")
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            if left != right:
+                return _describe_difference(left, right, f"{path}[{index}]")
+    return f"{path or 'value'}: {expected!r} != {actual!r}"
+
+
+def check_form_data(parser: str) -> list:
+    failures = []
+    for name, page in PAGES.items():
+        expected = OncoEmrIntegration._extract_form_data_bs(page, DEFAULT_HTML_PARSER)
+        actual = OncoEmrIntegration._extract_form_data_bs(page, parser)
+        if expected != actual:
+            failures.append(f"{parser} form data of {name}: {_describe_difference(expected, actual)}")
+    return failures
+
+
+def check_note_schema(parser: str) -> list:
+    """Reads every page against the schema compiled from each page and compares with its full read."""
+    failures = []
+    pages = dict(PAGES, other_note_page=fixtures.note_page(fixtures.Scale(), note_guid="GUID-BENCH-0002"))
+    full_reads = {name: NotePage(page, parser).materialize() for name, page in pages.items()}
+    for name, page in pages.items():
+        digest = NotePage(page, parser, parse_only=note_value_strainer()).structure_digest
+        for source, source_read in full_reads.items():
+            if digest != source_read.schema.structure_digest:
+                continue
+            if read_note_page(page, parser, (source_read.schema,)) != full_reads[name]:
+                failures.append(f"{parser} {name} read with the schema of {source} differs from its full read")
+        if digest != full_reads[name].schema.structure_digest:
+            failures.append(f"{parser} {name}: value-strained structure digest differs from the full parse")
+    return failures
+
+
+async def _run_scenarios(base_url: str, parser: str, parse_mode: str = "inline") -> dict:
+    results = {}
+    parse_executor = ParseExecutor(parse_mode)
+    async with OncoEmrIntegration(
+            domain=base_url.split("://", 1)[1],
+            token="ASP.NET_SessionId=parity",
+            location_id=fixtures.LOCATION_ID,
+            user_agent="oncoemr-parity",
+            html_parser=parser,
+            parse_executor=parse_executor,
+    ) as integration:
+        integration.url = base_url
+        await integration._load_state_data()
+        for name, scenario in SCENARIOS.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = await scenario(integration)
+    parse_executor.shutdown()
+    return results
+
+
+def _autosave_digests(base_url: str) -> list:
+    with urlopen(f"{base_url}/__stats") as response:
+        stats = json.load(response)
+    with urlopen(f"{base_url}/__reset", data=b"") as response:
+        response.read()
+    # batch submissions arrive in any order
+    return sorted(autosave["sha256"] for autosave in stats["autosaves"])
+
+
+def check_scenarios(configurations) -> list:
+    """Runs the scenarios per `(parser, parse_mode)` and compares them with the inline default parser."""
+    failures = []
+    with stub_server(latency_ms=0) as base_url:
+        expected = asyncio.run(_run_scenarios(base_url, DEFAULT_HTML_PARSER))
+        expected_autosaves = _autosave_digests(base_url)
+        for parser, parse_mode in configurations:
+            label = f"{parser}/{parse_mode}"
+            actual = asyncio.run(_run_scenarios(base_url, parser, parse_mode))
+            for name in SCENARIOS:
+                if expected[name] != actual[name]:
+                    difference = _describe_difference(expected[name], actual[name])
+                    failures.append(f"{label} {name}: {difference}")
+            if _autosave_digests(base_url) != expected_autosaves:
+                failures.append(f"{label} AutoSave payloads differ from {DEFAULT_HTML_PARSER}/inline")
+    return failures
+
+
+def main():
+    parsers = [parser for parser in HTML_PARSERS if parser != DEFAULT_HTML_PARSER]
+    failures = []
+    for parser in parsers:
+        failures.extend(check_form_data(parser))
+    for parser in HTML_PARSERS:
+        failures.extend(check_note_schema(parser))
+    configurations = [(parser, "inline") for parser in parsers]
+    configurations += [(DEFAULT_HTML_PARSER, mode) for mode in PARSE_MODES if mode != "inline"]
+    failures.extend(check_scenarios(configurations))
+
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    if failures:
+        sys.exit(1)
+    print(
+        f"{', '.join(parsers)} match {DEFAULT_HTML_PARSER} on {len(PAGES)} pages and {len(SCENARIOS)} scenarios; "
+        "schema reads match full reads; "
+        f"parse modes {', '.join(mode for _, mode in configurations[len(parsers):])} match inline"
+    )
+
+
+if __name__ == "__main__":
+    main()
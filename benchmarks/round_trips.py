@@ -0,0 +1,83 @@
+"""
+Request count check for the note methods.
+
+Runs `generic_notes_fetch`, `generic_notes_fetch_many` (three notes) and
+`generic_notes_submit` against the local stub with cold caches, once on a regular host and once on secure31 (where the submit edits the latest
+note instead of creating a new one), and compares the requests the stub received per
+endpoint with the expected counts. Exits non-zero on any difference.
+
+Usage:
+    python benchmarks/round_trips.py
+"""
+import asyncio
+import contextlib
+import io
+import json
+import sys
+from urllib.request import urlopen
+
+import fixtures
+from run_benchmarks import SCENARIOS, stub_server
+
+from submodule_integrations.oncoemr.oncoemr_integration import OncoEmrIntegration
+
+PATIENT_INFO = "GET /PartialPage/GetPageInfoForPatient"
+NOTE_TYPES = "GET /WebForms/OncoEMR.aspx"
+NOTES_LIST = "GET /WebForms/pages_pd/PD_DocMDMain.aspx"
+NOTE_PAGE = "GET /WebForms/PD_DocOncoNoteDB.aspx"
+AUTOSAVE = "POST /VisitNotes/AutoSaveVisitNote"
+
+FETCH = {PATIENT_INFO: 1, NOTE_TYPES: 1, NOTES_LIST: 1, NOTE_PAGE: 1}
+
+# requests per scenario and host; off secure31 the submit reads the latest note
+# and writes a new one from the template, which are two different pages
+EXPECTED = {
+    ("generic_notes_fetch", "default"): FETCH,
+    ("generic_notes_fetch", "secure31"): FETCH,
+    ("generic_notes_fetch_many", "default"): {**FETCH, NOTE_PAGE: 3},
+    ("generic_notes_submit", "default"): {**FETCH, NOTE_PAGE: 2, AUTOSAVE: 1},
+    ("generic_notes_submit", "secure31"): {**FETCH, AUTOSAVE: 1},
+}
+
+
+def _stub_requests(base_url: str) -> dict:
+    with urlopen(f"{base_url}/__stats") as response:
+        stats = json.load(response)
+    with urlopen(f"{base_url}/__reset", data=b"") as response:
+        response.read()
+    return stats["requests"]
+
+
+async def _count_requests(base_url: str, integration_url: str, scenario) -> dict:
+    async with OncoEmrIntegration(
+            domain=base_url.split("://", 1)[1],
+            token="ASP.NET_SessionId=round-trips",
+            location_id=fixtures.LOCATION_ID,
+            user_agent="oncoemr-round-trips",
+    ) as integration:
+        integration.url = integration_url
+        await integration._load_state_data()
+        _stub_requests(base_url)
+        with contextlib.redirect_stdout(io.StringIO()):
+            await scenario(integration)
+    return _stub_requests(base_url)
+
+
+def main():
+    failures = []
+    with stub_server(latency_ms=0) as base_url:
+        hosts = {"default": base_url, "secure31": f"{base_url}/secure31"}
+        for (name, host), expected in EXPECTED.items():
+            actual = asyncio.run(_count_requests(base_url, hosts[host], SCENARIOS[name]))
+            if actual != expected:
+                failures.append(f"{name} on {host}: expected {expected}, got {actual}")
+
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"request counts match for {len(EXPECTED)} scenario and host combinations")
+
+
+if __name__ == "__main__":
+    main()
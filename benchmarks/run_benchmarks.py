@@ -0,0 +1,360 @@
+"""
+Offline benchmark for the public OncoEMR integration methods.
+
+Starts the local stub (`stub_server.py`) in a subprocess, points the integration at it
+and runs every scenario a few times. Per scenario it reports the median wall time, the
+HTTP round trips and request body bytes sent (counted through the request hooks), process CPU time, the CPU time
+spent parsing HTML (BeautifulSoup trees and the streaming visit list reader), the longest
+event loop stall and the peak traced memory of one extra run. Parses in worker processes
+(`--parse-mode process`) are not included in the parse CPU time.
+
+Results can be written with `--json` and compared against an earlier run with
+`--baseline`; the script exits non-zero when a scenario makes more round trips or is
+slower / bigger than the baseline by more than `--max-regression`.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--iterations 5] [--latency-ms 0] [--cold]
+        [--html-parser html.parser] [--parse-mode inline] [--autosave-mode full] [--only SCENARIO ...]
+        [--json results.json]
+        [--baseline results.json] [--max-regression 0.25]
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import io
+import json
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import fixtures
+
+from submodule_integrations.oncoemr.oncoemr_integration import AUTOSAVE_MODES, OncoEmrIntegration
+from submodule_integrations.oncoemr.oncoemr_parsing import (
+    DEFAULT_HTML_PARSER,
+    HTML_PARSERS,
+    PARSE_MODES,
+    ParseExecutor,
+)
+
+HERE = Path(__file__).resolve().parent
+
+# relative regressions tolerated per metric when comparing with a baseline
+COMPARED_METRICS = ("wall_ms", "cpu_ms", "peak_kib")
+
+
+async def _fetch_visit_list(integration: OncoEmrIntegration):
+    return await integration.fetch_visit_list(doctor_ids=[fixtures.PHYSICIAN_ID], selected_date="01/02/2025")
+
+
+async def _fetch_patient_demographics(integration: OncoEmrIntegration):
+    return await integration.fetch_patient_demographics(patient_id=fixtures.PATIENT_ID)
+
+
+async def _generic_notes_fetch(integration: OncoEmrIntegration):
+    return await integration.generic_notes_fetch(note_name=fixtures.NOTE_NAME, patient_id=fixtures.PATIENT_ID)
+
+
+async def _generic_notes_fetch_many(integration: OncoEmrIntegration):
+    return await integration.generic_notes_fetch_many(
+        patient_id=fixtures.PATIENT_ID, note_names=[fixtures.NOTE_NAME, "Template Note 0", "Template Note 1"]
+    )
+
+
+def _submit_fields() -> dict:
+    itb_checkbox = fixtures.checkbox_id(1, 2)
+    return {
+        "textfields": {fixtures.field_name(0, 0): "Patient doing well.\nNo new complaints + stable."},
+        "checkboxes": {fixtures.checkbox_id(1, 0): True, itb_checkbox: True, fixtures.checkbox_id(1, 1): False},
+        "radio_buttons": {fixtures.radio_id(2, 1): True, fixtures.radio_id(2, 0): False},
+        "direct_updates": {f"FD_itb{itb_checkbox}": "mild", "FD_gsGSPaiComparativePainScale": "4"},
+    }
+
+
+async def _generic_notes_submit(integration: OncoEmrIntegration):
+    return await integration.generic_notes_submit(
+        note_name=fixtures.NOTE_NAME, patient_id=fixtures.PATIENT_ID, fields=_submit_fields()
+    )
+
+
+async def _generic_notes_submit_many(integration: OncoEmrIntegration):
+    items = [
+        {"note_name": fixtures.NOTE_NAME, "patient_id": f"{fixtures.PATIENT_ID}{i:02d}", "fields": _submit_fields()}
+        for i in range(8)
+    ]
+    return await integration.generic_notes_submit_many(items, concurrency=4)
+
+
+async def _make_order_entry(integration: OncoEmrIntegration):
+    return await integration.make_order_entry(
+        patient_id=fixtures.PATIENT_ID, order_name=fixtures.ORDER_NAME, order_type="Tests", order_date="2025-01-02"
+    )
+
+
+async def _set_new_cpt_code(integration: OncoEmrIntegration):
+    return await integration.set_new_cpt_code(patient_id=fixtures.PATIENT_ID, cpt_code=fixtures.CPT_CODE)
+
+
+async def _search_patient_by_names(integration: OncoEmrIntegration):
+    return await integration.search_patient_by_names(last_name="Doe")
+
+
+SCENARIOS = {
+    "fetch_visit_list": _fetch_visit_list,
+    "fetch_patient_demographics": _fetch_patient_demographics,
+    "generic_notes_fetch": _generic_notes_fetch,
+    "generic_notes_fetch_many": _generic_notes_fetch_many,
+    "generic_notes_submit": _generic_notes_submit,
+    "generic_notes_submit_many": _generic_notes_submit_many,
+    "make_order_entry": _make_order_entry,
+    "set_new_cpt_code": _set_new_cpt_code,
+    "search_patient_by_names": _search_patient_by_names,
+}
+
+
+class ParseTimer:
+    """Accumulates the thread CPU time spent inside `BeautifulSoup(...)` and `VisitTableParser.feed`."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._depth = 0
+
+    def install(self):
+        import bs4
+
+        from submodule_integrations.oncoemr.oncoemr_visit_list import VisitTableParser
+
+        self._wrap(bs4.BeautifulSoup, "__init__")
+        self._wrap(VisitTableParser, "feed")
+
+    def _wrap(self, owner, name: str):
+        original = getattr(owner, name)
+
+        @functools.wraps(original)
+        def timed(instance, *args, **kwargs):
+            if self._depth:
+                return original(instance, *args, **kwargs)
+            self._depth += 1
+            started = time.thread_time()
+            try:
+                return original(instance, *args, **kwargs)
+            finally:
+                self.seconds += time.thread_time() - started
+                self._depth -= 1
+
+        setattr(owner, name, timed)
+
+
+class LoopLagProbe:
+    """Measures the longest time the event loop was kept from running a 1 ms timer."""
+
+    interval = 0.001
+
+    def __init__(self):
+        self.max_lag = 0.0
+        self._task = None
+        self._sleep_started = 0.0
+
+    def _record(self):
+        self.max_lag = max(self.max_lag, time.perf_counter() - self._sleep_started - self.interval)
+
+    async def _probe(self):
+        while True:
+            self._sleep_started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._record()
+
+    def start(self):
+        self.max_lag = 0.0
+        self._sleep_started = time.perf_counter()
+        self._task = asyncio.create_task(self._probe())
+
+    async def stop(self) -> float:
+        # a stall right before the scenario returned has not woken the probe yet
+        self._record()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        return self.max_lag
+
+
+@contextlib.contextmanager
+def stub_server(latency_ms: float):
+    process = subprocess.Popen(
+        [sys.executable, str(HERE / "stub_server.py"), "--latency-ms", str(latency_ms)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = process.stdout.readline()
+        if not line.startswith("READY"):
+            raise RuntimeError(f"Stub server failed to start: {line!r}")
+        yield f"http://127.0.0.1:{int(line.split()[1])}"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def _run_once(integration, scenario, events, parse_timer, cold: bool, trace_memory: bool = False) -> dict:
+    if cold:
+        integration.invalidate_reference_data()
+    events.clear()
+    parse_timer.seconds = 0.0
+    if trace_memory:
+        tracemalloc.start()
+
+    lag_probe = LoopLagProbe()
+    lag_probe.start()
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await scenario(integration)
+    wall_ms = (time.perf_counter() - wall_started) * 1000
+    cpu_ms = (time.process_time() - cpu_started) * 1000
+    loop_lag = await lag_probe.stop()
+    sample = {
+        "wall_ms": wall_ms,
+        "cpu_ms": cpu_ms,
+        "parse_cpu_ms": parse_timer.seconds * 1000,
+        "loop_lag_ms": loop_lag * 1000,
+        "round_trips": len(events),
+        "bytes_received": sum(event.bytes_received or 0 for event in events),
+        "bytes_sent": sum(event.bytes_sent or 0 for event in events),
+    }
+
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sample["peak_kib"] = peak / 1024
+    return sample
+
+
+async def run(
+        base_url: str,
+        names,
+        iterations: int,
+        cold: bool,
+        html_parser: str = DEFAULT_HTML_PARSER,
+        parse_mode: str = "inline",
+        autosave_mode: str = "full",
+) -> dict:
+    events = []
+    parse_timer = ParseTimer()
+    parse_timer.install()
+    parse_executor = ParseExecutor(parse_mode)
+
+    domain = base_url.split("://", 1)[1]
+    async with OncoEmrIntegration(
+            domain=domain,
+            token="ASP.NET_SessionId=benchmark",
+            location_id=fixtures.LOCATION_ID,
+            user_agent="oncoemr-benchmark",
+            request_hooks=[events.append],
+            html_parser=html_parser,
+            parse_executor=parse_executor,
+            autosave_mode=autosave_mode,
+    ) as integration:
+        integration.url = base_url
+        await integration._load_state_data()
+
+        results = {}
+        for name in names:
+            scenario = SCENARIOS[name]
+            # warm-up: opens the pooled connection and, unless `cold`, fills the caches
+            await _run_once(integration, scenario, events, parse_timer, cold)
+            samples = [
+                await _run_once(integration, scenario, events, parse_timer, cold)
+                for _ in range(iterations)
+            ]
+            memory = await _run_once(integration, scenario, events, parse_timer, cold, trace_memory=True)
+
+            results[name] = {
+                "wall_ms": statistics.median(s["wall_ms"] for s in samples),
+                "wall_ms_min": min(s["wall_ms"] for s in samples),
+                "cpu_ms": statistics.median(s["cpu_ms"] for s in samples),
+                "parse_cpu_ms": statistics.median(s["parse_cpu_ms"] for s in samples),
+                "loop_lag_ms": statistics.median(s["loop_lag_ms"] for s in samples),
+                "round_trips": max(s["round_trips"] for s in samples),
+                "bytes_received": max(s["bytes_received"] for s in samples),
+                "bytes_sent": max(s["bytes_sent"] for s in samples),
+                "peak_kib": memory["peak_kib"],
+            }
+    parse_executor.shutdown()
+    return results
+
+
+def print_report(results: dict):
+    columns = (
+        "wall_ms", "cpu_ms", "parse_cpu_ms", "loop_lag_ms", "round_trips", "bytes_received", "bytes_sent", "peak_kib"
+    )
+    width = max(len(name) for name in results) + 2
+    print("scenario".ljust(width) + "".join(column.rjust(16) for column in columns))
+    for name, result in results.items():
+        cells = []
+        for column in columns:
+            value = result[column]
+            cells.append((f"{value:,.1f}" if isinstance(value, float) else f"{value:,}").rjust(16))
+        print(name.ljust(width) + "".join(cells))
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["round_trips"] > previous["round_trips"]:
+            regressions.append(f"{name}: round_trips {previous['round_trips']} -> {result['round_trips']}")
+        for metric in COMPARED_METRICS:
+            if previous.get(metric) and result[metric] > previous[metric] * (1 + max_regression):
+                regressions.append(f"{name}: {metric} {previous[metric]:.1f} -> {result[metric]:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay the stub adds to every response")
+    parser.add_argument("--cold", action="store_true", help="drop cached reference data before every run")
+    parser.add_argument("--html-parser", choices=HTML_PARSERS, default=DEFAULT_HTML_PARSER)
+    parser.add_argument("--parse-mode", choices=PARSE_MODES, default="inline", help="where page parses run")
+    parser.add_argument("--autosave-mode", choices=AUTOSAVE_MODES, default="full", help="what note AutoSaves send")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="scenarios to run")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument("--baseline", type=Path, help="results file of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    names = args.only or list(SCENARIOS)
+    with stub_server(args.latency_ms) as base_url:
+        results = asyncio.run(
+            run(base_url, names, args.iterations, args.cold, args.html_parser, args.parse_mode, args.autosave_mode)
+        )
+
+    print_report(results)
+    if args.json:
+        config = {
+            "iterations": args.iterations,
+            "latency_ms": args.latency_ms,
+            "cold": args.cold,
+            "html_parser": args.html_parser,
+            "parse_mode": args.parse_mode,
+            "autosave_mode": args.autosave_mode,
+        }
+        args.json.write_text(json.dumps({"config": config, "results": results}, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
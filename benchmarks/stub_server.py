@@ -0,0 +1,165 @@
+"""
+Local OncoEMR stub serving the synthetic fixtures in `fixtures.py`.
+
+Every endpoint the benchmarked methods touch is answered from pre-rendered, gzip-compressed
+bodies so the stub itself costs next to nothing and the numbers reflect the client. The stub
+also counts requests per endpoint and keeps the size and digest of every AutoSave payload, both
+available from `GET /__stats`, and the `sNameValues` of every AutoSave from `GET /__payloads`
+(`POST /__reset` clears them). Every endpoint is also answered
+under `/secure31`, so a base URL ending in it exercises the secure31-only code paths.
+
+Usage:
+    python benchmarks/stub_server.py [--port 0] [--latency-ms 0]
+
+Prints `READY <port>` once it accepts connections.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import socket
+from collections import Counter
+
+from aiohttp import web
+
+import fixtures
+
+_REPEATED_SLASHES = re.compile(r"/{2,}")
+_SECURE31_PREFIX = "/secure31"
+
+
+class _Body:
+    def __init__(self, content: str, content_type: str):
+        self.raw = content.encode("utf-8")
+        self.compressed = gzip.compress(self.raw, compresslevel=6)
+        self.content_type = content_type
+
+
+def _html(content: str) -> _Body:
+    return _Body(content, "text/html")
+
+
+def _json(payload) -> _Body:
+    return _Body(json.dumps(payload), "application/json")
+
+
+class OncoEmrStub:
+    def __init__(self, scale: fixtures.Scale, latency: float = 0.0):
+        self.latency = latency
+        self.requests = Counter()
+        self.autosaves = []
+        self.payloads = []
+        patient_id = fixtures.PATIENT_ID
+        self.routes = {
+            ("GET", "/nav"): _html(fixtures.nav_page()),
+            ("GET", "/User/PhysicianUsers"): _json(fixtures.physicians(scale)),
+            ("GET", "/VisitList/UpdateVisitList"): _json(fixtures.visit_list(scale)),
+            ("GET", "/pc/demographics"): _json(fixtures.demographics(patient_id)),
+            ("GET", "/PartialPage/GetPageInfoForPatient"): _json(fixtures.partial_page_info(patient_id)),
+            ("GET", "/WebForms/pages_pd/PD_Demographics.aspx"): _html(fixtures.demographics_page(patient_id)),
+            ("GET", "/WebForms/pages_pd/PD_DocMDMain.aspx"): _html(fixtures.notes_list_page(scale)),
+            ("GET", "/WebForms/OncoEMR.aspx"): _json(fixtures.note_types(scale)),
+            ("GET", "/WebForms/PD_DocOncoNoteDB.aspx"): _html(fixtures.note_page(scale)),
+            ("GET", "/Home/HeaderData"): _json(fixtures.header_data(patient_id)),
+            ("GET", "/Orders/OrderTypes"): _json(fixtures.order_types()),
+            ("GET", "/Orders/OrderSets"): _json(fixtures.order_sets()),
+            ("POST", "/Orders/Orders"): _json([]),
+            ("POST", "/FindPatient/GetPatientList"): _json(fixtures.patient_search(scale)),
+            ("POST", "/TreatmentPlan/ModelJson"): _json(fixtures.treatment_plan()),
+            ("POST", "/PatientOrders2"): _json(fixtures.patient_orders("PC_BENCH0007")),
+            ("GET", "/WebForms/pages_pd/PD_TPActivityEditDB.aspx"): _html(fixtures.activity_order_dialog()),
+            ("POST", "/pages_pd/PD_TPActivityEditDB.aspx"): _json({"Success": True}),
+        }
+
+    @staticmethod
+    def route_key(request: web.Request) -> tuple:
+        path = _REPEATED_SLASHES.sub("/", request.path).rstrip("/") or "/"
+        # a `/secure31` base path stands in for the secure31 host, whose notes take another code path
+        if path.startswith(_SECURE31_PREFIX + "/"):
+            path = path[len(_SECURE31_PREFIX):]
+        return request.method, path
+
+    async def dispatch(self, request: web.Request) -> web.StreamResponse:
+        method, path = self.route_key(request)
+        if path == "/__stats":
+            return web.json_response({"requests": dict(self.requests), "autosaves": self.autosaves})
+        if path == "/__payloads":
+            return web.json_response(self.payloads)
+        if path == "/__reset":
+            self.requests.clear()
+            self.autosaves.clear()
+            self.payloads.clear()
+            return web.json_response({"success": True})
+
+        self.requests[f"{method} {path}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if (method, path) == ("POST", "/VisitNotes/AutoSaveVisitNote"):
+            return await self.autosave(request)
+
+        body = self.routes.get((method, path))
+        if body is None:
+            return web.Response(status=404, text=f"No stub for {method} {path}")
+
+        headers = {"Content-Type": f"{body.content_type}; charset=utf-8"}
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return web.Response(body=body.compressed, headers=headers)
+        return web.Response(body=body.raw, headers=headers)
+
+    async def autosave(self, request: web.Request) -> web.Response:
+        raw = await request.read()
+        payload = json.loads(raw)
+        name_values = payload.get("sNameValues", "")
+        segments = name_values.split("%02")
+        # 17 header segments precede the `key%01value` pairs; the template notes end with `PRINT`
+        fields = [segment for segment in segments[17:] if segment and segment != "PRINT"]
+        malformed = [field for field in fields if "%01" not in field]
+        self.autosaves.append({
+            "bytes": len(raw),
+            "name_values_bytes": len(name_values),
+            "fields": len(fields),
+            "sha256": hashlib.sha256(name_values.encode("utf-8")).hexdigest(),
+            "patient_id": segments[11] if len(segments) > 11 else None,
+        })
+        self.payloads.append(name_values)
+        if len(segments) < 18 or malformed:
+            return web.Response(status=400, text=f"Malformed sNameValues: {malformed[:3]}")
+        return web.Response(text="background\u0001DH_BENCHSAVED01\u0001DH_BENCHSAVED02", content_type="text/plain")
+
+
+async def serve(port: int, latency: float, scale: fixtures.Scale):
+    stub = OncoEmrStub(scale=scale, latency=latency)
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_route("*", "/{tail:.*}", stub.dispatch)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.SockSite(runner, sock).start()
+    print(f"READY {sock.getsockname()[1]}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.latency_ms / 1000, fixtures.Scale()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
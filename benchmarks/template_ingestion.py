@@ -0,0 +1,142 @@
+"""
+Validation time and memory per note template model, from the raw JSON request body.
+
+For the follow-up, consultation and catch-all templates, builds seeded JSON bodies
+with a few and with many fields set and compares three ways of ingesting them:
+`json.loads` plus the model constructor (as the API layer did), `parse_template`
+(`model_validate_json`) and `parse_sparse_template` (only the sent fields, no defaults).
+Reports the best time per template and the memory kept per template. Before timing, it
+checks that sparse templates apply to a note form exactly like the full models, turn
+into the same models, and reject the same invalid bodies. Exits non-zero on any difference.
+
+Usage:
+    python benchmarks/template_ingestion.py [--seed 0] [--cases 200]
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+import typing
+
+from pydantic import BaseModel, ValidationError
+from template_plan import TEMPLATES, _target_ids
+
+from submodule_integrations.oncoemr.generic_note_model import CatchAllModel
+from submodule_integrations.oncoemr.oncoemr_integration import OncoEmrIntegration
+from submodule_integrations.oncoemr.oncoemr_templates import parse_sparse_template, parse_template
+
+MODELS = {name: model_class for name, (model_class, *_) in TEMPLATES.items()}
+MODELS["catch_all"] = CatchAllModel
+
+# fields set per body
+SIZES = {"few": 3, "many": 60}
+
+
+def _random_value(annotation, rng: random.Random):
+    """A valid JSON value for `annotation`, or `None` for types the templates do not fill in."""
+    if typing.get_origin(annotation) is typing.Union:
+        annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+    if typing.get_origin(annotation) is typing.Literal:
+        return rng.choice(typing.get_args(annotation))
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is str:
+        return "Seen today."
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {"text": rng.choice(("Seen today.", "Stable on current regimen.")), "append": rng.random() < 0.5}
+    return None
+
+
+def random_body(rng: random.Random, model_class, size: int) -> dict:
+    body = {"patient_id": "P_1"}
+    if "note_name" in model_class.model_fields:
+        body["note_name"] = "Follow Up"
+    names = list(model_class.model_fields)
+    for name in rng.sample(names, min(size, len(names))):
+        value = _random_value(model_class.model_fields[name].annotation, rng)
+        if value is not None:
+            body[name] = value
+    return body
+
+
+def check(seed: int, cases: int) -> list:
+    rng = random.Random(seed)
+    failures = []
+    for index in range(cases):
+        name = rng.choice(list(MODELS))
+        model_class = MODELS[name]
+        raw = json.dumps(random_body(rng, model_class, rng.randint(0, 40)))
+        model, sparse = parse_template(model_class, raw), parse_sparse_template(model_class, raw)
+        if sparse.to_model() != model or sparse.model_fields_set != model.model_fields_set:
+            failures.append(f"{name} case {index}: the sparse template is a different model")
+        if name in TEMPLATES:
+            mappings = TEMPLATES[name][1:]
+            target = {key: rng.choice(("", "false", "Earlier text")) for key in _target_ids(*mappings)}
+            expected = OncoEmrIntegration._apply_template_to_dict(model, target, *mappings)
+            if OncoEmrIntegration._apply_template_to_dict(sparse, target, *mappings) != expected:
+                failures.append(f"{name} case {index}: the sparse template applies differently")
+        invalid = json.dumps({**json.loads(raw), "patient_id": None})
+        for parse in (parse_template, parse_sparse_template):
+            try:
+                parse(model_class, invalid)
+            except ValidationError:
+                continue
+            failures.append(f"{name} case {index}: {parse.__name__} accepts a null patient_id")
+    return failures
+
+
+def _loads_and_construct(model_class, raw):
+    return model_class(**json.loads(raw))
+
+
+def _best_of(function, model_class, raw, repeat: int = 200) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(model_class, raw)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _kept_bytes(function, model_class, raw, count: int = 200) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [function(model_class, raw) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", type=int, default=200)
+    args = parser.parse_args()
+
+    failures = check(args.seed, args.cases)
+    for failure in failures[:50]:
+        print(f"MISMATCH {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"{args.cases} random templates ingest and apply identically")
+
+    rng = random.Random(args.seed)
+    ways = {"loads+model": _loads_and_construct, "validate_json": parse_template, "sparse": parse_sparse_template}
+    print(f"{'template':<24}" + "".join(f"{way + ' us':>18}{way + ' B':>16}" for way in ways))
+    for name, model_class in MODELS.items():
+        for size_name, size in SIZES.items():
+            raw = json.dumps(random_body(rng, model_class, size)).encode("utf-8")
+            row = f"{name + '/' + size_name:<24}"
+            for function in ways.values():
+                seconds = _best_of(function, model_class, raw)
+                row += f"{seconds * 1e6:>18.1f}{_kept_bytes(function, model_class, raw):>16,.0f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
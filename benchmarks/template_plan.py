@@ -0,0 +1,186 @@
+"""
+Differential check and timing for the compiled note template plans.
+
+Applies seeded random follow-up and consultation templates (random subsets of text,
+radio button and checkbox fields, including values outside the mapped options and
+default text fields edited in place) to note forms holding a random subset of the
+mapped ids, with the compiled plans and with the full-model walk
+`_apply_template_to_dict` did before, and compares the results. Then times both for
+a template with three fields set. Exits non-zero on any difference.
+
+Usage:
+    python benchmarks/template_plan.py [--seed 0] [--cases 500]
+"""
+import argparse
+import random
+import sys
+import time
+import warnings
+
+from submodule_integrations.oncoemr.consultation_mappings import (
+    CONSULTATION_CHECKBOXES_MAPPING,
+    CONSULTATION_RADIO_BUTTONS_MAPPING,
+    CONSULTATION_TEXTFIELDS_MAPPING,
+)
+from submodule_integrations.oncoemr.consultation_models import ConsultationNoteTemplateModel
+from submodule_integrations.oncoemr.oncoemr_integration import OncoEmrIntegration
+from submodule_integrations.oncoemr.oncoemr_mapping import (
+    FOLLOWUP_CHECKBOXES_MAPPING,
+    FOLLOWUP_RADIO_BUTTONS_MAPPING,
+    FOLLOWUP_TEXTFIELDS_MAPPING,
+)
+from submodule_integrations.oncoemr.oncoemr_models import FollowupNoteTemplateModel
+
+TEMPLATES = {
+    "followup": (
+        FollowupNoteTemplateModel,
+        FOLLOWUP_RADIO_BUTTONS_MAPPING,
+        FOLLOWUP_CHECKBOXES_MAPPING,
+        FOLLOWUP_TEXTFIELDS_MAPPING,
+    ),
+    "consultation": (
+        ConsultationNoteTemplateModel,
+        CONSULTATION_RADIO_BUTTONS_MAPPING,
+        CONSULTATION_CHECKBOXES_MAPPING,
+        CONSULTATION_TEXTFIELDS_MAPPING,
+    ),
+}
+
+
+def reference_apply(template_model, target_dict, radio_buttons_mapping, checkboxes_mapping, textfields_mapping):
+    result_dict = target_dict.copy()
+    model_dict = template_model.model_dump()
+    for model_field, field_content in model_dict.items():
+        if model_field == "patient_id" or model_field in radio_buttons_mapping:
+            continue
+        if not isinstance(field_content, dict) or not field_content.get("text"):
+            continue
+        if model_field in textfields_mapping:
+            target_field = textfields_mapping[model_field]
+            if target_field in result_dict:
+                if field_content.get("append", True) and result_dict[target_field]:
+                    result_dict[target_field] = f"{result_dict[target_field]}\n{field_content['text']}"
+                else:
+                    result_dict[target_field] = field_content["text"]
+    for field_name, mapping in radio_buttons_mapping.items():
+        selected_value = model_dict.get(field_name)
+        if selected_value:
+            options_mapping = mapping["options"]
+            if selected_value not in options_mapping:
+                continue
+            for option, field_key in options_mapping.items():
+                if field_key in result_dict:
+                    result_dict[field_key] = ""
+            if selected_value in options_mapping:
+                selected_key = options_mapping[selected_value]
+                if selected_key in result_dict:
+                    result_dict[selected_key] = "true"
+    for field_name, field_key in checkboxes_mapping.items():
+        checkbox_value = model_dict.get(field_name)
+        if checkbox_value is not None and field_key in result_dict:
+            result_dict[field_key] = "true" if checkbox_value else "false"
+    return result_dict
+
+
+def _target_ids(radio_buttons_mapping, checkboxes_mapping, textfields_mapping) -> list:
+    ids = list(textfields_mapping.values()) + list(checkboxes_mapping.values())
+    for mapping in radio_buttons_mapping.values():
+        ids += list(mapping["options"].values())
+    return sorted(set(ids))
+
+
+def random_case(rng: random.Random, name: str):
+    model_class, radio_buttons_mapping, checkboxes_mapping, textfields_mapping = TEMPLATES[name]
+    content_class = model_class.model_fields["plan"].annotation
+    values = {"patient_id": "P_1"}
+    for _ in range(rng.randint(0, 12)):
+        kind = rng.choice(("text", "radio", "checkbox"))
+        if kind == "text":
+            field = rng.choice(list(textfields_mapping))
+            text = rng.choice(("", None, "Seen today."))
+            if model_class.model_fields.get(field) and model_class.model_fields[field].annotation is content_class:
+                values[field] = content_class(text=text, append=rng.random() < 0.5)
+            else:
+                values[field] = text
+        elif kind == "radio":
+            field = rng.choice(list(radio_buttons_mapping))
+            options = list(radio_buttons_mapping[field]["options"]) + ["Not an option", None]
+            values[field] = rng.choice(options)
+        else:
+            values[rng.choice(list(checkboxes_mapping))] = rng.choice((True, False, None))
+    values = {field: value for field, value in values.items() if field in model_class.model_fields}
+    template = model_class.model_construct(**values)
+    if rng.random() < 0.2:
+        # in-place edit of a default text field, which does not mark it set
+        contents = [
+            field for field in textfields_mapping
+            if field in model_class.model_fields and model_class.model_fields[field].annotation is content_class
+        ]
+        getattr(template, rng.choice(contents)).text = "Edited in place."
+    if rng.random() < 0.2 and radio_buttons_mapping:
+        # assignment after construction
+        field = rng.choice([field for field in radio_buttons_mapping if field in model_class.model_fields])
+        setattr(template, field, next(iter(radio_buttons_mapping[field]["options"])))
+    ids = _target_ids(radio_buttons_mapping, checkboxes_mapping, textfields_mapping)
+    target = {key: rng.choice(("", "false", "true", "Earlier text")) for key in ids if rng.random() < 0.8}
+    return template, target
+
+
+def check(seed: int, cases: int) -> list:
+    rng = random.Random(seed)
+    failures = []
+    for index in range(cases):
+        name = rng.choice(list(TEMPLATES))
+        template, target = random_case(rng, name)
+        mappings = TEMPLATES[name][1:]
+        expected = reference_apply(template, target, *mappings)
+        actual = OncoEmrIntegration._apply_template_to_dict(template, target, *mappings)
+        if expected != actual:
+            keys = sorted(key for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key))
+            failures.append(f"{name} case {index}: {keys[:5]} differ")
+    return failures
+
+
+def _best_of(function, repeat: int = 200) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", type=int, default=500)
+    args = parser.parse_args()
+
+    # values outside the field types make the reference `model_dump` warn
+    warnings.filterwarnings("ignore", message="Pydantic serializer warnings")
+    failures = check(args.seed, args.cases)
+    for failure in failures[:50]:
+        print(f"MISMATCH {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"{args.cases} random templates apply identically")
+
+    for name, (model_class, *mappings) in TEMPLATES.items():
+        radio_buttons_mapping, checkboxes_mapping, textfields_mapping = mappings
+        template = model_class.model_construct(
+            patient_id="P_1",
+            plan=model_class.model_fields["plan"].annotation(text="Continue current regimen."),
+            **{next(iter(radio_buttons_mapping)): next(iter(next(iter(radio_buttons_mapping.values()))["options"]))},
+            **{next(iter(checkboxes_mapping)): True},
+        )
+        target = {key: "" for key in _target_ids(*mappings)}
+        reference = _best_of(lambda: reference_apply(template, target, *mappings))
+        planned = _best_of(lambda: OncoEmrIntegration._apply_template_to_dict(template, target, *mappings))
+        print(
+            f"{name} with 3 fields set: {reference * 1000:.3f} ms before, {planned * 1000:.3f} ms with the plan "
+            f"({reference / planned:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
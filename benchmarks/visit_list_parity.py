@@ -0,0 +1,145 @@
+"""
+Differential check for the streaming visit list reader.
+
+Compares `parse_visit_table` with a BeautifulSoup reference (the tree-based parser it
+replaced) on the fixture visit list and on random markup assembled from visit-table
+fragments and html.parser edge cases: unclosed and stray end tags, void elements,
+nested tables, entities and character references, comments, CDATA, script and template
+contents, whitespace-only strings. Exits non-zero on the first difference.
+
+Usage:
+    python benchmarks/visit_list_parity.py [--cases 2000] [--seed 0]
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Dict, List
+
+import bs4
+
+import fixtures
+
+from submodule_integrations.oncoemr.oncoemr_visit_list import VISIT_TABLE_ID, parse_visit_table
+
+HEADER = (
+    f'<table id="{VISIT_TABLE_ID}"><tr><th id="thTime"></th><th>Patient</th><th id="thRoom"></th>'
+    "<th>Status</th><th>Notes (Internal)</th></tr>"
+)
+
+FRAGMENTS = [
+    f'<table id="{VISIT_TABLE_ID}">', '<table>', '</table>', '<thead>', '</thead>', '<tbody>', '</tbody>',
+    '<tr pid="P1" pnam="Doe, Jane" location="L1">', '<tr pid="P2" pid="P3">', '<tr pnam>', '<tr>', '</tr>',
+    '<td>', '<TD>', '<td colspan=2>', '</td>', '</TD>', '<th id="thTime">', '<th>', '</th>', '<th id="thPatient"></th>',
+    'Time', 'Patient', 'Room', ' Visit Type ', 'Notes (Internal)', '08:00 AM', 'MRN-1', 'Room 3',
+    '<a class="gts">', '<A CLASS="x gts">', '<a id="ancp1">', '<a href="#" id="ancp2">', '<a id="">', '<a class>',
+    '<a class="room-name">', '<a id="ancpX" class="room-name">', '</a>', 'Doe, J <span>MRN-2</span>',
+    '<td><a class="room-name">R1</a> <span>ready</span></td>', '<span>', '</span>', '<b>', '</b>',
+    '<font color="#fff">', '</font>', '<div>', '</div>', '<div/>', '<p>', '</p>',
+    '<br>', '</br>', '<br/>', '<hr/>', '<img src=x>', '</img>', '<input>', '</input>', '<area>', '<col>',
+    '<pre>', '</pre>', '<textarea>', '</textarea>', '<title>', '</title>',
+    '<script>if (a<b) {}</script>', '<style>td{}</style>', '<template>', '</template>',
+    '<ruby>', '<rt>', '</rt>', '<rp>(</rp>', '</ruby>',
+    '<!-- comment -->', '<![CDATA[ cdata ]]>', '<![CDATA[]]>', '<!DOCTYPE html>', '<?pi x?>',
+    '&amp;', '&nbsp;', '&foo;', '&', '&#65;', '&#x41;', '&#0;', '&#150;', '&#12abc', '&#xZZ;',
+    ' ', '  \n ', '\t', '\xa0',
+]
+
+
+def reference_parse(html_content: str) -> List[Dict]:
+    """The BeautifulSoup implementation `parse_visit_table` must match."""
+    soup = bs4.BeautifulSoup(html_content, "html.parser")
+
+    table = soup.find("table", id=VISIT_TABLE_ID)
+    if not table:
+        return []
+
+    headers = []
+    header_row = table.find("tr")
+    if header_row:
+        for th in header_row.find_all("th"):
+            header_text = th.get_text().strip()
+            if not header_text and th.get("id"):
+                header_text = th.get("id").replace("th", "")
+            headers.append(header_text)
+
+    patients = []
+    for row in table.find_all("tr")[1:]:
+        patient_data = {
+            "patient_id": row.get("pid", ""),
+            "patient_name": row.get("pnam", ""),
+            "location": row.get("location", ""),
+        }
+
+        for i, cell in enumerate(row.find_all("td")):
+            if i < len(headers):
+                header_key = headers[i].replace(" ", "_").replace("(", "").replace(")", "").lower()
+                if i == 0:
+                    time_link = cell.find("a", class_="gts")
+                    if time_link:
+                        patient_data["appointment_time"] = time_link.get_text().strip()
+                    else:
+                        patient_data["appointment_time"] = cell.get_text().strip()
+                elif "patient" in header_key or cell.find("a", id=lambda x: x and x.startswith("ancp")):
+                    patient_link = cell.find("a", id=lambda x: x and x.startswith("ancp"))
+                    if patient_link:
+                        patient_data["patient_display"] = patient_link.get_text().strip()
+                        mrn_span = patient_link.find("span")
+                        if mrn_span:
+                            patient_data["mrn"] = mrn_span.get_text().strip()
+                else:
+                    patient_data[header_key] = cell.get_text().strip()
+                    if header_key == "room":
+                        room_link = cell.find("a", class_="room-name")
+                        if room_link:
+                            patient_data["room_status"] = room_link.get_text().strip()
+
+        patients.append(patient_data)
+
+    return patients
+
+
+def random_markup(rng: random.Random) -> str:
+    markup = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(5, 80)))
+    return HEADER + markup if rng.random() < 0.7 else markup
+
+
+def differs(html_content: str) -> bool:
+    expected = reference_parse(html_content)
+    actual = parse_visit_table(html_content)
+    # key order is part of the contract, it is the order of the response fields
+    return expected != actual or [list(row) for row in expected] != [list(row) for row in actual]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=2000, help="random documents to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    visit_html = fixtures.visit_list(fixtures.Scale())["sViewHtml"]
+    if differs(visit_html):
+        print("MISMATCH on the fixture visit list")
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    for case in range(args.cases):
+        markup = random_markup(rng)
+        if differs(markup):
+            print(f"MISMATCH on case {case}: {markup!r}")
+            sys.exit(1)
+
+    started = time.perf_counter()
+    reference_parse(visit_html)
+    reference_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    parse_visit_table(visit_html)
+    streaming_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"parse_visit_table matches the BeautifulSoup reference on the fixture and {args.cases} random documents "
+        f"(fixture: {streaming_ms:.1f} ms vs {reference_ms:.1f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from submodule_integrations.oncoemr.oncoemr_transport import SingleFlight
+
+
+# practice-wide catalogs change roughly once a day
+DEFAULT_REFERENCE_TTLS = {
+    "physicians": 60 * 60,
+    "note_types": 6 * 60 * 60,
+    "order_types": 6 * 60 * 60,
+    "order_sets": 6 * 60 * 60,
+}
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    fetched_at: float
+
+
+class ReferenceDataCache:
+    """
+    TTL cache for practice-wide reference catalogs with stale-while-revalidate.
+
+    - Within its TTL an entry is returned as is.
+    - Past its TTL but within `max_stale` seconds more, the stale entry is
+      returned immediately and a single background refresh is started.
+    - Missing or fully expired entries are loaded inline; concurrent misses for
+      the same catalog share one load.
+
+    A failed background refresh keeps serving the stale entry until it expires.
+    """
+
+    def __init__(
+            self,
+            ttls: Optional[Dict[str, float]] = None,
+            default_ttl: float = 60 * 60,
+            max_stale: float = 24 * 60 * 60,
+    ):
+        self.ttls = {**DEFAULT_REFERENCE_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self._entries: Dict[str, _CacheEntry] = {}
+        # bumped on invalidation so loads started earlier do not repopulate
+        self._generation = 0
+        self._loads = SingleFlight()
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+    def ttl(self, catalog: str) -> float:
+        return self.ttls.get(catalog, self.default_ttl)
+
+    async def get(self, catalog: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(catalog)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            ttl = self.ttl(catalog)
+            if age < ttl:
+                return entry.value
+            if age < ttl + self.max_stale:
+                self._refresh_in_background(catalog, loader)
+                return entry.value
+
+        return await self._loads.do(catalog, lambda: self._load(catalog, loader))
+
+    async def _load(self, catalog: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        value = await loader()
+        if generation == self._generation:
+            self._entries[catalog] = _CacheEntry(value=value, fetched_at=time.monotonic())
+        return value
+
+    def _refresh_in_background(self, catalog: str, loader: Callable[[], Awaitable[Any]]):
+        if catalog in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._loads.do(catalog, lambda: self._load(catalog, loader))
+            except Exception as e:
+                print(f"Background refresh of `{catalog}` failed, serving stale data: {e}")
+            finally:
+                self._refreshing.discard(catalog)
+
+        self._refreshing.add(catalog)
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def invalidate(self, catalog: Optional[str] = None):
+        """Drops one catalog, or every catalog when `catalog` is None."""
+        self._generation += 1
+        if catalog is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(catalog, None)
+
+    async def aclose(self):
+        """Cancels pending background refreshes."""
+        tasks = list(self._refresh_tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
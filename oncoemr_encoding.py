@@ -0,0 +1,72 @@
+import functools
+import re
+from typing import Dict, Tuple
+
+# bytes `urllib.parse.quote` never escapes
+_ALWAYS_SAFE = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~"
+
+# characters the AutoSave form field values keep unescaped
+FIELD_VALUE_SAFE = "%*()'"
+
+# `sNameValues` separators between a field id and its value, and between fields
+NAME_VALUE_SEPARATOR = "%01"
+FIELD_SEPARATOR = "%02"
+
+_LOWERCASE_ESCAPE = re.compile(r"%([a-f0-9]{2})")
+
+
+def _uppercase_escape(match: re.Match) -> str:
+    return f"%{match.group(1).upper()}"
+
+
+@functools.lru_cache(maxsize=None)
+def _escape_table(safe: str, spaces: bool = False) -> Tuple[Tuple[str, ...], bytes]:
+    """
+    Per-byte escapes of `quote(..., safe=safe)` with uppercase hex, and the bytes kept as they are.
+
+    With `spaces`, `+` and spaces are written as `%20`, the way OncoEMR reads them.
+    """
+    kept = _ALWAYS_SAFE + safe.encode("ascii", "ignore")
+    table = [chr(byte) if byte in kept else f"%{byte:02X}" for byte in range(256)]
+    if spaces:
+        table[ord(" ")] = table[ord("+")] = "%20"
+    return tuple(table), kept
+
+
+def quote_uppercase(text: str, safe: str = "") -> str:
+    """
+    `urllib.parse.quote(text, safe=safe)` with every `%xx` escape in uppercase hex,
+    including the lowercase ones already in `text`.
+    """
+    table, kept = _escape_table(safe)
+    data = text.encode("utf-8")
+    encoded = "".join(map(table.__getitem__, data)) if data.rstrip(kept) else text
+    # only escapes that were in `text` can be lowercase
+    if "%" in text:
+        encoded = _LOWERCASE_ESCAPE.sub(_uppercase_escape, encoded)
+    return encoded
+
+
+def encode_field_value(value: str) -> str:
+    """
+    Encodes one form field value of `sNameValues` in a single pass over its bytes.
+
+    Gives the same result as replacing `+` and spaces by `%20`, quoting with
+    `FIELD_VALUE_SAFE` kept, uppercasing the hex escapes, rewriting `%27` as `%22` and
+    `<br/>` (`%3Cbr%2F%3E`) as `<br>`, which is how the notes have been encoded so far.
+    """
+    if not value:
+        return ""
+    table, kept = _escape_table(FIELD_VALUE_SAFE, spaces=True)
+    data = value.encode("utf-8")
+    encoded = "".join(map(table.__getitem__, data)) if data.rstrip(kept) else value
+    if "%" in value:
+        encoded = _LOWERCASE_ESCAPE.sub(_uppercase_escape, encoded).replace("%27", "%22")
+    return encoded.replace("%3Cbr%2F%3E", "%3Cbr%3E")
+
+
+def encode_name_values(fields: Dict[str, str]) -> str:
+    """The `%01` / `%02` delimited form fields part of `sNameValues`."""
+    return FIELD_SEPARATOR.join(
+        f"{field_id}{NAME_VALUE_SEPARATOR}{encode_field_value(value)}" for field_id, value in fields.items()
+    )
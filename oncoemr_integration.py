@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import asyncio
 import re
 import html
@@ -5,36 +7,71 @@ import json
 import time
 import random
 import string
-import urllib
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Set
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Set, Union
+from urllib.parse import urlsplit
 
 import aiohttp
-import bs4
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
 
 from submodule_integrations.models.integration import Integration
-from submodule_integrations.oncoemr.generic_note_model import CatchAllModel
-from submodule_integrations.oncoemr.oncoemr_models import FollowupNoteTemplateModel
-from submodule_integrations.utils.errors import (
-    IntegrationAuthError,
-    IntegrationAPIError,
+from submodule_integrations.oncoemr.oncoemr_cache import ReferenceDataCache
+from submodule_integrations.oncoemr.oncoemr_encoding import encode_name_values, quote_uppercase
+from submodule_integrations.oncoemr.oncoemr_lazy import default_user_agent, lazy_import
+from submodule_integrations.oncoemr.oncoemr_metrics import (
+    MetricsRegistry,
+    RequestEvent,
+    RequestHook,
+    RequestTimings,
+    build_trace_config,
+    endpoint_template,
 )
-from submodule_integrations.oncoemr.consultation_models import (
-    ConsultationNoteTemplateModel,
+from submodule_integrations.oncoemr.oncoemr_note_page import (
+    NotePage,
+    NotePageData,
+    NoteTemplateCache,
+    open_note_page,
+    read_note_page,
 )
-from submodule_integrations.oncoemr.consultation_mappings import (
-    CONSULTATION_TEXTFIELDS_MAPPING,
-    CONSULTATION_RADIO_BUTTONS_MAPPING,
-    CONSULTATION_CHECKBOXES_MAPPING,
+from submodule_integrations.oncoemr.oncoemr_parsing import (
+    DEFAULT_HTML_PARSER,
+    ParseExecutor,
+    check_html_parser,
+    class_matcher,
 )
-from submodule_integrations.oncoemr.oncoemr_mapping import (
-    FOLLOWUP_TEXTFIELDS_MAPPING,
-    FOLLOWUP_RADIO_BUTTONS_MAPPING,
-    FOLLOWUP_CHECKBOXES_MAPPING,
+from submodule_integrations.oncoemr.oncoemr_transport import (
+    IDEMPOTENT_METHODS,
+    AdaptiveRequestScheduler,
+    RetryPolicy,
+    SingleFlight,
+    current_retry_budget,
+    decode_response_body,
+    is_json_endpoint,
+    once_per_operation,
+    operation_scope,
+    request_key,
+    retry_budget_scope,
+)
+from submodule_integrations.oncoemr.oncoemr_visit_list import parse_visit_table
+from submodule_integrations.utils.errors import (
+    IntegrationAuthError,
+    IntegrationAPIError,
 )
 
+if TYPE_CHECKING:
+    from submodule_integrations.oncoemr.generic_note_model import CatchAllModel
+    from submodule_integrations.oncoemr.oncoemr_models import FollowupNoteTemplateModel
+    from submodule_integrations.oncoemr.consultation_models import (
+        ConsultationNoteTemplateModel,
+    )
+    from submodule_integrations.oncoemr.oncoemr_templates import SparseTemplate
+
+# bs4 is only needed once a response is parsed; the template models and the
+# field mappings are only loaded by the note methods that use them
+bs4 = lazy_import("bs4")
+
+# what the note AutoSaves send: every form field, or only the fields that changed
+AUTOSAVE_MODES = ("full", "diff")
+
 
 class OncoEmrIntegration(Integration):
     def __init__(
@@ -43,13 +80,54 @@ class OncoEmrIntegration(Integration):
             token: str,
             location_id: str,
             network_requester=None,
-            user_agent: str = UserAgent().random,
+            user_agent: Optional[str] = None,
+            connector_limit: int = 100,
+            connector_limit_per_host: int = 30,
+            keepalive_timeout: float = 30.0,
+            request_timeout: float = 300.0,
+            scheduler: Optional[AdaptiveRequestScheduler] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            reference_data_ttls: Optional[Dict[str, float]] = None,
+            metrics: Optional[MetricsRegistry] = None,
+            request_hooks: Optional[List[RequestHook]] = None,
+            html_parser: str = DEFAULT_HTML_PARSER,
+            parse_executor: Optional[ParseExecutor] = None,
+            autosave_mode: str = "full",
     ):
         super().__init__("oncoemr")
-        self.user_agent = user_agent
+        self.user_agent = user_agent or default_user_agent()
         self.url = domain if "https://" in domain else f"https://{domain}"
         self.network_requester = network_requester
 
+        # pooled connection settings; the session itself is created lazily so
+        # that it is bound to the running event loop
+        self.connector_limit = connector_limit
+        self.connector_limit_per_host = connector_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        # total seconds per request, aiohttp's default; long note and report loads need it
+        self.request_timeout = request_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        # bounds and adapts in-flight requests per OncoEMR host
+        self.scheduler = scheduler or AdaptiveRequestScheduler()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # identical in-flight GETs share one network call
+        self._single_flight = SingleFlight()
+        # physicians, note types, order types and order sets
+        self._reference_data = ReferenceDataCache(ttls=reference_data_ttls)
+        # compiled note template schemas (textarea labels, score tables, ONT templates) per template id
+        self._note_templates = NoteTemplateCache()
+        # every HTTP attempt is reported to the metrics registry and to the hooks
+        self.metrics = metrics or MetricsRegistry()
+        self.request_hooks: List[RequestHook] = [self.metrics.observe, *(request_hooks or [])]
+        # BeautifulSoup tree builder for the page parses; `lxml` is faster
+        self.html_parser = check_html_parser(html_parser)
+        # where the heavy page parses run; inline on the event loop by default
+        self.parse_executor = parse_executor or ParseExecutor()
+        # `diff` leaves the unchanged fields out of the note AutoSaves
+        if autosave_mode not in AUTOSAVE_MODES:
+            raise ValueError(f"Unsupported autosave mode `{autosave_mode}`, expected one of {AUTOSAVE_MODES}")
+        self.autosave_mode = autosave_mode
+
         self.headers = {
             "Host": domain.replace("https://", ""),
             "User-Agent": self.user_agent,
@@ -69,40 +147,191 @@ class OncoEmrIntegration(Integration):
             token: str,
             location_id: str,
             network_requester=None,
-            user_agent: str = UserAgent().random,
+            user_agent: Optional[str] = None,
+            connector_limit: int = 100,
+            connector_limit_per_host: int = 30,
+            keepalive_timeout: float = 30.0,
+            request_timeout: float = 300.0,
+            scheduler: Optional[AdaptiveRequestScheduler] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            reference_data_ttls: Optional[Dict[str, float]] = None,
+            metrics: Optional[MetricsRegistry] = None,
+            request_hooks: Optional[List[RequestHook]] = None,
+            html_parser: str = DEFAULT_HTML_PARSER,
+            parse_executor: Optional[ParseExecutor] = None,
+            autosave_mode: str = "full",
     ):
-        """Async factory method that ensures state data is loaded before returning the instance"""
+        """
+        Async factory method that ensures state data is loaded before returning the instance.
+
+        The returned instance owns a pooled HTTP session, so it should either be used as
+        an async context manager (`async with await OncoEmrIntegration.create(...)`)
+        or closed explicitly with `aclose()`.
+        """
         instance = cls(
             domain=domain,
             token=token,
             location_id=location_id,
             network_requester=network_requester,
             user_agent=user_agent,
+            connector_limit=connector_limit,
+            connector_limit_per_host=connector_limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            request_timeout=request_timeout,
+            scheduler=scheduler,
+            retry_policy=retry_policy,
+            reference_data_ttls=reference_data_ttls,
+            metrics=metrics,
+            request_hooks=request_hooks,
+            html_parser=html_parser,
+            parse_executor=parse_executor,
+            autosave_mode=autosave_mode,
         )
-        await instance._load_state_data()
+        try:
+            await instance._load_state_data()
+        except BaseException:
+            await instance.aclose()
+            raise
         return instance
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Closes the pooled HTTP session and releases its connections."""
+        await self._reference_data.aclose()
+        session = self._session
+        self._session = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared session, creating it (and its connection pool) on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connector_limit,
+                limit_per_host=self.connector_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                trace_configs=[build_trace_config()],
+            )
+        return self._session
+
+    def add_request_hook(self, hook: RequestHook):
+        """Registers a callable that receives a `RequestEvent` for every HTTP attempt."""
+        self.request_hooks.append(hook)
+
+    def _emit_request_event(self, event: RequestEvent):
+        for hook in self.request_hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Request hook {hook!r} failed: {e}")
+
     async def _make_request(
-            self, method: str, url: str, **kwargs
+            self, method: str, url: str, idempotent: Optional[bool] = None, coalesce: bool = True, **kwargs
     ) -> dict | str | bytes:
-        if self.network_requester is not None:
-            response = await self.network_requester.request(
-                method, url, process_response=self._handle_response, **kwargs
+        """
+        Sends a request, retrying transient failures according to `self.retry_policy`.
+
+        Identical idempotent GETs that are already in flight are coalesced, so one
+        network call serves every concurrent caller (see `request_key`).
+
+        `idempotent` defaults to True for GET/HEAD/OPTIONS; pass it explicitly for
+        read-only POSTs or for GETs that write (the AJAX `M=s...RS` endpoints).
+        Pass `coalesce=False` for GETs whose every response must be distinct, like the
+        blank note forms, which each carry the GUID of a new note.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        if coalesce and idempotent and method.upper() == "GET":
+            key = request_key(method, url, kwargs.get("params"))
+            return await self._single_flight.do(
+                key, lambda: self._request_with_retry(method, url, idempotent, **kwargs)
             )
-            return response
-        else:
-            async with aiohttp.ClientSession() as session:
-                async with session.request(method, url, **kwargs) as response:
-                    return await self._handle_response(response)
+        return await self._request_with_retry(method, url, idempotent, **kwargs)
 
-    async def _handle_response(self, response: aiohttp.ClientResponse):
-        if response.status == 200:
+    async def _request_with_retry(
+            self, method: str, url: str, idempotent: bool, **kwargs
+    ) -> dict | str | bytes:
+        budget = current_retry_budget() or self.retry_policy.new_budget()
+
+        attempt = 1
+        while True:
             try:
-                data = await response.json()
-            except (json.decoder.JSONDecodeError, aiohttp.ContentTypeError):
-                data = await response.text()
+                return await self._send_request(method, url, retries=attempt - 1, **kwargs)
+            except Exception as e:
+                if (
+                        attempt >= self.retry_policy.max_attempts
+                        or not self.retry_policy.is_retryable(e, idempotent)
+                        or not budget.try_spend()
+                ):
+                    raise
+            await asyncio.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
 
-            return data
+    async def _send_request(
+            self, method: str, url: str, retries: int = 0, **kwargs
+    ) -> dict | str | bytes:
+        timings = RequestTimings()
+        status = None
+        error = None
+        endpoint = endpoint_template(url, kwargs.get("params"))
+        started = time.perf_counter()
+        try:
+            async with self.scheduler.slot(urlsplit(url).netloc, endpoint):
+                # time spent queued in the scheduler is not request latency
+                started = time.perf_counter()
+                if self.network_requester is not None:
+                    response = await self.network_requester.request(
+                        method, url, process_response=self._handle_response, **kwargs
+                    )
+                    status = 200
+                    return response
+                else:
+                    session = self._get_session()
+                    async with session.request(
+                            method, url, trace_request_ctx=timings, **kwargs
+                    ) as response:
+                        status = response.status
+                        return await self._handle_response(response)
+        except BaseException as e:
+            error = type(e).__name__
+            status = status or getattr(e, "status_code", None)
+            raise
+        finally:
+            self._emit_request_event(
+                RequestEvent(
+                    endpoint=endpoint,
+                    method=method.upper(),
+                    status=status,
+                    total=time.perf_counter() - started,
+                    retries=retries,
+                    bytes_received=timings.bytes_received if timings.started is not None else None,
+                    bytes_sent=timings.bytes_sent if timings.started is not None else None,
+                    dns=timings.dns,
+                    connect=timings.connect,
+                    ttfb=timings.ttfb,
+                    error=error,
+                )
+            )
+
+    async def _handle_response(self, response: aiohttp.ClientResponse):
+        if response.status == 200:
+            body = await response.read()
+            return decode_response_body(
+                body,
+                content_type=response.content_type,
+                charset=response.charset,
+                json_endpoint=is_json_endpoint(str(response.url)),
+            )
 
         if response.status == 401:
             raise IntegrationAuthError(
@@ -127,7 +356,7 @@ class OncoEmrIntegration(Integration):
     async def _load_state_data(self):
         path = self.url + "/nav"
         response = await self._make_request("GET", path, headers=self.headers)
-        soup = self._create_soup(response)
+        soup = self._create_soup(response, self.html_parser)
 
         data_script = soup.find("script", id="json:piwikOptions")
         data = json.loads(data_script.text.strip())
@@ -153,7 +382,20 @@ class OncoEmrIntegration(Integration):
             message=f"Patient not found for ID: `{patient_id}`",
         )
 
+    def invalidate_reference_data(self, catalog: Optional[str] = None):
+        """
+        Drops cached reference data so the next call downloads it again.
+
+        Args:
+            catalog: One of `physicians`, `note_types`, `order_types`, `order_sets`,
+                or None to drop all of them.
+        """
+        self._reference_data.invalidate(catalog)
+
     async def _get_physicians(self) -> List[Dict]:
+        return await self._reference_data.get("physicians", self._download_physicians)
+
+    async def _download_physicians(self) -> List[Dict]:
         path = self.url + "/User/PhysicianUsers"
         headers = self.headers.copy()
         headers["X-Requested-With"] = "XMLHttpRequest"
@@ -161,6 +403,7 @@ class OncoEmrIntegration(Integration):
         response = await self._make_request("GET", url=path, headers=headers)
         return response
 
+    @retry_budget_scope
     async def fetch_physicians(self):
         physicians = await self._get_physicians()
 
@@ -177,6 +420,7 @@ class OncoEmrIntegration(Integration):
 
         return processed
 
+    @retry_budget_scope
     async def fetch_visit_list(self, doctor_ids: List[str], selected_date: str | None):
         doctors_list = await self.fetch_physicians()
         providers = []
@@ -228,7 +472,7 @@ class OncoEmrIntegration(Integration):
         else:
             visit_html = response
 
-        parsed_visit_list = self._parse_patient_table(visit_html)
+        parsed_visit_list = await self.parse_executor.run(self._parse_patient_table, visit_html)
         return parsed_visit_list
 
     async def _basic_patient_demographics_data(self, patient_id: str) -> dict:
@@ -297,6 +541,7 @@ class OncoEmrIntegration(Integration):
         )
         return response
 
+    @retry_budget_scope
     async def fetch_patient_demographics(self, patient_id: str):
         await self._verify_patient_exists(patient_id=patient_id)
 
@@ -308,7 +553,7 @@ class OncoEmrIntegration(Integration):
             }
 
         demo_html = await self._patient_demographics_html(patient_id)
-        demo_soup = self._create_soup(demo_html)
+        demo_soup = self._create_soup(demo_html, self.html_parser)
 
         employer_elem = demo_soup.find("span", id="lblEmployer")
         employer = employer_elem.text.strip() if employer_elem else None
@@ -393,16 +638,15 @@ class OncoEmrIntegration(Integration):
         response = await self._make_request(
             "GET", path, params=params, headers=self.headers
         )
-        soup = self._create_soup(response)
-        note_elems = soup.select("a.PDMenu")
+        note_anchors = await self.parse_executor.run(self._parse_note_menu, response, self.html_parser)
         notes_list = []
 
         pattern1 = r'editDoc\("([^"]+)"\)'
         pattern2 = r'window\.openDocumentViewer\("([^"]+)",\s*"([^"]+)"'
 
-        for note_elem in note_elems:
-            name = note_elem.text.strip()
-            onclick = note_elem.get("onclick")
+        for note_anchor in note_anchors:
+            name = note_anchor["text"]
+            onclick = note_anchor["onclick"]
             note_id = None
 
             # Try first pattern
@@ -447,6 +691,7 @@ class OncoEmrIntegration(Integration):
             "file": note_path,
         }
 
+    @retry_budget_scope
     async def fetch_patient_notes(self, patient_id: str):
         await self._verify_patient_exists(patient_id=patient_id)
 
@@ -476,25 +721,29 @@ class OncoEmrIntegration(Integration):
             "_SK": "",
             "__full": "true",
         }
+        # a blank form mints the GUID of a new note, so concurrent loads must not share one
         response = await self._make_request(
-            "GET", path, params=params, headers=self.headers
+            "GET", path, params=params, headers=self.headers, coalesce=False
         )
         return response
 
-    async def make_followup_note(self, template: FollowupNoteTemplateModel):
+    @retry_budget_scope
+    async def make_followup_note(self, template: FollowupNoteTemplateModel | SparseTemplate):
+        from submodule_integrations.oncoemr.oncoemr_mapping import (
+            FOLLOWUP_TEXTFIELDS_MAPPING,
+            FOLLOWUP_RADIO_BUTTONS_MAPPING,
+            FOLLOWUP_CHECKBOXES_MAPPING,
+        )
+
         patient_id = template.patient_id
         await self._verify_patient_exists(patient_id=patient_id)
 
         note_page = await self._followup_note_page(patient_id=patient_id)
 
-        note_soup = self._create_soup(note_page)
-        note_guid_elem = note_soup.select_one("input#txtNoteGUID")
-        note_guid = note_guid_elem.get("value")
-
-        note_form_id_elem = note_soup.select_one("input#txtFormID")
-        note_form_id = note_form_id_elem.get("value")
-
-        existing_data = self._extract_form_data_bs(note_page)
+        page = await self._read_note_page(note_page)
+        note_guid = page.guid
+        note_form_id = page.form_id
+        existing_data = page.form_data
 
         filled_template = self._apply_template_to_dict(
             template_model=template,
@@ -503,6 +752,7 @@ class OncoEmrIntegration(Integration):
             radio_buttons_mapping=FOLLOWUP_RADIO_BUTTONS_MAPPING,
             textfields_mapping=FOLLOWUP_TEXTFIELDS_MAPPING,
         )
+        filled_template = self._autosave_fields(filled_template, baseline=existing_data)
         output_parts = [f"{k}%01{v}" for k, v in filled_template.items()]
         output_string = "%02".join(output_parts)
 
@@ -563,25 +813,29 @@ PRINT
             "_SK": "",
             "__full": "true",
         }
+        # a blank form mints the GUID of a new note, so concurrent loads must not share one
         response = await self._make_request(
-            "GET", path, params=params, headers=self.headers
+            "GET", path, params=params, headers=self.headers, coalesce=False
         )
         return response
 
-    async def make_consultation_note(self, template: ConsultationNoteTemplateModel):
+    @retry_budget_scope
+    async def make_consultation_note(self, template: ConsultationNoteTemplateModel | SparseTemplate):
+        from submodule_integrations.oncoemr.consultation_mappings import (
+            CONSULTATION_TEXTFIELDS_MAPPING,
+            CONSULTATION_RADIO_BUTTONS_MAPPING,
+            CONSULTATION_CHECKBOXES_MAPPING,
+        )
+
         patient_id = template.patient_id
         await self._verify_patient_exists(patient_id=patient_id)
 
         note_page = await self._initial_consultation_note_page(patient_id=patient_id)
 
-        note_soup = self._create_soup(note_page)
-        note_guid_elem = note_soup.select_one("input#txtNoteGUID")
-        note_guid = note_guid_elem.get("value")
-
-        note_form_id_elem = note_soup.select_one("input#txtFormID")
-        note_form_id = note_form_id_elem.get("value")
-
-        existing_data = self._extract_form_data_bs(note_page)
+        page = await self._read_note_page(note_page)
+        note_guid = page.guid
+        note_form_id = page.form_id
+        existing_data = page.form_data
         filled_template = self._apply_template_to_dict(
             template_model=template,
             target_dict=existing_data,
@@ -589,6 +843,7 @@ PRINT
             radio_buttons_mapping=CONSULTATION_RADIO_BUTTONS_MAPPING,
             textfields_mapping=CONSULTATION_TEXTFIELDS_MAPPING,
         )
+        filled_template = self._autosave_fields(filled_template, baseline=existing_data)
         output_parts = [f"{k}%01{v}" for k, v in filled_template.items()]
         output_string = "%02".join(output_parts)
 
@@ -642,6 +897,9 @@ PRINT
             )
 
     async def _fetch_available_note_types(self):
+        return await self._reference_data.get("note_types", self._download_available_note_types)
+
+    async def _download_available_note_types(self):
         params = {
             'FT': 'VisitNote',
             'AJAX': '1',
@@ -654,7 +912,7 @@ PRINT
         response = await self._make_request(
             "GET", path, params=params, headers=self.headers
         )
-        soup = self._create_soup(response.get("Payload"))
+        soup = self._create_soup(response.get("Payload"), self.html_parser)
         options = []
 
         # Extract all option elements
@@ -666,6 +924,7 @@ PRINT
 
         return options
 
+    @retry_budget_scope
     async def fetch_note_types(self):
         options = await self._fetch_available_note_types()
         cleaned = []
@@ -690,11 +949,25 @@ PRINT
                 "_SK": "",
                 "__full": "true",
             }
+        # a blank form mints the GUID of a new note, so concurrent loads must not share one
         response = await self._make_request(
-            "GET", path, params=params, headers=self.headers
+            "GET", path, params=params, headers=self.headers, coalesce=bool(note_id)
         )
         return response
 
+    async def _fetch_note_page(
+            self, template_id: str, patient_id: str, note_id: str = None
+    ) -> Union[NotePage, NotePageData]:
+        """The parsed note page, requested and parsed once per operation."""
+
+        async def download():
+            note_page = await self._get_note_page(template_id=template_id, patient_id=patient_id, note_id=note_id)
+            return await self._read_note_page(note_page, template_id=template_id)
+
+        return await once_per_operation(("note_page", template_id, patient_id, note_id), download)
+
+    @retry_budget_scope
+    @operation_scope
     async def generic_notes_submit(self, note_name: str, patient_id: str, fields: dict, created_on: str = None,
                                    forward_to: str = None, note_category: str = None):
         # created_on: MM/DD/YYYY
@@ -736,11 +1009,10 @@ PRINT
             print(cur_note_id)
             cur_note_id = None
 
-        note_page = await self._get_note_page(
+        page = await self._fetch_note_page(
             template_id=selected_note["value"], patient_id=patient_id, note_id=cur_note_id
         )
-        note_soup = self._create_soup(note_page)
-        existing_data = self._extract_form_data_bs(note_page)
+        existing_data = page.form_data
 
         # break down `fields` into `textfields`, `radio_buttons`, and `checkboxes`
         submit_textfields = fields.get("textfields")
@@ -761,7 +1033,7 @@ PRINT
         checkboxes_data = self._prepare_toggle_input_dict(data=submit_checkboxes, prefix="FD_chk")
 
         # get ONT template used for this note form
-        this_ont_template = self._parse_note_ont_template(note_soup)
+        this_ont_template = page.ont_templates
 
         # merge new checkbox and radio button values into existing data
         updated_data.update(radio_buttons_data)
@@ -784,13 +1056,13 @@ PRINT
             if "fd_gs" in k_id.lower():
                 # specifically for pain and phq scale inputs
                 pain_scale_id = "FD_gsGSPaiComparativePainScale"
-                pain_scale_input = note_soup.select_one(f"input#{pain_scale_id}")
+                pain_scale_input = page.find_input(pain_scale_id)
                 if k_id == pain_scale_id and pain_scale_input:
                     prefix = this_ont_template.get(k_id.replace("FD_gs", ""))
                     updated_data['FD_txtPain'] = f"{prefix} {k_value}"
 
         for r_id, r_val in radio_buttons_data.items():
-            radio_elem = note_soup.find("input", id=r_id)
+            radio_elem = page.find_input(r_id)
             prnt_location = radio_elem.get("prnt")
             if prnt_location:
                 r_val_str = f"{r_val}%01{prnt_location}"
@@ -803,7 +1075,7 @@ PRINT
 
         # go over checkboxes and find if they print to any textfield
         for c_id, c_val in checkboxes_data.items():
-            c_elem = note_soup.find("input", id=c_id)
+            c_elem = page.find_input(c_id)
             prnt_location = c_elem.get("prnt")
             if prnt_location:
                 # append print location to value
@@ -826,14 +1098,13 @@ PRINT
                 updated_data[itb_id] = f"{existing_itb_val if existing_itb_val else ''}%01{prnt_location}"
 
             if c_val is True or c_val == "true":
-                label_elem = note_soup.find('label', {'for': c_id})
-                label = label_elem.text.strip() if label_elem else ""
+                label = page.input_label(c_id) or ""
                 prnt_location = f"FD_txt{prnt_location}"
 
                 # # handle itb data; checkbox text
                 if itb_value:
                     checkbox_text = self._build_text_with_ont_template(
-                        templates=self._parse_note_ont_template(note_soup),
+                        templates=this_ont_template,
                         template_key=c_id.replace('FD_chk', ''),
                         value=itb_value
                     )
@@ -850,27 +1121,22 @@ PRINT
 
                 updated_data[prnt_location] = label
 
-        applied_parts = []
-        for k, v in updated_data.items():
-            # strip all `+` from text and encode spaces correctly
-            v = self._encode_spaces_only(v)
-            encoded_value = self._quote_uppercase(v, safe="%*()'")
-            # converting encoded single quotes to double quotes
-            encoded_value = encoded_value.replace("%27", '%22')
-            applied_parts.append(f"{k}%01{encoded_value}")
-
-        applied_string = "%02".join(applied_parts)
+        # what the unchanged note would send; the medications grid is re-encoded either way
+        baseline_data = existing_data
+        if existing_data.get("FD_grdMedicationsGrid"):
+            baseline_data = dict(existing_data)
+            baseline_data["FD_grdMedicationsGrid"] = self._quote_uppercase(
+                existing_data["FD_grdMedicationsGrid"], safe="*()"
+            )
 
-        note_soup = self._create_soup(note_page)
-        note_guid_elem = note_soup.select_one("input#txtNoteGUID")
-        note_guid = note_guid_elem.get("value")
+        # `+` and spaces as `%20`, quoted with uppercase escapes, `%27` as `%22`
+        applied_string = encode_name_values(self._autosave_fields(updated_data, baseline=baseline_data))
 
-        note_form_id_elem = note_soup.select_one("input#txtFormID")
-        note_form_id = note_form_id_elem.get("value")
+        note_guid = page.guid
+        note_form_id = page.form_id
 
         if note_category is None:
-            note_category_elem = note_soup.select_one("input#txtCategory")
-            note_category = note_category_elem.get("value")
+            note_category = page.category
 
         date_pattern = re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")
         if created_on:
@@ -949,6 +1215,72 @@ PRINT
                 message=f"Failed to process note: {response}",
             )
 
+    async def generic_notes_submit_many(self, items: List[Dict], concurrency: int = 4) -> List[Dict]:
+        """
+        Submits several notes with at most `concurrency` submissions in flight.
+
+        Reference catalogs are loaded once up front and shared by every item, and items
+        for the same patient and note run one after the other so they do not race on the
+        patient's latest note. A failing item does not stop the others.
+
+        Args:
+            items: Keyword arguments of `generic_notes_submit` per note: `note_name`,
+                `patient_id`, `fields` and optionally `created_on`, `forward_to` and
+                `note_category`.
+            concurrency: Most submissions running at once.
+
+        Returns:
+            One result per item, in item order, with its `patient_id` and `note_name` and
+            either `success: True` or `success: False` and an `error` dictionary.
+        """
+        if concurrency < 1:
+            raise ValueError(f"`concurrency` must be at least 1, got {concurrency}")
+
+        # one load per catalog for the whole batch; items retry their own loads if this fails
+        catalogs = [self._fetch_available_note_types()]
+        if any(item.get("forward_to") for item in items):
+            catalogs.append(self._get_physicians())
+        await asyncio.gather(*catalogs, return_exceptions=True)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        locks: Dict[tuple, asyncio.Lock] = {}
+
+        async def submit(item: Dict) -> Dict:
+            note_key = re.sub(r"[^a-z0-9]", "", str(item.get("note_name")).lower())
+            lock = locks.setdefault((item.get("patient_id"), note_key), asyncio.Lock())
+            result = {"patient_id": item.get("patient_id"), "note_name": item.get("note_name")}
+            # the patient lock is taken before a slot, so a waiting item never holds one
+            async with lock, semaphore:
+                try:
+                    result.update(await self.generic_notes_submit(**item))
+                except Exception as e:
+                    result.update({
+                        "success": False,
+                        "error": self._batch_item_error(e, f"Note submission for patient `{result['patient_id']}`"),
+                    })
+            return result
+
+        return list(await asyncio.gather(*(submit(item) for item in items)))
+
+    @staticmethod
+    def _batch_item_error(error: Exception, action: str) -> Dict:
+        """
+        Logs the failure of one item of a batch method and describes it for the item's result.
+
+        Args:
+            error: What the item raised.
+            action: What failed, e.g. "Note submission for patient `P_1`".
+
+        Returns:
+            dict: The `status_code`, `error_code` and `message` of the error.
+        """
+        print(f"{action} failed: {error}")
+        return {
+            "status_code": getattr(error, "status_code", None),
+            "error_code": getattr(error, "error_code", None),
+            "message": getattr(error, "message", None) or str(error),
+        }
+
     async def _forward_note(self, forward_to, note_name, patient_id, selected_note):
         forward_params = {
             'AJAX': '1',
@@ -958,7 +1290,9 @@ PRINT
             '_': f'{int(time.time() * 1000)}',
         }
         path = self.url + "/pages_pd/PD_DocForwardDB.aspx"
-        forward_response = await self._make_request('GET', path, params=forward_params, headers=self.headers)
+        forward_response = await self._make_request(
+            'GET', path, params=forward_params, headers=self.headers, idempotent=False
+        )
         fr_data = json.loads(forward_response)
         if fr_data.get('Success'):
             forward_status = True
@@ -966,8 +1300,50 @@ PRINT
             forward_status = False
         return forward_status
 
+    @retry_budget_scope
+    @operation_scope
     async def generic_notes_fetch(self, note_name: str, patient_id: str):
         await self._verify_patient_exists(patient_id=patient_id)
+        return await self._read_generic_note(note_name=note_name, patient_id=patient_id)
+
+    @retry_budget_scope
+    @operation_scope
+    async def generic_notes_fetch_many(self, patient_id: str, note_names: List[str]) -> List[Dict]:
+        """
+        Fetches several notes of one patient, like `generic_notes_fetch` per note name.
+
+        The patient check, the note types and the notes list are read once for all notes,
+        and the note pages are downloaded concurrently. A note that cannot be read does
+        not stop the others.
+
+        Args:
+            patient_id: The patient whose notes are read.
+            note_names: Names of the note types to read.
+
+        Returns:
+            One result per note name, in order: the `generic_notes_fetch` result, or the
+            `patient_id`, the requested `note_name` and an `error` dictionary.
+
+        Raises:
+            IntegrationAPIError: If the patient does not exist.
+        """
+        await self._verify_patient_exists(patient_id=patient_id)
+        # shared by every note: one load of the note types and one read of the notes list
+        await asyncio.gather(self._fetch_available_note_types(), self._fetch_unsigned_notes(patient_id))
+
+        async def fetch(note_name: str) -> Dict:
+            try:
+                return await self._read_generic_note(note_name=note_name, patient_id=patient_id)
+            except Exception as e:
+                return {
+                    "patient_id": patient_id,
+                    "note_name": note_name,
+                    "error": self._batch_item_error(e, f"Note fetch of `{note_name}` for patient `{patient_id}`"),
+                }
+
+        return list(await asyncio.gather(*(fetch(note_name) for note_name in note_names)))
+
+    async def _read_generic_note(self, note_name: str, patient_id: str) -> Dict:
         note_types = await self._fetch_available_note_types()
 
         selected_note = next(
@@ -988,11 +1364,10 @@ PRINT
 
         cur_note_id = await self._fetch_latest_note_id(patient_id=patient_id, note_name=note_name)
 
-        note_page = await self._get_note_page(
+        page = await self._fetch_note_page(
             template_id=selected_note["value"], patient_id=patient_id, note_id=cur_note_id
         )
-        note_soup = self._create_soup(note_page)
-        existing_data = self._extract_form_data_bs(note_page)
+        existing_data = page.form_data
 
         textfield_id_label_pairs = {}
         textfield_label_value_pairs = {}
@@ -1002,7 +1377,7 @@ PRINT
 
         for key, value in existing_data.items():
             if "fd_txt" in key.lower():
-                label = self._get_label_for_textarea(textarea_id=key, soup=note_soup)
+                label = page.textarea_label(key)
                 if label is None:
                     continue
                 if "invisible" in label.lower():
@@ -1017,7 +1392,7 @@ PRINT
                 textfield_label_value_pairs[new_key] = value
 
             if "fd_chk" in key.lower():
-                chk_box_label = self._get_label_for_input_button(inp_id=key, soup=note_soup)
+                chk_box_label = page.input_label(key)
                 if chk_box_label is None:
                     continue
 
@@ -1029,7 +1404,7 @@ PRINT
                 # check if checkbox has text input with type `FD_itb`
                 itb_id = key.replace('FD_chk', 'FD_itb')
                 if itb_id in existing_data:
-                    itb_elem = note_soup.find("input", {"id": itb_id})
+                    itb_elem = page.find_input(itb_id)
                     itb_value = itb_elem.get("oldvalue") if itb_elem else None
                     # windy way, this is basically; value or old_value or ''
                     checkbox_pairs[new_key]["text"] = existing_data.get(itb_id) or itb_value or ''
@@ -1037,13 +1412,13 @@ PRINT
                         checkbox_pairs[new_key]["value"] = True
 
             if "fd_rdo" in key.lower():
-                rdo_group_name = self._get_radio_button_group_name(rdo_id=key, soup=note_soup)
+                rdo_group_name = page.radio_group_name(key)
                 if rdo_group_name is None:
                     continue
                 rdo_group_name = rdo_group_name.replace('FD_rdo', '')
                 rdo_group_dict = radio_button_collection.get(rdo_group_name, {})
 
-                rdo_btn_label = self._get_label_for_input_button(inp_id=key, soup=note_soup)
+                rdo_btn_label = page.input_label(key)
                 if rdo_btn_label is None:
                     continue
 
@@ -1056,35 +1431,15 @@ PRINT
                 radio_button_collection[rdo_group_name] = rdo_group_dict
 
         # logic for checkboxes within tables
-        tables_collection = {}
-        grid_tables = note_soup.select('table[id*="Grid"]')
-        fax_table = note_soup.select_one('table[id="tblFaxRecipients"]')
-        if fax_table:
-            grid_tables.append(fax_table)
-
-        for grid_table in grid_tables:
-            if grid_table is None:
-                # completely not needed but left on purpose just in case
-                # already had it trigger an error on one random note type
-                continue
-
-            table_data = self._parse_grid_table(table=grid_table)
-            if len(table_data) == 0:
-                continue
-
-            table_id = grid_table.get('id')
-            table_id = table_id.replace('tbl', '')
-
-            tables_collection[table_id] = table_data
+        tables_collection = page.grid_tables
 
         # logic for pain scale selection
         pain_scale_collection = {}
-        pain_scale_table = note_soup.select_one('table#tbl_gsGSPaiComparativePainScale')
-        if pain_scale_table is not None:
-            pain_score_elem = note_soup.select_one('input#FD_gsGSPaiComparativePainScale')
+        pain_scale_table_data = page.table_row_texts('tbl_gsGSPaiComparativePainScale')
+        if pain_scale_table_data is not None:
+            pain_score_elem = page.find_input('FD_gsGSPaiComparativePainScale')
             pain_score = pain_score_elem.get('value') if pain_score_elem else ''
 
-            pain_scale_table_data = [row.text.strip() for row in pain_scale_table.select('tr')]
             for row in pain_scale_table_data:
                 if '\n' in row:
                     k, v = row.split('\n')
@@ -1095,12 +1450,11 @@ PRINT
 
         # logic for phq scale on secure30
         phq_scale_collection = {}
-        phq_scale_table = note_soup.select_one('table#tbl_gsGSDepPHQ-9')
-        if phq_scale_table is not None:
-            phq_score_elem = note_soup.select_one('input#FD_gsGSDepPHQ-9')
+        phq_scale_table_data = page.table_row_texts('tbl_gsGSDepPHQ-9')
+        if phq_scale_table_data is not None:
+            phq_score_elem = page.find_input('FD_gsGSDepPHQ-9')
             phq_score = phq_score_elem.get('value') if phq_score_elem else ''
 
-            phq_scale_table_data = [row.text.strip() for row in phq_scale_table.select('tr')]
             for row in phq_scale_table_data:
                 if '\n' in row:
                     k, v = row.split('\n')
@@ -1110,11 +1464,8 @@ PRINT
                     # else:
                     phq_scale_collection[v] = False
 
-        note_category_elem = note_soup.select_one("input#txtCategory")
-        note_category = note_category_elem.get("value")
-
-        updated_note_name_elem = note_soup.select_one("span#spnPageTitle")
-        updated_note_name = updated_note_name_elem.text.strip()
+        note_category = page.category
+        updated_note_name = page.page_title
 
         result = {
             "patient_id": patient_id,
@@ -1133,6 +1484,17 @@ PRINT
         return result
 
     async def _fetch_latest_note_id(self, patient_id: str, note_name: str, get_newest: bool = True):
+        return await once_per_operation(
+            ("latest_note_id", patient_id, note_name, get_newest),
+            lambda: self._find_latest_note_id(patient_id, note_name, get_newest),
+        )
+
+    async def _fetch_unsigned_notes(self, patient_id: str) -> List[Dict[str, str]]:
+        return await once_per_operation(
+            ("unsigned_notes", patient_id), lambda: self._download_unsigned_notes(patient_id)
+        )
+
+    async def _download_unsigned_notes(self, patient_id: str) -> List[Dict[str, str]]:
         endpoint = "/WebForms/pages_pd/PD_DocMDMain.aspx"
         path = self.url + endpoint
         params = {
@@ -1145,10 +1507,10 @@ PRINT
         response = await self._make_request(
             "GET", path, params=params, headers=self.headers
         )
-        soup = self._create_soup(response)
+        return await self.parse_executor.run(self._parse_note_menu, response, self.html_parser, True)
 
-        unsigned_notes_tab = soup.select_one("div#pnlEditUnsigned")
-        note_anchors = unsigned_notes_tab.select("a.PDMenu")
+    async def _find_latest_note_id(self, patient_id: str, note_name: str, get_newest: bool = True):
+        note_anchors = await self._fetch_unsigned_notes(patient_id)
 
         """
         Logic: 
@@ -1158,7 +1520,7 @@ PRINT
 
         latest_anchor = None
         for anchor in note_anchors:
-            anchor_name = anchor.text.strip()
+            anchor_name = anchor["text"]
             anchor_name = anchor_name.split(" ", 1)[1]
             if self._fuzzy_compare(note_name, anchor_name):
                 latest_anchor = anchor
@@ -1171,12 +1533,41 @@ PRINT
         if latest_anchor is None:
             return None
 
-        onclick = latest_anchor.get("onclick")
+        onclick = latest_anchor["onclick"]
         match = re.search(r'editDoc\("([^"]+)"\)', onclick)
         doc_id = match.group(1) if match else None
         print(f"Latest note ID for ({note_name}): {doc_id}")
         return doc_id
 
+    @staticmethod
+    def _parse_note_menu(html_content: str, parser: str, unsigned_only: bool = False) -> List[Dict[str, str]]:
+        """
+        Text and onclick handler of the note menu anchors (`a.PDMenu`) of the notes list page.
+
+        Only the anchors, or with `unsigned_only` the unsigned notes tab, are built into the tree.
+        """
+        if unsigned_only:
+            soup = OncoEmrIntegration._create_soup(
+                html_content, parser, parse_only=bs4.SoupStrainer("div", id="pnlEditUnsigned")
+            )
+            unsigned_notes_tab = soup.select_one("div#pnlEditUnsigned")
+            anchors = unsigned_notes_tab.select("a.PDMenu")
+        else:
+            soup = OncoEmrIntegration._create_soup(
+                html_content, parser, parse_only=bs4.SoupStrainer("a", class_=class_matcher("PDMenu"))
+            )
+            anchors = soup.select("a.PDMenu")
+        return [{"text": anchor.text.strip(), "onclick": anchor.get("onclick")} for anchor in anchors]
+
+    def _autosave_fields(self, values: Dict[str, str], baseline: Dict[str, str]) -> Dict[str, str]:
+        """
+        The form fields an AutoSave sends: all of `values`, or in the `diff` autosave mode
+        only those that differ from `baseline`, the values of the unchanged note.
+        """
+        if self.autosave_mode != "diff":
+            return values
+        return {key: value for key, value in values.items() if key not in baseline or baseline[key] != value}
+
     @staticmethod
     def _encode_spaces_only(text: str):
         if not text:
@@ -1189,43 +1580,7 @@ PRINT
 
     @staticmethod
     def _quote_uppercase(text, safe=''):
-        encoded = urllib.parse.quote(text, safe=safe)
-        # Convert %xx to %XX using regex
-        return re.sub(r'%([a-f0-9]{2})', lambda m: f'%{m.group(1).upper()}', encoded)
-
-    @staticmethod
-    def _parse_note_ont_template(soup) -> Dict[str, str]:
-        """Parse oNT assignments from BeautifulSoup object, preserving %% placeholders"""
-        templates = {}
-
-        for script in soup.find_all('script'):
-            if script.string and 'oNT[' in script.string:
-                script_content = script.string
-
-                # Pattern to match: oNT['key']="value";
-                pattern = r'oNT\[([\'"])([^\1]+?)\1\]\s*=\s*([\'"])(.*?)\3;'
-                matches = re.finditer(pattern, script_content, re.DOTALL)
-
-                for match in matches:
-                    key = match.group(2)
-                    value = match.group(4)
-
-                    # Decode JavaScript string (handle unicode escapes, etc.)
-                    # Handle unicode escapes like \u0027 (single quote)
-                    def replace_unicode(match):
-                        return chr(int(match.group(1), 16))
-
-                    # Replace \uXXXX with actual characters
-                    decoded = re.sub(r'\\u([0-9a-fA-F]{4})', replace_unicode, value)
-
-                    # Handle other common escapes
-                    decoded = decoded.replace(r"\'", "'")
-                    decoded = decoded.replace(r'\"', '"')
-                    decoded = decoded.replace(r'\\', '\\')
-
-                    templates[key] = decoded  # Preserves %% placeholders
-
-        return templates
+        return quote_uppercase(text, safe=safe)
 
     @staticmethod
     def _build_text_with_ont_template(template_key: str, value: str, templates: Dict[str, str]) -> str:
@@ -1239,81 +1594,6 @@ PRINT
         else:
             return template
 
-    @staticmethod
-    def _parse_grid_table(table: bs4.Tag):
-        """
-        Parse table with checkboxes into structured data.
-
-        Args:
-            table (str): HTML grid table
-
-        Returns:
-            list: List of row dictionaries with checkbox and column data
-        """
-        # Get header row to map column positions
-        header_row = table.select_one('tr th')
-        headers = []
-        if header_row:
-            headers = [th.get_text(strip=True).lower() for th in table.select('tr th')]
-
-        rows = []
-        data_rows = table.select('tr[id]')  # Any row with an ID
-
-        for row in data_rows:
-            checkboxes = row.select('input[type="Checkbox"]')
-            enabled_checkboxes = []
-
-            for checkbox in checkboxes:
-                if checkbox.get('disabled'):
-                    continue
-                else:
-                    # Find which cell contains this checkbox
-                    parent_cell = checkbox.find_parent('td')
-                    cell_index = 0
-                    if parent_cell:
-                        all_cells = row.select('td')
-                        cell_index = all_cells.index(parent_cell)
-
-                    column_name = headers[cell_index] if cell_index < len(headers) else f"column_{cell_index}"
-
-                    checkbox_data = {
-                        'id': checkbox.get('id', '').replace('FD_chk', ''),
-                        'value': checkbox.has_attr('checked'),
-                        'column': column_name.replace(' ', '_').replace('-', '_')
-                    }
-                    enabled_checkboxes.append(checkbox_data)
-
-            # Skip row if no enabled checkboxes
-            if not enabled_checkboxes:
-                continue
-
-            row_data = {'checkboxes': enabled_checkboxes}
-
-            # Try ID-based extraction first (more reliable)
-            cells = row.select('td[id^="td_"]')
-            if cells:
-                for cell in cells:
-                    cell_id = cell.get('id', '')
-                    # Extract column name from ID pattern (td_..._ColumnName)
-                    parts = cell_id.split('_')
-                    if len(parts) >= 3:
-                        column_name = parts[-1].lower()
-                        row_data[column_name] = cell.get_text(strip=True)
-            else:
-                # Fallback to position-based extraction using headers
-                all_cells = row.select('td')
-                # Skip cells with checkboxes
-                checkbox_cells = len([cell for cell in all_cells if cell.select('input[type="Checkbox"]')])
-                for i, cell in enumerate(all_cells[checkbox_cells:], checkbox_cells):
-                    header_idx = i - checkbox_cells
-                    if header_idx < len(headers):
-                        header = headers[header_idx].replace(' ', '_').replace('-', '_')
-                        row_data[header] = cell.get_text(strip=True)
-
-            rows.append(row_data)
-
-        return rows
-
     @staticmethod
     def _prepare_toggle_input_dict(data: dict, prefix: str):
         updated = {}
@@ -1323,22 +1603,6 @@ PRINT
 
         return updated
 
-    @staticmethod
-    def _get_radio_button_group_name(rdo_id: str, soup: BeautifulSoup):
-        rdo_button = soup.find("input", {"id": rdo_id, "type": "radio"})
-        if rdo_button:
-            return rdo_button.get("name")
-
-        return None
-
-    @staticmethod
-    def _get_label_for_input_button(inp_id: str, soup: BeautifulSoup):
-        label_elem = soup.find("label", {"for": inp_id})
-        if label_elem:
-            return label_elem.text.strip()
-
-        return None
-
     @staticmethod
     def _notes_textfields_merge_id_to_value(id_label: dict, label_value: dict):
         """
@@ -1386,57 +1650,6 @@ PRINT
 
         return result
 
-    @staticmethod
-    def _get_cleaned_text(element: Optional[bs4.Tag]) -> Optional[str]:
-        """Gets stripped text from an element, cleans it, and handles None."""
-        if not element:
-            return None
-        # Use separator=' ' to handle elements broken across lines better
-        text = element.get_text(separator=" ", strip=True)
-        # Remove common action links and extra whitespace more robustly
-        noise_pattern = r"\s*(?:Clear All|Clear|Hide|Neg|NE|Edit|New ICD-10|New Problem/Diagnosis|Write Script|Outside Med|Med Reconcile|Not Documented|New Relative|New Clinical Observation|Create Provider|One-time Recipient)\b"
-        text = re.split(noise_pattern, text, 1)[0]
-        text = text.replace(
-            "\xa0", " "
-        ).strip()  # Replace non-breaking spaces and strip again
-        if text.endswith(":"):
-            text = text[:-1].strip()
-        # Handle cases where only the asterisk might remain after cleaning
-        if text == "*":
-            return None
-        return text if text else None  # Return None if cleaning results in empty string
-
-    @staticmethod
-    def _find_closest_question_table(start_element: bs4.Tag) -> Optional[bs4.Tag]:
-        """Traverse up and find the preceding table likely containing the question name."""
-        current = start_element
-        # Limit upward traversal to avoid crossing major section boundaries if possible
-        max_levels = 10  # Adjust as needed
-        levels = 0
-        while current and current.name != "body" and levels < max_levels:
-            # Check previous siblings first at each level
-            prev_sibling = current.previous_sibling
-            while prev_sibling:
-                if (
-                        isinstance(prev_sibling, bs4.Tag)
-                        and prev_sibling.name == "table"
-                        and "margin-left" in prev_sibling.get("style", "")
-                ):
-                    # Check if it actually contains the question-name span structure
-                    if prev_sibling.select_one("td.bold_text_bar > span.question-name"):
-                        return prev_sibling
-                # Check inside previous sibling if it's a container (less direct, might be needed)
-                # if isinstance(prev_sibling, bs4.Tag):
-                #      found_table = prev_sibling.find('table', style=lambda s: s and 'margin-left:10px' in s)
-                #      if found_table and found_table.select_one('td.bold_text_bar > span.question-name'):
-                #           return found_table
-                prev_sibling = prev_sibling.previous_sibling
-
-            # If not found in siblings, move up
-            current = current.parent
-            levels += 1
-        return None
-
     @staticmethod
     def _get_label(textarea_id: str, soup: bs4.BeautifulSoup) -> Optional[str]:
         potential_div_containers = soup.select('div[id^="divOOH"]')
@@ -1466,152 +1679,6 @@ PRINT
 
         return question_name_element.get_text(strip=True)
 
-    @staticmethod
-    def _get_label_for_textarea(
-            textarea_id: str, soup: bs4.BeautifulSoup
-    ) -> Optional[str]:
-        """
-        Finds the label for a textarea, including its section header,
-        *only if* it's determined to be editable.
-
-        Args:
-            textarea_id: The ID attribute of the textarea element (e.g., "FD_txtFieldName").
-            soup: The BeautifulSoup object containing the parsed HTML.
-
-        Returns:
-            The combined "Header - Label" text, just the label, or just the header,
-            or None if not editable or no label components found.
-        """
-        textarea = soup.find("textarea", id=textarea_id)
-        if not textarea:
-            return None
-
-        field_name = None
-        if textarea_id.startswith("FD_txt"):
-            field_name = textarea_id.replace("FD_txt", "")
-        elif textarea_id.startswith("FD_grd"):  # Explicitly ignore grids here
-            return None  # Grids are not directly editable free text
-
-        # --- Editability Check (based on user's successful logic) ---
-        is_potentially_editable = False
-        if field_name:
-            # Must NOT have labelNoEdit
-            if soup.find("div", id=f"labelNoEdit{field_name}"):
-                return None  # Not editable if labelNoEdit exists
-
-            # Must HAVE either an RTE mount or an Edit button linked
-            has_editor = bool(soup.find("div", id=f"inlineEditorMount{field_name}"))
-            # Check specifically for the pencil icon link associated with editing these fields
-            has_edit_button = bool(
-                soup.find(
-                    "a",
-                    id=lambda x: x
-                                 and x.startswith("inlineEditButton")
-                                 and field_name in x,
-                )
-            )
-            # Looser check for edit button if ID doesn't match exactly
-            if not has_edit_button:
-                # Find parent td/container and check for *any* edit link within it
-                container = textarea.find_parent("td") or textarea.find_parent(
-                    "div", id=f"div{field_name}"
-                )
-                if container:
-                    edit_link = container.find(
-                        "a", class_="text_bar", onclick=lambda x: x and field_name in x
-                    )
-                    has_edit_button = bool(edit_link)
-
-            is_potentially_editable = has_editor or has_edit_button
-
-        if not is_potentially_editable:
-            # print(f"DEBUG: Field {textarea_id} failed editability check (no RTE mount or relevant edit button).")
-            return None
-        # --- End Editability Check ---
-
-        # --- Find Start Element for Searching ---
-        start_element = textarea
-        if field_name:
-            rte_mount = soup.find("div", id=f"inlineEditorMount{field_name}")
-            if rte_mount:
-                start_element = rte_mount
-            else:
-                div_container = textarea.find_parent("div", id=f"div{field_name}")
-                if div_container:
-                    start_element = div_container
-        # --- End Finding Start Element ---
-
-        specific_label_tag: Optional[bs4.Tag] = None
-        section_header_tag: Optional[bs4.Tag] = None
-
-        # --- Find Specific Label (Patterns 1 & 2) ---
-        q_table = OncoEmrIntegration._find_closest_question_table(start_element)
-        if q_table:
-            name_span = q_table.select_one("span.question-name")
-            if name_span:
-                specific_label_tag = name_span
-        else:
-            parent_td = start_element.find_parent("td")
-            if parent_td:
-                prev_td = parent_td.find_previous_sibling("td")
-                if prev_td:
-                    bold_bar = prev_td.find(class_="bold_text_bar")
-                    if bold_bar:
-                        specific_label_tag = bold_bar
-                if not specific_label_tag:
-                    parent_table = parent_td.find_parent("table")
-                    if parent_table:
-                        prev_table = parent_table.find_previous_sibling("table")
-                        if prev_table:
-                            bold_bar = prev_table.find("td", class_="bold_text_bar")
-                            if bold_bar:
-                                specific_label_tag = bold_bar
-        # --- End Specific Label Search ---
-
-        # --- Find Section Header (Pattern 4 Logic - simplified) ---
-        container_div = start_element.find_parent("div", id=re.compile(r"^divOOH_"))
-        if container_div:
-            prev_tag = container_div.find_previous_sibling(
-                True
-            )  # Find previous TAG sibling
-            if prev_tag and (
-                    (
-                            prev_tag.name == "span"
-                            and "SectionDivider" in prev_tag.get("class", [])
-                    )
-                    or (
-                            prev_tag.name == "h2"
-                            and "container-name-header" in prev_tag.get("class", [])
-                    )
-            ):
-                section_header_tag = prev_tag
-        # --- End Section Header Search ---
-
-        # --- Clean and Combine ---
-        specific_label_text = OncoEmrIntegration._get_cleaned_text(specific_label_tag)
-        section_header_text = OncoEmrIntegration._get_cleaned_text(section_header_tag)
-
-        if specific_label_text and specific_label_text.lower().strip() == "this is invisible":
-            if specific_label_tag.select_one('font').get('color') == '#ffffff':
-                specific_label_text = None
-
-        # Combine if both exist
-        if section_header_text and specific_label_text:
-            # Avoid duplication if header and label are accidentally the same
-            if section_header_text.lower() == specific_label_text.lower():
-                return section_header_text
-            else:
-                return f"{section_header_text} - {specific_label_text}"
-        elif specific_label_text:
-            return specific_label_text  # Return only specific label if no header found
-        elif section_header_text:
-            # Less common, but return header if only that was found near an editable field
-            return section_header_text
-        else:
-            # Fallback if absolutely nothing is found (should be rare for editable)
-            # print(f"Warning: No label components found for editable field: {textarea_id}")
-            return field_name  # Return field name as last resort
-
     # async def extract_all_text_fields(self, patient_id: str):
     #     note_types = await self._fetch_available_note_types()
     #     text_fields = []
@@ -1822,6 +1889,7 @@ PRINT
         this_data = next((item for item in codes if item.get("Code") == code), None)
         return this_data
 
+    @retry_budget_scope
     async def set_icd10_code(self, patient_id: str, code: str, add_type: str):
         await self._verify_patient_exists(patient_id=patient_id)
 
@@ -1844,7 +1912,7 @@ PRINT
         }
         path = self.url + "/pages_pd/PD_DiagnosisOncologyICD10DB.aspx"
         response = await self._make_request(
-            "GET", path, params=params, headers=self.headers
+            "GET", path, params=params, headers=self.headers, idempotent=False
         )
         success = response.get("Success")
         return {
@@ -1878,15 +1946,22 @@ PRINT
         return response
 
     async def _fetch_order_types(self):
+        return await self._reference_data.get("order_types", self._download_order_types)
+
+    async def _download_order_types(self):
         path = self.url + "/Orders/OrderTypes/"
         response = await self._make_request("GET", path, headers=self.headers)
         return response
 
     async def _fetch_order_sets(self):
+        return await self._reference_data.get("order_sets", self._download_order_sets)
+
+    async def _download_order_sets(self):
         path = self.url + "/Orders/OrderSets/"
         response = await self._make_request("GET", path, headers=self.headers)
         return response
 
+    @retry_budget_scope
     async def make_order_entry(
             self, patient_id: str, order_name: str, order_type: str, order_date: str
     ):
@@ -2156,6 +2231,7 @@ PRINT
             "success": False,
         }
 
+    @retry_budget_scope
     async def search_patient_by_names(
             self, first_name: str = "", last_name: str = "", mrn: str = ""
     ) -> list[dict]:
@@ -2180,11 +2256,11 @@ PRINT
         }
         path = self.url + "/FindPatient/GetPatientList"
         response = await self._make_request(
-            "POST", path, params=params, data=data, headers=self.headers
+            "POST", path, params=params, data=data, headers=self.headers, idempotent=True
         )
         view_html = response.get("sViewHtml")
 
-        found_patients = self._parse_patient_search(view_html)
+        found_patients = await self.parse_executor.run(self._parse_patient_search, view_html)
 
         if len(mrn) != 0:
             exact_patient = next(
@@ -2304,7 +2380,7 @@ PRINT
 
     @staticmethod
     def _apply_template_to_dict(
-            template_model: FollowupNoteTemplateModel | ConsultationNoteTemplateModel,
+            template_model: FollowupNoteTemplateModel | ConsultationNoteTemplateModel | SparseTemplate,
             target_dict: Dict[str, str],
             radio_buttons_mapping: Dict,
             checkboxes_mapping: Dict,
@@ -2314,79 +2390,22 @@ PRINT
         Apply the template model to the target dictionary, handling both text fields and radio buttons.
 
         Args:
-            template_model: The FollowupNoteTemplateModel with user inputs
+            template_model: The FollowupNoteTemplateModel with user inputs, or a `SparseTemplate` of one
             target_dict: The dictionary with the actual field names to modify
 
         Returns:
             Updated dictionary with applied changes
         """
-        result_dict = target_dict.copy()
-
-        # Convert the model to a dict for easier processing
-        model_dict = template_model.model_dump()
-
-        # Process regular text fields
-        for model_field, field_content in model_dict.items():
-            # Skip patient_id and radio button fields
-            if model_field == "patient_id" or model_field in radio_buttons_mapping:
-                continue
-
-            # Skip if no text content to add or not a field content object
-            if not isinstance(field_content, dict) or not field_content.get("text"):
-                continue
-
-            # Get the corresponding field in the target dict
-            if model_field in textfields_mapping:
-                target_field = textfields_mapping[model_field]
-
-                # Only proceed if the target field exists in the dictionary
-                if target_field in result_dict:
-                    if field_content.get("append", True) and result_dict[target_field]:
-                        # Append to existing text with a newline
-                        result_dict[target_field] = (
-                            f"{result_dict[target_field]}\n{field_content['text']}"
-                        )
-                    else:
-                        # Replace the existing text
-                        result_dict[target_field] = field_content["text"]
-
-        # Process radio button fields
-        for field_name, mapping in radio_buttons_mapping.items():
-            selected_value = model_dict.get(field_name)
-
-            if selected_value:
-                options_mapping = mapping["options"]
+        from submodule_integrations.oncoemr.oncoemr_template_plan import template_plan
+        from submodule_integrations.oncoemr.oncoemr_templates import SparseTemplate
 
-                # Skip if the selected value is not in the options
-                if selected_value not in options_mapping:
-                    continue
-
-                # Set all options to false first
-                for option, field_key in options_mapping.items():
-                    if field_key in result_dict:
-                        # Set all options to empty or false
-                        result_dict[field_key] = ""
-
-                # Then set the selected option to true
-                if selected_value in options_mapping:
-                    selected_key = options_mapping[selected_value]
-                    if selected_key in result_dict:
-                        # Set the selected option to true or some value indicating selection
-                        result_dict[selected_key] = "true"
-
-        # Process checkbox fields
-        for field_name, field_key in checkboxes_mapping.items():
-            checkbox_value = model_dict.get(field_name)
-
-            if checkbox_value is not None and field_key in result_dict:
-                if checkbox_value:
-                    # If checkbox is checked, set to "true"
-                    result_dict[field_key] = "true"
-                else:
-                    # If checkbox is not checked, explicitly set to "false"
-                    result_dict[field_key] = "false"
-
-        return result_dict
+        if isinstance(template_model, SparseTemplate):
+            model_class = template_model.model_class
+        else:
+            model_class = type(template_model)
+        # compiled once per model and mappings; only the fields the caller set are visited
+        plan = template_plan(model_class, radio_buttons_mapping, checkboxes_mapping, textfields_mapping)
+        return plan.apply(template_model, target_dict)
 
     # @staticmethod
     # def _remove_html_tags(text):
@@ -2440,68 +2459,25 @@ PRINT
     #     return result.strip()
 
     @staticmethod
-    def _extract_form_data_bs(full_html_string):
+    def _extract_form_data_bs(full_html_string, parser: str = DEFAULT_HTML_PARSER):
         """
-        Extracts form data ONLY for elements with IDs starting with 'FD_',
-        using BeautifulSoup for parsing the entire HTML page. Creates key-value pairs
-        and formats the result.
+        Extracts form data ONLY for elements with IDs starting with 'FD_' from a full HTML page.
+
         Args:
             full_html_string: The entire HTML content of the page as a string.
+            parser: BeautifulSoup tree builder, one of `HTML_PARSERS`.
         Returns:
-            A string formatted as key%01value%02key%01value... or an empty string if no data found.
+            A dictionary of element id to value, or an empty dictionary if no data found.
         """
-        soup = BeautifulSoup(full_html_string, "html.parser")
-        form_data_dict = (
-            {}
-        )  # Use a dictionary to store data (handles potential ID clashes)
-        # --- Find all relevant elements by ID pattern ---
-        # This is more efficient than iterating through ALL tags
-        fd_elements = soup.find_all(id=lambda x: x and x.startswith("FD_"))
-        for element in fd_elements:
-            element_id = element["id"]  # We know ID exists and starts with FD_
-            tag_name = element.name.lower()
-            # --- Textareas ---
-            if tag_name == "textarea":
-                # Get the raw content including HTML tags
-                # Use .string, .text, or join the contents to preserve HTML
-                raw_content = ""
-
-                # Method 1: If the textarea has mixed content (text nodes and tags)
-                for content in element.contents:
-                    raw_content += f"{str(content)}"
-
-                # Now clean up the HTML tags while preserving line breaks
-                form_data_dict[element_id] = raw_content
-            # --- Inputs (Text, Checkbox, Radio, Hidden) ---
-            elif tag_name == "input":
-                input_type = element.get("type", "").lower()
-                if input_type == "text":
-                    value = element.get("value", "")
-                    # Important: Don't overwrite a checkbox/radio state if an input text has the same ID
-                    # (though usually separate IDs like FD_chk... and FD_itb... are used)
-                    if not (
-                            element_id in form_data_dict
-                            and form_data_dict[element_id] in ["true", "false"]
-                    ):
-                        form_data_dict[element_id] = value
-                elif input_type in ["checkbox", "radio"]:
-                    is_checked = element.has_attr("checked")
-                    form_data_dict[element_id] = "true" if is_checked else "false"
-                # Add other input types like 'hidden' if necessary
-                # elif input_type == 'hidden':
-                #     value = element.get('value', '')
-                #     form_data_dict[element_id] = value
-            # Add handling for other tag types like 'select' if needed
-        # --- Format the output ---
-        if not form_data_dict:
-            return {}
-            # Return empty string if nothing found
-        return form_data_dict
+        return dict(NotePage(full_html_string, parser).form_data)
 
     @staticmethod
     def _parse_patient_table(html_content: str) -> List[Dict]:
         """
-        Parse HTML table of patient data using BeautifulSoup.
+        Parse HTML table of patient data.
+
+        The table is read in one streaming pass (see `VisitTableParser`) without
+        building a BeautifulSoup tree; rows come out as a tree search would give them.
 
         Args:
             html_content: HTML string containing the table
@@ -2510,88 +2486,7 @@ PRINT
             List of dictionaries where each dictionary represents a patient row
             with all values as strings
         """
-        soup = OncoEmrIntegration._create_soup(html_content)
-
-        # Find the patient visits table
-        table = soup.find("table", id="tblPatientVisits")
-        if not table:
-            return []
-
-        # Extract headers
-        headers = []
-        header_row = table.find("tr")
-        if header_row:
-            for th in header_row.find_all("th"):
-                # Get text or id as fallback
-                header_text = th.get_text().strip()
-                if not header_text and th.get("id"):
-                    header_text = th.get("id").replace("th", "")
-                headers.append(header_text)
-
-        # Process data rows
-        patients = []
-        for row in table.find_all("tr")[1:]:  # Skip header row
-            patient_data = {}
-
-            # Extract patient ID and name from row attributes
-            pid = row.get("pid", "")
-            p_name = row.get("pnam", "")
-            location = row.get("location", "")
-
-            patient_data["patient_id"] = pid
-            patient_data["patient_name"] = p_name
-            patient_data["location"] = location
-
-            # Extract cell data
-            cells = row.find_all("td")
-            for i, cell in enumerate(cells):
-                if i < len(headers):
-                    # Clean the header name for use as a key
-                    header_key = (
-                        headers[i]
-                        .replace(" ", "_")
-                        .replace("(", "")
-                        .replace(")", "")
-                        .lower()
-                    )
-
-                    # Handle time and patient info specially
-                    if i == 0:
-                        # Time cell
-                        time_link = cell.find("a", class_="gts")
-                        if time_link:
-                            patient_data["appointment_time"] = (
-                                time_link.get_text().strip()
-                            )
-                        else:
-                            patient_data["appointment_time"] = cell.get_text().strip()
-                    elif "patient" in header_key or cell.find("a", id=lambda x: x and x.startswith("ancp")):
-                        # Patient info cell - look for patient link and MRN
-                        patient_link = cell.find("a", id=lambda x: x and x.startswith("ancp"))
-                        if patient_link:
-                            patient_data["patient_display"] = (
-                                patient_link.get_text().strip()
-                            )
-
-                            # Extract MRN from span within patient link
-                            mrn_span = patient_link.find("span")
-                            if mrn_span:
-                                patient_data["mrn"] = mrn_span.get_text().strip()
-                    else:
-                        # Get all text, preserving internal structure but as a string
-                        patient_data[header_key] = cell.get_text().strip()
-
-                        # Extract room status if available
-                        if header_key == "room":
-                            room_link = cell.find("a", class_="room-name")
-                            if room_link:
-                                patient_data["room_status"] = (
-                                    room_link.get_text().strip()
-                                )
-
-            patients.append(patient_data)
-
-        return patients
+        return parse_visit_table(html_content)
 
     @staticmethod
     def _get_current_date(pattern: str = "%m/%d/%Y"):
@@ -2614,7 +2509,9 @@ PRINT
             "disableTpUiChanges": "false",
         }
         path = self.url + "/TreatmentPlan/ModelJson"
-        response = await self._make_request(method="POST", url=path, params=params, headers=self.headers)
+        response = await self._make_request(
+            method="POST", url=path, params=params, headers=self.headers, idempotent=True
+        )
         return response
 
     async def _fetch_patient_orders_json(self, patient_id: str, order_id: str):
@@ -2624,7 +2521,9 @@ PRINT
             "includeHasSchedulerResource": False,
         }
         path = self.url + "/PatientOrders2"
-        response = await self._make_request(method="POST", url=path, json=payload, headers=self.headers)
+        response = await self._make_request(
+            method="POST", url=path, json=payload, headers=self.headers, idempotent=True
+        )
         return response
 
     async def _fetch_activity_order_dialog(self, patient_id: str, order_id: str):
@@ -2643,6 +2542,7 @@ PRINT
         response = await self._make_request(method="GET", url=path, params=params, headers=self.headers)
         return response
 
+    @retry_budget_scope
     async def set_new_cpt_code(self, patient_id: str, cpt_code: str):
         await self._verify_patient_exists(patient_id=patient_id)
 
@@ -2703,7 +2603,7 @@ PRINT
 
         item_1 = order_data[0].get('Item1')
         modal_html = await self._fetch_activity_order_dialog(patient_id=patient_id, order_id=order_id)
-        modal_soup = self._create_soup(modal_html)
+        modal_soup = self._create_soup(modal_html, self.html_parser)
 
         # validate new code
         code_select_elem = modal_soup.select_one("select#ddlChargeCodes")
@@ -2788,6 +2688,31 @@ PRINT
         response = await self._make_request(method="POST", url=path, params=params, data=payload, headers=self.headers)
         return response
 
+    async def _read_note_page(
+            self, note_page: str, template_id: Optional[str] = None
+    ) -> Union[NotePage, NotePageData]:
+        """
+        Parses a note form page with the parse executor.
+
+        With the `template_id` the page was requested for, the page is read against the
+        cached schema of that note template with the same structure, so repeat reads
+        only parse the per-patient values (see `open_note_page`). Inline the page stays a lazily evaluated
+        `NotePage`; off the event loop the worker returns its plain `NotePageData`
+        snapshot, which has the same read methods.
+        """
+        schemas = self._note_templates.get(template_id) if template_id is not None else ()
+        if self.parse_executor.offloaded:
+            page = await self.parse_executor.run(read_note_page, note_page, self.html_parser, schemas)
+        else:
+            page = open_note_page(note_page, self.html_parser, schemas)
+
+        if template_id is not None:
+            # also marks a matched schema as the most recently used of its template
+            self._note_templates.put(template_id, page.schema)
+        return page
+
     @staticmethod
-    def _create_soup(html_content) -> BeautifulSoup:
-        return BeautifulSoup(html_content, "html.parser")
+    def _create_soup(
+            html_content, parser: str = DEFAULT_HTML_PARSER, parse_only: Optional[bs4.SoupStrainer] = None
+    ) -> bs4.BeautifulSoup:
+        return bs4.BeautifulSoup(html_content, parser, parse_only=parse_only)
@@ -0,0 +1,43 @@
+import functools
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns `name` as a module whose code only runs on first attribute access.
+
+    Used for heavy dependencies (bs4) that are not needed until the first
+    response is parsed, so importing the integration stays cheap.
+
+    Raises:
+        ImportError: If the module is not installed.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+@functools.lru_cache(maxsize=None)
+def _user_agent_provider():
+    # fake_useragent loads its browser database on construction
+    from fake_useragent import UserAgent
+
+    return UserAgent()
+
+
+def default_user_agent() -> str:
+    """Random browser user agent; the database is loaded on the first call only."""
+    return _user_agent_provider().random
@@ -0,0 +1,286 @@
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+# seconds; OncoEMR note pages regularly take over a second
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_REPEATED_SLASHES = re.compile(r"/{2,}")
+# the ids OncoEMR puts in paths: GUIDs and prefixed group and user ids (`G_…`, `U_…`)
+_ID_SEGMENT = re.compile(
+    r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|[GU]_[A-Za-z0-9]+)$"
+)
+
+
+@dataclass
+class RequestTimings:
+    """Per-request timing marks filled in by the aiohttp trace callbacks."""
+
+    started: Optional[float] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    bytes_received: int = 0
+    bytes_sent: int = 0
+    _dns_started: Optional[float] = None
+    _connect_started: Optional[float] = None
+
+
+@dataclass
+class RequestEvent:
+    """
+    One HTTP attempt made by the integration.
+
+    Timings are in seconds. `dns`, `connect` and `ttfb` are None when the phase did
+    not happen (a reused pooled connection has no DNS or connect phase) or when the
+    request went through a `network_requester`.
+    """
+
+    endpoint: str
+    method: str
+    status: Optional[int]
+    total: float
+    retries: int = 0
+    bytes_received: Optional[int] = None
+    # request body bytes
+    bytes_sent: Optional[int] = None
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    error: Optional[str] = None
+
+
+RequestHook = Callable[[RequestEvent], None]
+
+
+def endpoint_template(url: str, params=None) -> str:
+    """
+    Normalizes a request URL into a low-cardinality endpoint name.
+
+    Repeated slashes are collapsed, id-like path segments (e.g. the group id in
+    `/{group_id}/PatientOrders`) become `{id}`, and the AJAX method name (`M`
+    parameter) is kept because it identifies the operation on `.aspx` pages.
+    """
+    path = _REPEATED_SLASHES.sub("/", urlsplit(url).path) or "/"
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    template = "/".join(segments)
+
+    ajax_method = params.get("M") if isinstance(params, dict) else None
+    if ajax_method:
+        template = f"{template}?M={ajax_method}"
+    return template
+
+
+def build_trace_config() -> aiohttp.TraceConfig:
+    """TraceConfig that records DNS, connect, time-to-first-byte and the request and response body sizes."""
+
+    def ctx(trace_config_ctx) -> Optional[RequestTimings]:
+        timings = trace_config_ctx.trace_request_ctx
+        return timings if isinstance(timings, RequestTimings) else None
+
+    def now(session) -> float:
+        return session.loop.time()
+
+    async def on_request_start(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None and timings.started is None:
+            timings.started = now(session)
+
+    async def on_dns_start(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None:
+            timings._dns_started = now(session)
+
+    async def on_dns_end(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None and timings._dns_started is not None:
+            timings.dns = now(session) - timings._dns_started
+
+    async def on_connect_start(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None:
+            timings._connect_started = now(session)
+
+    async def on_connect_end(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None and timings._connect_started is not None:
+            timings.connect = now(session) - timings._connect_started
+
+    async def on_request_end(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None and timings.started is not None:
+            timings.ttfb = now(session) - timings.started
+
+    async def on_chunk(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None:
+            timings.bytes_received += len(params.chunk)
+
+    async def on_chunk_sent(session, trace_config_ctx, params):
+        timings = ctx(trace_config_ctx)
+        if timings is not None:
+            timings.bytes_sent += len(params.chunk)
+
+    trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(on_connect_start)
+    trace_config.on_connection_create_end.append(on_connect_end)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_response_chunk_received.append(on_chunk)
+    trace_config.on_request_chunk_sent.append(on_chunk_sent)
+    return trace_config
+
+
+@dataclass
+class _Histogram:
+    buckets: Tuple[float, ...]
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics, fed by `RequestEvent`s.
+
+    Keeps a latency histogram per endpoint template and method, request counters per
+    status and sent and received byte totals. `export_prometheus()` renders everything in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS, prefix: str = "oncoemr"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], _Histogram] = {}
+        self._ttfb: Dict[Tuple[str, str], _Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._bytes: Dict[Tuple[str, str], int] = {}
+        self._sent_bytes: Dict[Tuple[str, str], int] = {}
+        self._retries: Dict[Tuple[str, str], int] = {}
+
+    def observe(self, event: RequestEvent):
+        key = (event.endpoint, event.method)
+        status = str(event.status) if event.status is not None else "error"
+        with self._lock:
+            self._histogram(self._latency, key).observe(event.total)
+            if event.ttfb is not None:
+                self._histogram(self._ttfb, key).observe(event.ttfb)
+            request_key = (*key, status)
+            self._requests[request_key] = self._requests.get(request_key, 0) + 1
+            if event.bytes_received:
+                self._bytes[key] = self._bytes.get(key, 0) + event.bytes_received
+            if event.bytes_sent:
+                self._sent_bytes[key] = self._sent_bytes.get(key, 0) + event.bytes_sent
+            if event.retries:
+                self._retries[key] = self._retries.get(key, 0) + 1
+
+    def _histogram(self, store: Dict, key: Tuple[str, str]) -> _Histogram:
+        histogram = store.get(key)
+        if histogram is None:
+            histogram = _Histogram(self.buckets)
+            store[key] = histogram
+        return histogram
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Request count, mean and total latency per `METHOD endpoint`."""
+        with self._lock:
+            return {
+                f"{method} {endpoint}": {
+                    "count": histogram.count,
+                    "total_seconds": histogram.total,
+                    "mean_seconds": histogram.total / histogram.count if histogram.count else 0.0,
+                }
+                for (endpoint, method), histogram in sorted(self._latency.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._ttfb.clear()
+            self._requests.clear()
+            self._bytes.clear()
+            self._sent_bytes.clear()
+            self._retries.clear()
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        escaped = []
+        for name, value in labels.items():
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped.append(f'{name}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def _render_histograms(self, lines: List[str], name: str, help_text: str, store: Dict):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (endpoint, method), histogram in sorted(store.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                cumulative += count
+                labels = self._labels(endpoint=endpoint, method=method, le=bound)
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = self._labels(endpoint=endpoint, method=method)
+            lines.append(f"{name}_sum{labels} {histogram.total}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    def export_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            self._render_histograms(
+                lines,
+                f"{self.prefix}_request_duration_seconds",
+                "Total time per HTTP attempt, by endpoint.",
+                self._latency,
+            )
+            self._render_histograms(
+                lines,
+                f"{self.prefix}_request_ttfb_seconds",
+                "Time to response headers per HTTP attempt, by endpoint.",
+                self._ttfb,
+            )
+
+            name = f"{self.prefix}_requests_total"
+            lines.append(f"# HELP {name} HTTP attempts by endpoint and status.")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f"{name}{self._labels(endpoint=endpoint, method=method, status=status)} {count}")
+
+            name = f"{self.prefix}_retries_total"
+            lines.append(f"# HELP {name} Retried HTTP attempts by endpoint.")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, method), count in sorted(self._retries.items()):
+                lines.append(f"{name}{self._labels(endpoint=endpoint, method=method)} {count}")
+
+            name = f"{self.prefix}_response_bytes_total"
+            lines.append(f"# HELP {name} Response body bytes received by endpoint.")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, method), count in sorted(self._bytes.items()):
+                lines.append(f"{name}{self._labels(endpoint=endpoint, method=method)} {count}")
+
+            name = f"{self.prefix}_request_bytes_total"
+            lines.append(f"# HELP {name} Request body bytes sent by endpoint.")
+            lines.append(f"# TYPE {name} counter")
+            for (endpoint, method), count in sorted(self._sent_bytes.items()):
+                lines.append(f"{name}{self._labels(endpoint=endpoint, method=method)} {count}")
+
+        return "\n".join(lines) + "\n"
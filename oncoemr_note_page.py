@@ -0,0 +1,827 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from submodule_integrations.oncoemr.oncoemr_lazy import lazy_import
+from submodule_integrations.oncoemr.oncoemr_parsing import DEFAULT_HTML_PARSER, element_strainer, textarea_markup
+
+bs4 = lazy_import("bs4")
+
+# oNT['key']="value"; assignments in the note scripts
+_ONT_ASSIGNMENT = re.compile(r'oNT\[([\'"])([^\1]+?)\1\]\s*=\s*([\'"])(.*?)\3;', re.DOTALL)
+_UNICODE_ESCAPE = re.compile(r'\\u([0-9a-fA-F]{4})')
+
+
+@dataclass
+class _ElementIndex:
+    """Lookups over a parsed page, all filled in by one walk over the tree."""
+
+    # every element per id, in document order
+    by_id: Dict[str, List[bs4.Tag]] = field(default_factory=dict)
+    # first <label> per `for` attribute, like `soup.find("label", {"for": ...})`
+    labels_by_for: Dict[str, bs4.Tag] = field(default_factory=dict)
+    # elements with an `FD_` id, in document order
+    form_elements: List[bs4.Tag] = field(default_factory=list)
+    scripts: List[bs4.Tag] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, soup: bs4.BeautifulSoup) -> "_ElementIndex":
+        index = cls()
+        for element in soup.find_all(True):
+            element_id = element.get("id")
+            if element_id:
+                index.by_id.setdefault(element_id, []).append(element)
+                if element_id.startswith("FD_"):
+                    index.form_elements.append(element)
+            if element.name == "script":
+                index.scripts.append(element)
+            elif element.name == "label":
+                target = element.get("for")
+                if target is not None and target not in index.labels_by_for:
+                    index.labels_by_for[target] = element
+        return index
+
+
+class NotePage:
+    """
+    A note form page, parsed once.
+
+    Form data, the note identifiers, ONT templates, labels and grid tables are all
+    read from the same tree, and each is computed at most once per page. Lookups by
+    element id and by label target go through an index built in a single pass, so
+    resolving every control on a form stays linear in the size of the page.
+
+    A page opened against the cached schema of its note template (see `open_note_page`)
+    only has its per-patient values built into the tree and answers the template-level
+    reads from the schema.
+    """
+
+    def __init__(
+            self,
+            html: str,
+            parser: str = DEFAULT_HTML_PARSER,
+            parse_only: Optional[bs4.SoupStrainer] = None,
+            schema: Optional[NoteTemplateSchema] = None,
+    ):
+        self.html = html
+        self.parser = parser
+        self.soup = bs4.BeautifulSoup(html, parser, parse_only=parse_only)
+        self._schema = schema
+        self._textarea_labels: Dict[str, Optional[str]] = {}
+
+    @functools.cached_property
+    def _index(self) -> _ElementIndex:
+        return _ElementIndex.build(self.soup)
+
+    def element_by_id(self, element_id: str, name: Optional[str] = None) -> Optional[bs4.Tag]:
+        """First element with this id (and tag name), like `soup.find(name, id=element_id)`."""
+        for element in self._index.by_id.get(element_id, ()):
+            if name is None or element.name == name:
+                return element
+        return None
+
+    @functools.cached_property
+    def form_data(self) -> Dict[str, str]:
+        """Values of the `FD_` form elements by id; shared, so copy before modifying."""
+        return extract_form_data(self.soup, self.html, self.parser, form_elements=self._index.form_elements)
+
+    @functools.cached_property
+    def guid(self) -> str:
+        return self.element_by_id("txtNoteGUID", "input").get("value")
+
+    @functools.cached_property
+    def form_id(self) -> str:
+        return self.element_by_id("txtFormID", "input").get("value")
+
+    @functools.cached_property
+    def category(self) -> str:
+        return self.element_by_id("txtCategory", "input").get("value")
+
+    @functools.cached_property
+    def page_title(self) -> str:
+        return self.element_by_id("spnPageTitle", "span").text.strip()
+
+    @functools.cached_property
+    def ont_scripts(self) -> List[str]:
+        """Source of the scripts that assign ONT templates."""
+        return [
+            script.string for script in self._index.scripts if script.string and 'oNT[' in script.string
+        ]
+
+    @functools.cached_property
+    def ont_digest(self) -> str:
+        """Digest of the ONT scripts, identifying the templates without parsing them."""
+        return hashlib.sha1("\x00".join(self.ont_scripts).encode("utf-8")).hexdigest()
+
+    @functools.cached_property
+    def ont_templates(self) -> Dict[str, str]:
+        if self._schema is not None:
+            return self._schema.ont_templates
+        return parse_ont_scripts(self.ont_scripts)
+
+    @functools.cached_property
+    def structure_digest(self) -> str:
+        """
+        Digest of what the template schema of the page is compiled against: the form
+        controls with their print locations, the editability markers of the textareas
+        and the ONT scripts. The same for a full and a value-strained parse of a page.
+        """
+        digest = hashlib.sha1(self.ont_digest.encode("utf-8"))
+        for element in self._index.form_elements:
+            control = (element.name, element["id"], element.get("type", ""), element.get("name", ""),
+                       element.get("prnt", ""))
+            digest.update("\x01".join(control).encode("utf-8") + b"\x00")
+        for element_id in self._index.by_id:
+            if element_id.startswith(_EDIT_MARKER_PREFIXES):
+                digest.update(element_id.encode("utf-8") + b"\x00")
+        return digest.hexdigest()
+
+    @functools.cached_property
+    def grid_tables(self) -> Dict[str, List[Dict]]:
+        """Rows of the checkbox grid tables (and the fax recipients table) by table id."""
+        tables_collection = {}
+        grid_tables = self.soup.select('table[id*="Grid"]')
+        fax_table = self.soup.select_one('table[id="tblFaxRecipients"]')
+        if fax_table:
+            grid_tables.append(fax_table)
+
+        for grid_table in grid_tables:
+            if grid_table is None:
+                # completely not needed but left on purpose just in case
+                # already had it trigger an error on one random note type
+                continue
+
+            table_data = parse_grid_table(table=grid_table)
+            if len(table_data) == 0:
+                continue
+
+            table_id = grid_table.get('id')
+            table_id = table_id.replace('tbl', '')
+
+            tables_collection[table_id] = table_data
+
+        return tables_collection
+
+    def find_input(self, input_id: str) -> Optional[bs4.Tag]:
+        return self.element_by_id(input_id, "input")
+
+    def table_row_texts(self, table_id: str) -> Optional[List[str]]:
+        """Stripped text of every row of a table, or None if the page has no such table."""
+        if self._schema is not None:
+            return self._schema.table_rows.get(table_id)
+        table = self.element_by_id(table_id, "table")
+        if table is None:
+            return None
+        return [row.text.strip() for row in table.select('tr')]
+
+    def input_label(self, input_id: str) -> Optional[str]:
+        """Text of the `<label for=...>` of a checkbox or radio button."""
+        label_elem = self._index.labels_by_for.get(input_id)
+        if label_elem:
+            return label_elem.text.strip()
+
+        return None
+
+    def radio_group_name(self, radio_id: str) -> Optional[str]:
+        for element in self._index.by_id.get(radio_id, ()):
+            if element.name == "input" and element.get("type") == "radio":
+                return element.get("name")
+
+        return None
+
+    @functools.cached_property
+    def _label_resolver(self) -> _TextareaLabels:
+        return _TextareaLabels(self._index)
+
+    def textarea_label(self, textarea_id: str) -> Optional[str]:
+        """Label of an editable textarea, or None if it is not editable (see `_TextareaLabels.label`)."""
+        if self._schema is not None:
+            return self._schema.textarea_labels.get(textarea_id)
+        if textarea_id not in self._textarea_labels:
+            self._textarea_labels[textarea_id] = self._label_resolver.label(textarea_id)
+        return self._textarea_labels[textarea_id]
+
+    @functools.cached_property
+    def schema(self) -> NoteTemplateSchema:
+        """The template-level parts of this page, compiled from its tree unless it was opened against a schema."""
+        if self._schema is not None:
+            return self._schema
+        return NoteTemplateSchema(
+            structure_digest=self.structure_digest,
+            textarea_labels={
+                key: self.textarea_label(key) for key in self.form_data if "fd_txt" in key.lower()
+            },
+            table_rows={
+                element_id: self.table_row_texts(element_id)
+                for element_id in self._index.by_id
+                if element_id.startswith("tbl_gs") and self.element_by_id(element_id, "table") is not None
+            },
+            ont_templates=self.ont_templates,
+        )
+
+    def materialize(self) -> "NotePageData":
+        """
+        Everything the note methods read from this page, as plain data.
+
+        The result holds no parse tree, so it can be returned from a worker thread or
+        process (see `read_note_page`).
+        """
+        inputs = {}
+        radio_groups = {}
+        for element_id, elements in self._index.by_id.items():
+            input_elem = next((element for element in elements if element.name == "input"), None)
+            if input_elem is not None and (element_id.startswith("FD_") or element_id in _IDENTIFIER_INPUTS):
+                # multi-valued attributes (`class`) are bs4 list subclasses
+                inputs[element_id] = {
+                    key: list(value) if isinstance(value, list) else value
+                    for key, value in input_elem.attrs.items()
+                }
+            group_name = self.radio_group_name(element_id)
+            if group_name is not None:
+                radio_groups[element_id] = group_name
+
+        title = self.element_by_id("spnPageTitle", "span")
+        return NotePageData(
+            form_data=dict(self.form_data),
+            inputs=inputs,
+            labels={target: label.text.strip() for target, label in self._index.labels_by_for.items()},
+            radio_groups=radio_groups,
+            grid_tables=self.grid_tables,
+            page_title_text=title.text if title is not None else None,
+            schema=self.schema,
+        )
+
+
+# inputs other than the `FD_` form fields that the note methods read
+_IDENTIFIER_INPUTS = ("txtNoteGUID", "txtFormID", "txtCategory")
+
+# ids of the elements that decide whether a textarea is editable
+_EDIT_MARKER_PREFIXES = ("labelNoEdit", "inlineEditorMount", "inlineEditButton")
+
+
+def _is_note_value_element(name: str, attrs: Dict[str, str]) -> bool:
+    if name in ("script", "label"):
+        return True
+    element_id = attrs.get("id")
+    if not element_id:
+        return False
+    return (
+        element_id.startswith("FD_")
+        or element_id.startswith(_EDIT_MARKER_PREFIXES)
+        or element_id in _IDENTIFIER_INPUTS
+        or element_id in ("spnPageTitle", "tblFaxRecipients")
+        or (name == "table" and "Grid" in element_id)
+    )
+
+
+def note_value_strainer() -> bs4.SoupStrainer:
+    """
+    Keeps the parts of a note page that vary per patient or note, plus what `structure_digest` covers.
+
+    That is the `FD_` form controls, the note identifiers and title, labels, grid tables,
+    scripts and the textarea editability markers. A page parsed with it answers every
+    read except the textarea labels, score tables and ONT templates, which come from the
+    template schema.
+    """
+    return element_strainer(_is_note_value_element)
+
+
+@dataclass
+class NoteTemplateSchema:
+    """
+    The parts of a note page that depend only on its note template.
+
+    Resolving textarea labels walks the whole page, and the score tables and ONT
+    templates are fixed text of the template, so they are compiled once from a full
+    parse and reused for every page of the template with the same `structure_digest`.
+    """
+
+    structure_digest: str
+    textarea_labels: Dict[str, Optional[str]]
+    # row texts of the score tables (`tbl_gs...`) by table id
+    table_rows: Dict[str, List[str]]
+    ont_templates: Dict[str, str]
+
+
+@dataclass
+class NotePageData:
+    """
+    Plain snapshot of a `NotePage`, with the same read methods.
+
+    Inputs are attribute dictionaries instead of tags, so `find_input(...).get("prnt")`
+    reads the same on both.
+    """
+
+    form_data: Dict[str, str]
+    # attributes of the `FD_` and identifier inputs by id
+    inputs: Dict[str, Dict]
+    # label text by `for` attribute
+    labels: Dict[str, str]
+    radio_groups: Dict[str, str]
+    grid_tables: Dict[str, List[Dict]]
+    page_title_text: Optional[str]
+    schema: NoteTemplateSchema
+
+    @property
+    def ont_templates(self) -> Dict[str, str]:
+        return self.schema.ont_templates
+
+    @property
+    def guid(self) -> str:
+        return self.find_input("txtNoteGUID").get("value")
+
+    @property
+    def form_id(self) -> str:
+        return self.find_input("txtFormID").get("value")
+
+    @property
+    def category(self) -> str:
+        return self.find_input("txtCategory").get("value")
+
+    @property
+    def page_title(self) -> str:
+        return self.page_title_text.strip()
+
+    def find_input(self, input_id: str) -> Optional[Dict]:
+        return self.inputs.get(input_id)
+
+    def table_row_texts(self, table_id: str) -> Optional[List[str]]:
+        return self.schema.table_rows.get(table_id)
+
+    def input_label(self, input_id: str) -> Optional[str]:
+        return self.labels.get(input_id)
+
+    def radio_group_name(self, radio_id: str) -> Optional[str]:
+        return self.radio_groups.get(radio_id)
+
+    def textarea_label(self, textarea_id: str) -> Optional[str]:
+        return self.schema.textarea_labels.get(textarea_id)
+
+
+def open_note_page(
+        html: str, parser: str = DEFAULT_HTML_PARSER, schemas: Sequence[NoteTemplateSchema] = ()
+) -> NotePage:
+    """
+    Parses a note page, reusing a cached schema of its note template if one matches.
+
+    Against schemas only the per-patient values are parsed (see `note_value_strainer`),
+    and the page is read against the schema compiled for the structure it has. If none
+    of `schemas` has that structure, the page is parsed in full and its `schema` is
+    compiled from it.
+    """
+    if schemas:
+        page = NotePage(html, parser, parse_only=note_value_strainer())
+        for schema in schemas:
+            if page.structure_digest == schema.structure_digest:
+                page._schema = schema
+                return page
+    return NotePage(html, parser)
+
+
+def read_note_page(
+        html: str, parser: str = DEFAULT_HTML_PARSER, schemas: Sequence[NoteTemplateSchema] = ()
+) -> NotePageData:
+    """Opens a note page and returns its plain snapshot; runs in parse worker threads and processes."""
+    return open_note_page(html, parser, schemas).materialize()
+
+
+def _decode_unicode_escape(match) -> str:
+    return chr(int(match.group(1), 16))
+
+
+def parse_ont_scripts(scripts) -> Dict[str, str]:
+    """Parse oNT assignments from script sources, preserving %% placeholders"""
+    templates = {}
+
+    for script_content in scripts:
+        for match in _ONT_ASSIGNMENT.finditer(script_content):
+            key = match.group(2)
+            value = match.group(4)
+
+            # Decode JavaScript string: unicode escapes like \u0027 (single quote) first
+            decoded = _UNICODE_ESCAPE.sub(_decode_unicode_escape, value)
+
+            # Handle other common escapes
+            decoded = decoded.replace(r"\'", "'")
+            decoded = decoded.replace(r'\"', '"')
+            decoded = decoded.replace(r'\\', '\\')
+
+            templates[key] = decoded  # Preserves %% placeholders
+
+    return templates
+
+
+class NoteTemplateCache:
+    """
+    Compiled note template schemas per template id, shared across requests.
+
+    A template can be served with more than one structure (the NID and FID pages of
+    the same template differ on some hosts), so up to `max_structures` schemas are
+    kept per template id, keyed by `structure_digest`. Holds at most `max_templates`
+    template ids, dropping the least recently used; a schema is only applied to pages
+    with its `structure_digest` (see `open_note_page`).
+    """
+
+    def __init__(self, max_templates: int = 256, max_structures: int = 4):
+        self.max_templates = max_templates
+        self.max_structures = max_structures
+        self._entries: "OrderedDict[str, OrderedDict[str, NoteTemplateSchema]]" = OrderedDict()
+
+    def get(self, template_id: str) -> Tuple[NoteTemplateSchema, ...]:
+        """The schemas of the template, most recently used first."""
+        schemas = self._entries.get(template_id)
+        if schemas is None:
+            return ()
+        self._entries.move_to_end(template_id)
+        return tuple(reversed(schemas.values()))
+
+    def put(self, template_id: str, schema: NoteTemplateSchema):
+        schemas = self._entries.setdefault(template_id, OrderedDict())
+        schemas[schema.structure_digest] = schema
+        schemas.move_to_end(schema.structure_digest)
+        while len(schemas) > self.max_structures:
+            schemas.popitem(last=False)
+        self._entries.move_to_end(template_id)
+        while len(self._entries) > self.max_templates:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def parse_grid_table(table: bs4.Tag):
+    """
+    Parse table with checkboxes into structured data.
+
+    Args:
+        table (str): HTML grid table
+
+    Returns:
+        list: List of row dictionaries with checkbox and column data
+    """
+    # Get header row to map column positions
+    header_row = table.select_one('tr th')
+    headers = []
+    if header_row:
+        headers = [th.get_text(strip=True).lower() for th in table.select('tr th')]
+
+    rows = []
+    data_rows = table.select('tr[id]')  # Any row with an ID
+
+    for row in data_rows:
+        checkboxes = row.select('input[type="Checkbox"]')
+        enabled_checkboxes = []
+
+        for checkbox in checkboxes:
+            if checkbox.get('disabled'):
+                continue
+            else:
+                # Find which cell contains this checkbox
+                parent_cell = checkbox.find_parent('td')
+                cell_index = 0
+                if parent_cell:
+                    all_cells = row.select('td')
+                    cell_index = all_cells.index(parent_cell)
+
+                column_name = headers[cell_index] if cell_index < len(headers) else f"column_{cell_index}"
+
+                checkbox_data = {
+                    'id': checkbox.get('id', '').replace('FD_chk', ''),
+                    'value': checkbox.has_attr('checked'),
+                    'column': column_name.replace(' ', '_').replace('-', '_')
+                }
+                enabled_checkboxes.append(checkbox_data)
+
+        # Skip row if no enabled checkboxes
+        if not enabled_checkboxes:
+            continue
+
+        row_data = {'checkboxes': enabled_checkboxes}
+
+        # Try ID-based extraction first (more reliable)
+        cells = row.select('td[id^="td_"]')
+        if cells:
+            for cell in cells:
+                cell_id = cell.get('id', '')
+                # Extract column name from ID pattern (td_..._ColumnName)
+                parts = cell_id.split('_')
+                if len(parts) >= 3:
+                    column_name = parts[-1].lower()
+                    row_data[column_name] = cell.get_text(strip=True)
+        else:
+            # Fallback to position-based extraction using headers
+            all_cells = row.select('td')
+            # Skip cells with checkboxes
+            checkbox_cells = len([cell for cell in all_cells if cell.select('input[type="Checkbox"]')])
+            for i, cell in enumerate(all_cells[checkbox_cells:], checkbox_cells):
+                header_idx = i - checkbox_cells
+                if header_idx < len(headers):
+                    header = headers[header_idx].replace(' ', '_').replace('-', '_')
+                    row_data[header] = cell.get_text(strip=True)
+
+        rows.append(row_data)
+
+    return rows
+
+
+def get_cleaned_text(element: Optional[bs4.Tag]) -> Optional[str]:
+    """Gets stripped text from an element, cleans it, and handles None."""
+    if not element:
+        return None
+    # Use separator=' ' to handle elements broken across lines better
+    text = element.get_text(separator=" ", strip=True)
+    # Remove common action links and extra whitespace more robustly
+    noise_pattern = r"\s*(?:Clear All|Clear|Hide|Neg|NE|Edit|New ICD-10|New Problem/Diagnosis|Write Script|Outside Med|Med Reconcile|Not Documented|New Relative|New Clinical Observation|Create Provider|One-time Recipient)\b"
+    text = re.split(noise_pattern, text, 1)[0]
+    text = text.replace(
+        "\xa0", " "
+    ).strip()  # Replace non-breaking spaces and strip again
+    if text.endswith(":"):
+        text = text[:-1].strip()
+    # Handle cases where only the asterisk might remain after cleaning
+    if text == "*":
+        return None
+    return text if text else None  # Return None if cleaning results in empty string
+
+
+class _TextareaLabels:
+    """
+    Resolves the labels of a page's editable textareas.
+
+    Editability markers come from the element index, and the preceding question table
+    of an element is computed once per parent for all of its children, so labelling
+    every textarea on a page takes roughly linear time overall.
+    """
+
+    # the question table search climbs at most this many levels from the start element
+    max_levels = 10
+
+    def __init__(self, index: _ElementIndex):
+        self._index = index
+        # ids of the `inlineEditButton...` links, joined for substring checks
+        self._edit_button_ids = "\x00".join(
+            element_id
+            for element_id, elements in index.by_id.items()
+            if element_id.startswith("inlineEditButton") and any(e.name == "a" for e in elements)
+        )
+        # id(parent) -> {id(child): closest preceding question table among the siblings}
+        self._question_tables: Dict[int, Dict[int, Optional[bs4.Tag]]] = {}
+        # id(divOOH_ container) -> section header tag
+        self._section_headers: Dict[int, Optional[bs4.Tag]] = {}
+
+    def _element(self, element_id: str, name: str) -> Optional[bs4.Tag]:
+        for element in self._index.by_id.get(element_id, ()):
+            if element.name == name:
+                return element
+        return None
+
+    def _has_edit_button(self, field_name: str) -> bool:
+        return bool(self._edit_button_ids) and field_name in self._edit_button_ids
+
+    def _preceding_question_tables(self, parent: bs4.Tag) -> Dict[int, Optional[bs4.Tag]]:
+        tables = self._question_tables.get(id(parent))
+        if tables is None:
+            tables = {}
+            closest = None
+            for child in parent.contents:
+                if isinstance(child, bs4.Tag):
+                    tables[id(child)] = closest
+                    if (
+                            child.name == "table"
+                            and "margin-left" in child.get("style", "")
+                            and child.select_one("td.bold_text_bar > span.question-name")
+                    ):
+                        closest = child
+                elif not child:
+                    # an empty string ends the backwards sibling walk
+                    closest = None
+            self._question_tables[id(parent)] = tables
+        return tables
+
+    def closest_question_table(self, start_element: bs4.Tag) -> Optional[bs4.Tag]:
+        """Nearest preceding table containing the question name, climbing up to `max_levels` parents."""
+        current = start_element
+        levels = 0
+        while current and current.name != "body" and levels < self.max_levels:
+            if current.parent is not None:
+                q_table = self._preceding_question_tables(current.parent).get(id(current))
+                if q_table is not None:
+                    return q_table
+            current = current.parent
+            levels += 1
+        return None
+
+    def section_header(self, start_element: bs4.Tag) -> Optional[bs4.Tag]:
+        container_div = start_element.find_parent("div", id=re.compile(r"^divOOH_"))
+        if not container_div:
+            return None
+        if id(container_div) not in self._section_headers:
+            section_header_tag = None
+            prev_tag = container_div.find_previous_sibling(True)  # Find previous TAG sibling
+            if prev_tag and (
+                    (
+                            prev_tag.name == "span"
+                            and "SectionDivider" in prev_tag.get("class", [])
+                    )
+                    or (
+                            prev_tag.name == "h2"
+                            and "container-name-header" in prev_tag.get("class", [])
+                    )
+            ):
+                section_header_tag = prev_tag
+            self._section_headers[id(container_div)] = section_header_tag
+        return self._section_headers[id(container_div)]
+
+    def label(self, textarea_id: str) -> Optional[str]:
+        """
+        Finds the label for a textarea, including its section header,
+        *only if* it's determined to be editable.
+
+        Args:
+            textarea_id: The ID attribute of the textarea element (e.g., "FD_txtFieldName").
+
+        Returns:
+            The combined "Header - Label" text, just the label, or just the header,
+            or None if not editable or no label components found.
+        """
+        textarea = self._element(textarea_id, "textarea")
+        if not textarea:
+            return None
+
+        field_name = None
+        if textarea_id.startswith("FD_txt"):
+            field_name = textarea_id.replace("FD_txt", "")
+        elif textarea_id.startswith("FD_grd"):  # Explicitly ignore grids here
+            return None  # Grids are not directly editable free text
+
+        # --- Editability Check ---
+        is_potentially_editable = False
+        rte_mount = None
+        if field_name:
+            # Must NOT have labelNoEdit
+            if self._element(f"labelNoEdit{field_name}", "div"):
+                return None  # Not editable if labelNoEdit exists
+
+            # Must HAVE either an RTE mount or an Edit button linked
+            rte_mount = self._element(f"inlineEditorMount{field_name}", "div")
+            has_editor = bool(rte_mount)
+            # Check specifically for the pencil icon link associated with editing these fields
+            has_edit_button = self._has_edit_button(field_name)
+            # Looser check for edit button if ID doesn't match exactly
+            if not has_edit_button:
+                # Find parent td/container and check for *any* edit link within it
+                container = textarea.find_parent("td") or textarea.find_parent(
+                    "div", id=f"div{field_name}"
+                )
+                if container:
+                    edit_link = container.find(
+                        "a", class_="text_bar", onclick=lambda x: x and field_name in x
+                    )
+                    has_edit_button = bool(edit_link)
+
+            is_potentially_editable = has_editor or has_edit_button
+
+        if not is_potentially_editable:
+            return None
+        # --- End Editability Check ---
+
+        # --- Find Start Element for Searching ---
+        start_element = textarea
+        if rte_mount:
+            start_element = rte_mount
+        else:
+            div_container = textarea.find_parent("div", id=f"div{field_name}")
+            if div_container:
+                start_element = div_container
+        # --- End Finding Start Element ---
+
+        specific_label_tag: Optional[bs4.Tag] = None
+
+        # --- Find Specific Label (Patterns 1 & 2) ---
+        q_table = self.closest_question_table(start_element)
+        if q_table:
+            name_span = q_table.select_one("span.question-name")
+            if name_span:
+                specific_label_tag = name_span
+        else:
+            parent_td = start_element.find_parent("td")
+            if parent_td:
+                prev_td = parent_td.find_previous_sibling("td")
+                if prev_td:
+                    bold_bar = prev_td.find(class_="bold_text_bar")
+                    if bold_bar:
+                        specific_label_tag = bold_bar
+                if not specific_label_tag:
+                    parent_table = parent_td.find_parent("table")
+                    if parent_table:
+                        prev_table = parent_table.find_previous_sibling("table")
+                        if prev_table:
+                            bold_bar = prev_table.find("td", class_="bold_text_bar")
+                            if bold_bar:
+                                specific_label_tag = bold_bar
+        # --- End Specific Label Search ---
+
+        section_header_tag = self.section_header(start_element)
+
+        # --- Clean and Combine ---
+        specific_label_text = get_cleaned_text(specific_label_tag)
+        section_header_text = get_cleaned_text(section_header_tag)
+
+        if specific_label_text and specific_label_text.lower().strip() == "this is invisible":
+            if specific_label_tag.select_one('font').get('color') == '#ffffff':
+                specific_label_text = None
+
+        # Combine if both exist
+        if section_header_text and specific_label_text:
+            # Avoid duplication if header and label are accidentally the same
+            if section_header_text.lower() == specific_label_text.lower():
+                return section_header_text
+            else:
+                return f"{section_header_text} - {specific_label_text}"
+        elif specific_label_text:
+            return specific_label_text  # Return only specific label if no header found
+        elif section_header_text:
+            # Less common, but return header if only that was found near an editable field
+            return section_header_text
+        else:
+            # Fallback if absolutely nothing is found (should be rare for editable)
+            return field_name  # Return field name as last resort
+
+
+def extract_form_data(
+        soup: bs4.BeautifulSoup,
+        full_html_string: str,
+        parser: str = DEFAULT_HTML_PARSER,
+        form_elements: Optional[List[bs4.Tag]] = None,
+):
+    """
+    Extracts form data ONLY for elements with IDs starting with 'FD_' from a parsed page.
+    Creates key-value pairs and formats the result.
+    Args:
+        soup: The parsed page.
+        full_html_string: The HTML the page was parsed from.
+        parser: BeautifulSoup tree builder `soup` was built with.
+        form_elements: The `FD_` elements in document order, when already collected.
+    Returns:
+        A dictionary of element id to value, or an empty dictionary if no data found.
+    """
+    # lxml keeps textarea markup as raw text; re-read those from the source
+    html_parser_textareas = None
+    form_data_dict = (
+        {}
+    )  # Use a dictionary to store data (handles potential ID clashes)
+    # --- Find all relevant elements by ID pattern ---
+    # This is more efficient than iterating through ALL tags
+    fd_elements = form_elements
+    if fd_elements is None:
+        fd_elements = soup.find_all(id=lambda x: x and x.startswith("FD_"))
+    for element in fd_elements:
+        element_id = element["id"]  # We know ID exists and starts with FD_
+        tag_name = element.name.lower()
+        # --- Textareas ---
+        if tag_name == "textarea":
+            # Get the raw content including HTML tags
+            # Use .string, .text, or join the contents to preserve HTML
+            raw_content = ""
+
+            # Method 1: If the textarea has mixed content (text nodes and tags)
+            for content in element.contents:
+                raw_content += f"{str(content)}"
+
+            if parser != "html.parser" and "<" in raw_content:
+                if html_parser_textareas is None:
+                    html_parser_textareas = textarea_markup(full_html_string)
+                raw_content = html_parser_textareas.get(element_id, raw_content)
+
+            # Now clean up the HTML tags while preserving line breaks
+            form_data_dict[element_id] = raw_content
+        # --- Inputs (Text, Checkbox, Radio, Hidden) ---
+        elif tag_name == "input":
+            input_type = element.get("type", "").lower()
+            if input_type == "text":
+                value = element.get("value", "")
+                # Important: Don't overwrite a checkbox/radio state if an input text has the same ID
+                # (though usually separate IDs like FD_chk... and FD_itb... are used)
+                if not (
+                        element_id in form_data_dict
+                        and form_data_dict[element_id] in ["true", "false"]
+                ):
+                    form_data_dict[element_id] = value
+            elif input_type in ["checkbox", "radio"]:
+                is_checked = element.has_attr("checked")
+                form_data_dict[element_id] = "true" if is_checked else "false"
+            # Add other input types like 'hidden' if necessary
+            # elif input_type == 'hidden':
+            #     value = element.get('value', '')
+            #     form_data_dict[element_id] = value
+        # Add handling for other tag types like 'select' if needed
+    # --- Format the output ---
+    if not form_data_dict:
+        return {}
+        # Return empty string if nothing found
+    return form_data_dict
@@ -0,0 +1,156 @@
+import asyncio
+import functools
+import importlib.util
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from submodule_integrations.oncoemr.oncoemr_lazy import lazy_import
+
+bs4 = lazy_import("bs4")
+
+
+DEFAULT_HTML_PARSER = "html.parser"
+
+# BeautifulSoup tree builders the integration is verified against
+HTML_PARSERS = ("html.parser", "lxml")
+
+# where `ParseExecutor` runs the page parses
+PARSE_MODES = ("inline", "thread", "process")
+
+_TEXTAREA = re.compile(
+    r"""<textarea\b((?:[^>"']|"[^"]*"|'[^']*')*)>(.*?)</textarea\s*>""", re.IGNORECASE | re.DOTALL
+)
+_ID_ATTRIBUTE = re.compile(r"""(?:^|\s)id\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+
+
+def check_html_parser(parser: str) -> str:
+    """
+    Validates a parser backend name.
+
+    Raises:
+        ValueError: If `parser` is not one of `HTML_PARSERS`.
+        ImportError: If `lxml` is requested but not installed.
+    """
+    if parser not in HTML_PARSERS:
+        raise ValueError(f"Unsupported HTML parser `{parser}`, expected one of {HTML_PARSERS}")
+    if parser == "lxml" and importlib.util.find_spec("lxml") is None:
+        raise ImportError("The `lxml` HTML parser requires the lxml package", name="lxml")
+    return parser
+
+
+def class_matcher(class_name: str) -> re.Pattern:
+    """
+    `SoupStrainer` filter for elements carrying `class_name` among their classes.
+
+    Newer bs4 releases match a strainer's `class_` string against the whole attribute,
+    so `class_="PDMenu"` would skip `class="PDMenu x"` although `select("a.PDMenu")`
+    finds it. A whitespace-delimited pattern matches the same elements on every release.
+    """
+    return re.compile(rf"(?:^|\s){re.escape(class_name)}(?:\s|$)")
+
+
+def element_strainer(accept: Callable[[str, Dict[str, str]], bool]) -> "bs4.SoupStrainer":
+    """
+    `SoupStrainer` keeping the elements for which `accept(name, attrs)` holds, with everything inside them.
+
+    A plain strainer needs all of its name and attribute rules to match, so it cannot keep
+    several unrelated kinds of elements in one parse; this one decides on the tag name
+    and the raw attributes of every element outside the kept ones.
+    """
+    return _element_strainer_class()(accept)
+
+
+@functools.lru_cache(maxsize=None)
+def _element_strainer_class() -> type:
+    # defined on first use, so that importing this module does not import bs4
+    class ElementStrainer(bs4.SoupStrainer):
+        def __init__(self, accept: Callable[[str, Dict[str, str]], bool]):
+            super().__init__()
+            self.accept = accept
+
+        # bs4 4.13 and later
+        def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+            return bool(self.accept(name, attrs or {}))
+
+        def allow_string_creation(self, string) -> bool:
+            return False
+
+        # earlier releases; strings outside the kept elements are dropped there already
+        def search_tag(self, markup_name=None, markup_attrs=None):
+            return bool(self.accept(markup_name, markup_attrs or {}))
+
+    return ElementStrainer
+
+
+def textarea_markup(full_html_string: str) -> Dict[str, str]:
+    """
+    Textarea contents by id, rendered the way `html.parser` renders them.
+
+    `html.parser` parses markup inside a textarea into tags, while lxml keeps it as
+    raw text with entities decoded, so `&lt;br&gt;` and `<br>` become indistinguishable.
+    Re-reading the source of the affected textareas keeps the extracted values
+    identical across backends.
+    """
+    contents = {}
+    for match in _TEXTAREA.finditer(full_html_string):
+        id_match = _ID_ATTRIBUTE.search(match.group(1))
+        if id_match is None:
+            continue
+        element_id = next(group for group in id_match.groups() if group is not None)
+        textarea = bs4.BeautifulSoup(match.group(0), "html.parser").find("textarea")
+        # later duplicates win, as they do in `_extract_form_data_bs`
+        contents[element_id] = "".join(str(content) for content in textarea.contents)
+    return contents
+
+
+class ParseExecutor:
+    """
+    Runs the CPU-bound page parses inline, on a thread pool or on a process pool.
+
+    - `inline` (the default) parses on the event loop, as before.
+    - `thread` keeps the event loop serving other requests while a page is parsed;
+      the parse still shares the GIL, so it is not faster.
+    - `process` also runs parses in parallel. Parse functions and their results must
+      be picklable, which is why the note methods get a plain `NotePageData` from
+      the workers instead of the parse tree.
+
+    The pool is created on first use. An existing `concurrent.futures` executor can be
+    passed instead; it is then left to its owner to shut down.
+    """
+
+    def __init__(self, mode: str = "inline", max_workers: Optional[int] = None, executor: Optional[Executor] = None):
+        if mode not in PARSE_MODES:
+            raise ValueError(f"Unsupported parse mode `{mode}`, expected one of {PARSE_MODES}")
+        if executor is not None and mode == "inline":
+            raise ValueError("An executor needs the `thread` or `process` parse mode")
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def offloaded(self) -> bool:
+        """Whether parses leave the event loop (and should return plain data)."""
+        return self.mode != "inline"
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="oncoemr-parse")
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Calls `function(*args)` in the configured place and returns its result."""
+        if not self.offloaded:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), function, *args)
+
+    def shutdown(self, wait: bool = True):
+        """Shuts down the pool this instance created; a pool passed in is left running."""
+        executor = self._executor
+        if executor is not None and self._owns_executor:
+            self._executor = None
+            executor.shutdown(wait=wait)
@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from submodule_integrations.oncoemr.oncoemr_templates import SparseTemplate
+
+# phases of an application, in the order text fields, radio buttons and checkboxes are applied
+_TEXT, _RADIO, _CHECKBOX = range(3)
+
+# (phase, position within the phase, model field, textarea id / radio options / checkbox id)
+_Step = Tuple[int, int, str, Any]
+
+
+@dataclass
+class TemplatePlan:
+    """
+    The field mappings of a note template model, compiled for applying model instances.
+
+    Indexes the text field, radio button and checkbox mappings by model field, so that
+    an application only visits the fields the caller set (`model_fields_set`) instead
+    of dumping the whole model and walking every mapping. The steps run in the order
+    the full walk used: text fields in model field order, then radio buttons and
+    checkboxes in mapping order.
+    """
+
+    radio_buttons_mapping: Dict
+    checkboxes_mapping: Dict
+    textfields_mapping: Dict
+    # steps per model field
+    steps: Dict[str, Tuple[_Step, ...]]
+    # fields applied even when not set, as their default applies
+    always_applied: FrozenSet[str]
+    # fields with a default `FieldContent`, which can be edited in place without marking them set
+    editable_defaults: FrozenSet[str]
+    model_fields: FrozenSet[str]
+
+    def compiled_from(self, radio_buttons_mapping: Dict, checkboxes_mapping: Dict, textfields_mapping: Dict) -> bool:
+        return (
+            self.radio_buttons_mapping is radio_buttons_mapping
+            and self.checkboxes_mapping is checkboxes_mapping
+            and self.textfields_mapping is textfields_mapping
+        )
+
+    def apply(self, template_model: Union[BaseModel, SparseTemplate], target_dict: Dict[str, str]) -> Dict[str, str]:
+        """Returns a copy of `target_dict` with the fields of `template_model` applied."""
+        result_dict = target_dict.copy()
+        fields = template_model.model_fields_set | self.always_applied
+        if not isinstance(template_model, SparseTemplate):
+            fields |= self.editable_defaults
+        steps = sorted(step for name in fields for step in self.steps.get(name, ()))
+        for phase, _, name, target in steps:
+            if name in self.model_fields:
+                # unset fields of a sparse template read as their defaults
+                value = getattr(template_model, name)
+            else:
+                # extra fields, on models that allow them
+                value = (template_model.model_extra or {}).get(name)
+            if phase == _TEXT:
+                # `FieldContent` or its dumped form
+                if isinstance(value, BaseModel):
+                    text, append = getattr(value, "text", None), getattr(value, "append", True)
+                elif isinstance(value, dict):
+                    text, append = value.get("text"), value.get("append", True)
+                else:
+                    continue
+                if text and target in result_dict:
+                    if append and result_dict[target]:
+                        result_dict[target] = f"{result_dict[target]}\n{text}"
+                    else:
+                        result_dict[target] = text
+            elif phase == _RADIO:
+                if not value or value not in target:
+                    continue
+                for field_key in target.values():
+                    if field_key in result_dict:
+                        result_dict[field_key] = ""
+                if target[value] in result_dict:
+                    result_dict[target[value]] = "true"
+            elif value is not None and target in result_dict:
+                result_dict[target] = "true" if value else "false"
+        return result_dict
+
+
+def compile_template_plan(
+        model_class: Type[BaseModel],
+        radio_buttons_mapping: Dict,
+        checkboxes_mapping: Dict,
+        textfields_mapping: Dict,
+) -> TemplatePlan:
+    model_fields = list(model_class.model_fields)
+    position = {name: index for index, name in enumerate(model_fields)}
+    steps: Dict[str, list] = {}
+    always_applied = set()
+    editable_defaults = set()
+
+    for index, (name, target) in enumerate(textfields_mapping.items()):
+        if name == "patient_id" or name in radio_buttons_mapping:
+            continue
+        steps.setdefault(name, []).append((_TEXT, position.get(name, len(model_fields) + index), name, target))
+    for index, (name, mapping) in enumerate(radio_buttons_mapping.items()):
+        steps.setdefault(name, []).append((_RADIO, index, name, mapping["options"]))
+    for index, (name, target) in enumerate(checkboxes_mapping.items()):
+        steps.setdefault(name, []).append((_CHECKBOX, index, name, target))
+
+    for name, field in model_class.model_fields.items():
+        if name in steps and not field.is_required():
+            default = field.get_default(call_default_factory=True)
+            if isinstance(default, (BaseModel, dict)):
+                editable_defaults.add(name)
+            if (
+                    (isinstance(default, BaseModel) and getattr(default, "text", None))
+                    or (isinstance(default, dict) and default.get("text"))
+                    or (name in radio_buttons_mapping and default)
+                    or (name in checkboxes_mapping and default is not None)
+            ):
+                always_applied.add(name)
+
+    return TemplatePlan(
+        radio_buttons_mapping=radio_buttons_mapping,
+        checkboxes_mapping=checkboxes_mapping,
+        textfields_mapping=textfields_mapping,
+        steps={name: tuple(field_steps) for name, field_steps in steps.items()},
+        always_applied=frozenset(always_applied),
+        editable_defaults=frozenset(editable_defaults),
+        model_fields=frozenset(model_fields),
+    )
+
+
+# compiled plans per model class and mappings; the mappings are module constants
+_plans: Dict[Tuple[type, int, int, int], TemplatePlan] = {}
+
+
+def template_plan(
+        model_class: Type[BaseModel],
+        radio_buttons_mapping: Dict,
+        checkboxes_mapping: Dict,
+        textfields_mapping: Dict,
+) -> TemplatePlan:
+    """The plan for `model_class` and the mappings, compiled on first use."""
+    key = (model_class, id(radio_buttons_mapping), id(checkboxes_mapping), id(textfields_mapping))
+    plan = _plans.get(key)
+    if plan is None or not plan.compiled_from(radio_buttons_mapping, checkboxes_mapping, textfields_mapping):
+        plan = _plans[key] = compile_template_plan(
+            model_class, radio_buttons_mapping, checkboxes_mapping, textfields_mapping
+        )
+    return plan
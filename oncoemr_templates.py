@@ -0,0 +1,88 @@
+import functools
+from typing import Any, Dict, FrozenSet, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+# pydantic needs the typing_extensions TypedDict before Python 3.12
+from typing_extensions import Required, TypedDict
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def parse_template(model_class: Type[Model], raw: Union[str, bytes]) -> Model:
+    """
+    Validates a JSON note template straight from the raw request body.
+
+    Equivalent to `model_class(**json.loads(raw))`, but the JSON is read by the pydantic
+    core in one pass instead of being built as Python objects first.
+
+    Raises:
+        pydantic.ValidationError: If `raw` is not valid JSON or does not match the model.
+    """
+    return model_class.model_validate_json(raw)
+
+
+@functools.lru_cache(maxsize=None)
+def sparse_template_adapter(model_class: Type[BaseModel]) -> TypeAdapter:
+    """
+    `TypeAdapter` validating the fields of `model_class` present in a template into a plain dict.
+
+    The fields have the model's types, so the values are validated the same way, but
+    fields left out are neither defaulted nor validated.
+    """
+    annotations = {
+        name: Required[field.annotation] if field.is_required() else field.annotation
+        for name, field in model_class.model_fields.items()
+    }
+    fields = TypedDict(f"{model_class.__name__}Fields", annotations, total=False)
+    fields.__pydantic_config__ = ConfigDict(extra=model_class.model_config.get("extra") or "ignore")
+    return TypeAdapter(fields)
+
+
+class SparseTemplate:
+    """
+    A validated note template holding only the fields the caller sent.
+
+    Note templates have hundreds of optional fields and a `FieldContent` instance per
+    text field by default, while callers set a handful. This keeps the sent values in
+    one dict and answers the attribute reads of the note methods like the model
+    would; unset fields read as their (freshly built) defaults. `to_model()` gives
+    the full model.
+    """
+
+    __slots__ = ("model_class", "values")
+
+    # extra fields are dropped on validation
+    model_extra: Optional[Dict[str, Any]] = None
+
+    def __init__(self, model_class: Type[BaseModel], values: Dict[str, Any]):
+        self.model_class = model_class
+        self.values = values
+
+    @property
+    def model_fields_set(self) -> FrozenSet[str]:
+        return frozenset(self.values)
+
+    def __getattr__(self, name: str) -> Any:
+        values = object.__getattribute__(self, "values")
+        if name in values:
+            return values[name]
+        field = object.__getattribute__(self, "model_class").model_fields.get(name)
+        if field is None:
+            raise AttributeError(name)
+        return field.get_default(call_default_factory=True)
+
+    def to_model(self) -> BaseModel:
+        return self.model_class.model_validate(self.values)
+
+    def __repr__(self) -> str:
+        return f"SparseTemplate({self.model_class.__name__}, {self.values!r})"
+
+
+def parse_sparse_template(model_class: Type[BaseModel], raw: Union[str, bytes]) -> SparseTemplate:
+    """
+    Validates a JSON note template from the raw request body into a `SparseTemplate`.
+
+    Raises:
+        pydantic.ValidationError: If `raw` is not valid JSON or a present field does not match the model.
+    """
+    return SparseTemplate(model_class, sparse_template_adapter(model_class).validate_json(raw))
@@ -0,0 +1,476 @@
+import asyncio
+import functools
+import json
+import random
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, FrozenSet, Hashable, Optional
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON backend
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional fast JSON backend
+    msgspec = None
+
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class _EndpointLatency:
+    """Latency of one endpoint: a recent average and the long-term baseline it is judged against."""
+
+    __slots__ = ("smoothed", "baseline")
+
+    def __init__(self, latency: float):
+        self.smoothed = latency
+        self.baseline = latency
+
+
+class _DomainState:
+    """Concurrency window and FIFO wait queue for a single domain."""
+
+    def __init__(self, initial_limit: float):
+        self.limit = initial_limit
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        # per endpoint, since a JSON call and a note page differ tenfold
+        self.latencies: Dict[Optional[str], _EndpointLatency] = {}
+        # smoothed round trip across endpoints, as TCP's SRTT
+        self.smoothed_latency: Optional[float] = None
+        self.last_decrease = 0.0
+
+
+class AdaptiveRequestScheduler:
+    """
+    Bounds in-flight requests per domain and adapts the bound with AIMD.
+
+    Requests above the current limit wait in a FIFO queue, so callers are served
+    in arrival order. Every completed request feeds back into the limit:
+
+    - a fast, successful response grows the window additively (+1 per window of
+      successful requests),
+    - a throttling response (429 or 5xx), a timeout, a connection error or a
+      smoothed latency well above the long-term latency of the same endpoint
+      shrinks it multiplicatively.
+
+    Latency is judged on averages rather than single responses, so ordinary jitter
+    does not read as overload: the recent latency of an endpoint is an average over
+    about 8 responses, and its baseline one over about `baseline_window` responses.
+
+    Decreases are applied at most once per smoothed round trip so a burst of
+    failures from the same window only halves the limit once.
+    """
+
+    def __init__(
+            self,
+            initial_limit: int = 8,
+            min_limit: int = 1,
+            max_limit: int = 64,
+            additive_increase: float = 1.0,
+            multiplicative_decrease: float = 0.5,
+            latency_tolerance: float = 3.0,
+            baseline_window: int = 100,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < multiplicative_decrease < 1:
+            raise ValueError("`multiplicative_decrease` must be between 0 and 1")
+        if baseline_window < 1:
+            raise ValueError("`baseline_window` must be at least 1")
+
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.latency_tolerance = latency_tolerance
+        self.baseline_window = baseline_window
+        self._domains: Dict[str, _DomainState] = {}
+
+    def _state(self, domain: str) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            state = _DomainState(float(self.initial_limit))
+            self._domains[domain] = state
+        return state
+
+    def limit(self, domain: str) -> int:
+        """Current number of requests allowed in flight for `domain`."""
+        return max(self.min_limit, int(self._state(domain).limit))
+
+    def in_flight(self, domain: str) -> int:
+        return self._state(domain).in_flight
+
+    def queued(self, domain: str) -> int:
+        return len(self._state(domain).waiters)
+
+    async def acquire(self, domain: str):
+        state = self._state(domain)
+        if not state.waiters and state.in_flight < self.limit(domain):
+            state.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # slot was handed over right before cancellation; give it back
+                self.release(domain)
+            else:
+                # `_wake` may already have dropped the cancelled waiter
+                with suppress(ValueError):
+                    state.waiters.remove(waiter)
+            raise
+
+    def release(self, domain: str):
+        state = self._state(domain)
+        state.in_flight -= 1
+        self._wake(domain)
+
+    def _wake(self, domain: str):
+        state = self._state(domain)
+        while state.waiters and state.in_flight < self.limit(domain):
+            waiter = state.waiters.popleft()
+            if waiter.done():
+                continue
+            state.in_flight += 1
+            waiter.set_result(None)
+
+    def record(self, domain: str, latency: float, throttled: bool, endpoint: Optional[str] = None):
+        """
+        Feeds the outcome of one request back into the domain's limit.
+
+        Args:
+            domain: Domain the request went to.
+            latency: Seconds the request took.
+            throttled: Whether the request failed in a way that signals overload.
+            endpoint: Endpoint template of the request; latencies are judged against
+                the baseline of the same endpoint.
+        """
+        state = self._state(domain)
+        if not throttled:
+            stats = state.latencies.get(endpoint)
+            if stats is None:
+                stats = state.latencies[endpoint] = _EndpointLatency(latency)
+            else:
+                stats.smoothed += (latency - stats.smoothed) / 8
+                stats.baseline += (latency - stats.baseline) / self.baseline_window
+            if state.smoothed_latency is None:
+                state.smoothed_latency = latency
+            else:
+                state.smoothed_latency += (latency - state.smoothed_latency) / 8
+            throttled = stats.smoothed > stats.baseline * self.latency_tolerance
+
+        now = time.monotonic()
+        if throttled:
+            # only back off once per round trip
+            if now - state.last_decrease >= (state.smoothed_latency or latency):
+                state.limit = max(
+                    float(self.min_limit), state.limit * self.multiplicative_decrease
+                )
+                state.last_decrease = now
+        else:
+            state.limit = min(
+                float(self.max_limit),
+                state.limit + self.additive_increase / max(state.limit, 1.0),
+            )
+            self._wake(domain)
+
+    @staticmethod
+    def _is_throttling_error(error: BaseException) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError)):
+            return True
+        status = getattr(error, "status_code", None)
+        return isinstance(status, int) and (status == 429 or status >= 500)
+
+    @asynccontextmanager
+    async def slot(self, domain: str, endpoint: Optional[str] = None):
+        """Holds one in-flight slot for `domain` and records the outcome of the request to `endpoint`."""
+        await self.acquire(domain)
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            self.record(domain, time.monotonic() - started, self._is_throttling_error(e), endpoint)
+            raise
+        else:
+            self.record(domain, time.monotonic() - started, throttled=False, endpoint=endpoint)
+        finally:
+            self.release(domain)
+
+
+class RetryBudget:
+    """Number of retries still available to one public operation."""
+
+    def __init__(self, max_retries: int):
+        self.remaining = max_retries
+
+    def try_spend(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+_current_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar(
+    "oncoemr_retry_budget", default=None
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry rules for transient OncoEMR failures.
+
+    Idempotent requests are retried on 502/503/504 responses, timeouts and
+    dropped connections. Non-idempotent requests are only retried when the
+    connection could not be established, since the server never saw them.
+    Delays use exponential backoff with full jitter, and every public
+    operation shares `operation_budget` retries across all of its requests.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+    retry_statuses: FrozenSet[int] = frozenset({502, 503, 504})
+    operation_budget: int = 6
+
+    def new_budget(self) -> RetryBudget:
+        return RetryBudget(self.operation_budget)
+
+    def is_retryable(self, error: BaseException, idempotent: bool) -> bool:
+        if isinstance(error, aiohttp.ClientSSLError):
+            return False
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True
+        if not idempotent:
+            return False
+        if isinstance(
+                error,
+                (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError),
+        ):
+            return True
+        return getattr(error, "status_code", None) in self.retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+def current_retry_budget() -> Optional[RetryBudget]:
+    return _current_retry_budget.get()
+
+
+def retry_budget_scope(func):
+    """
+    Gives each call of a public integration method its own retry budget.
+
+    Nested public calls (e.g. `generic_notes_submit` -> `generic_notes_fetch`)
+    share the budget of the outermost call.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        if _current_retry_budget.get() is not None:
+            return await func(self, *args, **kwargs)
+
+        token = _current_retry_budget.set(self.retry_policy.new_budget())
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            _current_retry_budget.reset(token)
+
+    return wrapper
+
+
+class OperationContext:
+    """
+    Resources read during one public integration call, each fetched at most once.
+
+    `generic_notes_submit` runs `generic_notes_fetch` first and then needs the same
+    latest note id and, when it edits that note, the same note page; both read them
+    through the context of the outermost call instead of requesting them again.
+    """
+
+    def __init__(self):
+        self._results: Dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of `fetch()` for `key`; fetched on the first call, which concurrent calls
+        for the same key wait on. Failures are not kept.
+        """
+        result = self._results.get(key)
+        if result is None:
+            result = self._results[key] = asyncio.ensure_future(fetch())
+            result.add_done_callback(functools.partial(self._forget_failure, key))
+        # like `SingleFlight`, a cancelled caller leaves the fetch to the others
+        return await asyncio.shield(result)
+
+    def _forget_failure(self, key: Hashable, result: asyncio.Future):
+        if (result.cancelled() or result.exception() is not None) and self._results.get(key) is result:
+            del self._results[key]
+
+
+_current_operation: ContextVar[Optional[OperationContext]] = ContextVar(
+    "oncoemr_operation", default=None
+)
+
+
+def operation_scope(func):
+    """
+    Gives each call of a public integration method its own `OperationContext`.
+
+    Nested public calls share the context of the outermost call.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        if _current_operation.get() is not None:
+            return await func(self, *args, **kwargs)
+
+        token = _current_operation.set(OperationContext())
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            _current_operation.reset(token)
+
+    return wrapper
+
+
+async def once_per_operation(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """`fetch()` through the current `OperationContext`, or directly outside of one."""
+    operation = _current_operation.get()
+    if operation is None:
+        return await fetch()
+    return await operation.get(key, fetch)
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls so that one execution serves every caller.
+
+    The call runs in its own task; callers await it through `asyncio.shield`, so
+    a cancelled caller does not cancel the work other callers are waiting on.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # mark the exception as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+def request_key(method: str, url: str, params=None) -> tuple:
+    """
+    Identity of a request for coalescing: method, URL and params.
+
+    The `_` cache-buster timestamp is ignored so that requests issued a few
+    milliseconds apart still coalesce.
+    """
+    if params is None:
+        items = ()
+    elif isinstance(params, dict):
+        items = params.items()
+    else:
+        items = params
+    normalized = tuple(sorted((str(k), str(v)) for k, v in items if k != "_"))
+    return method.upper(), url, normalized
+
+
+_JSON_CONTENT_TYPE = re.compile(r"^application/(?:[\w.+-]+?\+)?json", re.IGNORECASE)
+
+# endpoints that always answer with JSON, regardless of the Content-Type they send
+_JSON_ENDPOINT = re.compile(r"/pc/|/TreatmentPlan/ModelJson|/Orders/", re.IGNORECASE)
+
+if orjson is not None:
+    _fast_json_loads = orjson.loads
+    _FAST_JSON_ERRORS = (orjson.JSONDecodeError,)
+elif msgspec is not None:
+    _fast_json_loads = msgspec.json.decode
+    _FAST_JSON_ERRORS = (msgspec.DecodeError,)
+else:
+    _fast_json_loads = None
+    _FAST_JSON_ERRORS = ()
+
+
+def json_loads(data: bytes | str) -> Any:
+    """
+    Decodes JSON with orjson or msgspec when installed, falling back to the stdlib.
+
+    The stdlib also gets a second try when the fast backend rejects a document.
+    Note that orjson decodes integers wider than 64 bits as floats; OncoEMR ids are
+    strings, so this does not affect any payload the integration reads.
+    """
+    if _fast_json_loads is not None:
+        try:
+            return _fast_json_loads(data)
+        except _FAST_JSON_ERRORS:
+            pass
+    return json.loads(data)
+
+
+def is_json_content_type(content_type: Optional[str]) -> bool:
+    return bool(content_type) and bool(_JSON_CONTENT_TYPE.match(content_type))
+
+
+def is_json_endpoint(url: str) -> bool:
+    return bool(_JSON_ENDPOINT.search(url))
+
+
+def decode_response_body(
+        body: bytes,
+        content_type: Optional[str],
+        charset: Optional[str] = None,
+        json_endpoint: bool = False,
+) -> Any:
+    """
+    Decodes a response body in a single pass, choosing the decoder up front.
+
+    JSON content types and known JSON endpoints are parsed straight from the raw
+    bytes; everything else (the HTML pages) is decoded to text once. A JSON body
+    that fails to parse is returned as text, and an empty JSON body as None,
+    matching the previous `response.json()` / `response.text()` fallback.
+    """
+    json_type = is_json_content_type(content_type)
+    if json_type or json_endpoint:
+        if not body.strip():
+            if json_type:
+                return None
+        else:
+            try:
+                return json_loads(body)
+            except ValueError:
+                pass
+
+    return body.decode(charset or "utf-8", errors="replace")
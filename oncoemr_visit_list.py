@@ -0,0 +1,333 @@
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from submodule_integrations.oncoemr.oncoemr_lazy import lazy_import
+
+bs4 = lazy_import("bs4")
+
+VISIT_TABLE_ID = "tblPatientVisits"
+
+_DECIMAL_REFERENCE_WITH_FOLLOWING_DATA = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE_WITH_FOLLOWING_DATA = re.compile("^([0-9a-f]+)(.*)")
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+# the tag sets of BeautifulSoup's HTML tree builder, pinned so that a bs4 upgrade
+# changing its defaults cannot quietly change the visit rows
+_EMPTY_ELEMENT_TAGS = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image", "img",
+    "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source", "spacer",
+    "track", "wbr",
+})
+_PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+# elements whose strings are not text: script, style and template contents and ruby annotations
+_STRING_CONTAINERS = frozenset({"rt", "rp", "style", "script", "template"})
+
+
+class _Node:
+    """An element of the visit table that the row dictionaries are read from."""
+
+    __slots__ = ("kind", "attrs", "start", "end", "cells", "time_link", "patient_link", "room_link", "span")
+
+    def __init__(self, kind: str, attrs: Dict[str, str], start: int):
+        self.kind = kind
+        self.attrs = attrs
+        # text of the element is `chunks[start:end]` of the parser
+        self.start = start
+        self.end = start
+        self.cells: List["_Node"] = []
+        self.time_link: Optional["_Node"] = None
+        self.patient_link: Optional["_Node"] = None
+        self.room_link: Optional["_Node"] = None
+        self.span: Optional["_Node"] = None
+
+
+class VisitTableParser(HTMLParser):
+    """
+    Streaming reader of the `tblPatientVisits` table of a visit list.
+
+    Reads the html.parser token stream and keeps only the stack of open tag names plus
+    the rows, cells, links and text of the visit table, instead of building a
+    BeautifulSoup tree. Tags are opened and closed the way BeautifulSoup's
+    `html.parser` builder does it (no implied end tags, an end tag closes everything
+    up to the most recent open tag of that name, void elements close immediately), and
+    text is collected the way `get_text()` sees it (whitespace-only strings collapsed,
+    script, style and template contents skipped), so the rows come out exactly as a
+    tree search would produce them.
+    """
+
+    def __init__(self):
+        # character references are resolved below, as BeautifulSoup does
+        super().__init__(convert_charrefs=False)
+
+        # open tags as (name, node or None), like BeautifulSoup's tag stack
+        self._stack: List[tuple] = []
+        self._open_counts: Dict[str, int] = {}
+        self._preserving_whitespace = 0
+        self._string_container_depth = 0
+        self._already_closed_empty_element: List[str] = []
+        self._pending_data: List[str] = []
+
+        self.table: Optional[_Node] = None
+        self._table_closed = False
+        # text strings inside the table, in document order
+        self.chunks: List[str] = []
+        self.rows: List[_Node] = []
+        self.headers: List[_Node] = []
+        self._open_rows: List[_Node] = []
+        self._open_cells: List[_Node] = []
+        self._open_links: List[_Node] = []
+
+    # --- token stream ---
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_starttag(self, tag, attrs, handle_empty_element: bool = True):
+        attr_dict = {}
+        for key, value in attrs:
+            attr_dict[key] = "" if value is None else value
+
+        self._end_data()
+        self._push(tag, attr_dict)
+        if handle_empty_element and tag in _EMPTY_ELEMENT_TAGS:
+            self.handle_endtag(tag, check_already_closed=False)
+            self._already_closed_empty_element.append(tag)
+
+    def handle_endtag(self, tag, check_already_closed: bool = True):
+        if check_already_closed and tag in self._already_closed_empty_element:
+            self._already_closed_empty_element.remove(tag)
+        else:
+            self._end_data()
+            self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._pending_data.append(data)
+
+    def handle_charref(self, name):
+        base = 10
+        pattern = _DECIMAL_REFERENCE_WITH_FOLLOWING_DATA
+        if name.startswith("x") or name.startswith("X"):
+            name = name[1:]
+            base = 16
+            pattern = _HEX_REFERENCE_WITH_FOLLOWING_DATA
+
+        dereferenced = ""
+        extra_data = ""
+        real_name = None
+        try:
+            real_name = int(name, base)
+        except ValueError:
+            match = pattern.search(name)
+            if match is not None:
+                real_name = int(match.groups()[0], base)
+                extra_data = match.groups()[1]
+
+        if real_name is None:
+            extra_data = name
+        else:
+            dereferenced, _ = bs4.dammit.UnicodeDammit.numeric_character_reference(real_name)
+        self.handle_data(dereferenced)
+        self.handle_data(extra_data)
+
+    def handle_entityref(self, name):
+        character = bs4.dammit.EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data):
+        self._special_string(data, main_content=False)
+
+    def handle_decl(self, decl):
+        self._special_string(decl[len("DOCTYPE "):], main_content=False)
+
+    def unknown_decl(self, data):
+        if data.upper().startswith("CDATA["):
+            self._special_string(data[len("CDATA["):], main_content=True)
+        else:
+            self._special_string(data, main_content=False)
+
+    def handle_pi(self, data):
+        self._special_string(data, main_content=False)
+
+    def close(self):
+        super().close()
+        self._end_data()
+        while self._stack:
+            self._pop()
+
+    # --- tree bookkeeping ---
+
+    def _special_string(self, data: str, main_content: bool):
+        """Comments, declarations and CDATA sections become strings of their own."""
+        self._end_data()
+        self._pending_data.append(data)
+        self._end_data(main_content=main_content)
+
+    def _end_data(self, main_content: Optional[bool] = None):
+        if not self._pending_data:
+            return
+        current_data = "".join(self._pending_data)
+        self._pending_data = []
+        if self.table is None or self._table_closed:
+            return
+
+        if not self._preserving_whitespace and not current_data.strip(_ASCII_SPACES):
+            current_data = "\n" if "\n" in current_data else " "
+        if main_content is None:
+            # strings inside script, style, template, rt and rp are not text
+            main_content = not self._string_container_depth
+        if main_content:
+            self.chunks.append(current_data)
+
+    def _push(self, name: str, attrs: Dict[str, str]):
+        self._stack.append((name, self._open_node(name, attrs)))
+        self._open_counts[name] = self._open_counts.get(name, 0) + 1
+        if name in _PRESERVE_WHITESPACE_TAGS:
+            self._preserving_whitespace += 1
+        if name in _STRING_CONTAINERS:
+            self._string_container_depth += 1
+
+    def _pop(self):
+        name, node = self._stack.pop()
+        self._open_counts[name] -= 1
+        if name in _PRESERVE_WHITESPACE_TAGS:
+            self._preserving_whitespace -= 1
+        if name in _STRING_CONTAINERS:
+            self._string_container_depth -= 1
+        if node is not None:
+            self._close_node(node)
+
+    def _pop_to(self, name: str):
+        """Closes the most recent open `name` tag and everything opened after it."""
+        if not self._open_counts.get(name):
+            return
+        while self._stack:
+            top = self._stack[-1][0]
+            self._pop()
+            if top == name:
+                break
+
+    def _open_node(self, name: str, attrs: Dict[str, str]) -> Optional[_Node]:
+        if self.table is None:
+            if name == "table" and attrs.get("id") == VISIT_TABLE_ID:
+                self.table = _Node("table", attrs, len(self.chunks))
+                return self.table
+            return None
+        if self._table_closed:
+            return None
+
+        node = None
+        if name == "tr":
+            node = _Node("tr", attrs, len(self.chunks))
+            self.rows.append(node)
+            self._open_rows.append(node)
+        elif name == "td":
+            node = _Node("td", attrs, len(self.chunks))
+            for row in self._open_rows:
+                row.cells.append(node)
+            self._open_cells.append(node)
+        elif name == "th":
+            # headers are the `th` cells of the first row
+            if self.rows and self.rows[0] in self._open_rows:
+                node = _Node("th", attrs, len(self.chunks))
+                self.headers.append(node)
+        elif name == "a":
+            node = _Node("a", attrs, len(self.chunks))
+            classes = attrs.get("class", "").split()
+            link_id = attrs.get("id")
+            for cell in self._open_cells:
+                if cell.time_link is None and "gts" in classes:
+                    cell.time_link = node
+                if cell.patient_link is None and link_id and link_id.startswith("ancp"):
+                    cell.patient_link = node
+                if cell.room_link is None and "room-name" in classes:
+                    cell.room_link = node
+            self._open_links.append(node)
+        elif name == "span":
+            node = _Node("span", attrs, len(self.chunks))
+            for link in self._open_links:
+                if link.span is None:
+                    link.span = node
+        return node
+
+    def _close_node(self, node: _Node):
+        node.end = len(self.chunks)
+        if node is self.table:
+            self._table_closed = True
+        elif node.kind == "tr":
+            self._open_rows.pop()
+        elif node.kind == "td":
+            self._open_cells.pop()
+        elif node.kind == "a":
+            self._open_links.pop()
+
+    # --- results ---
+
+    def text(self, node: _Node) -> str:
+        """`get_text()` of a table element."""
+        return "".join(self.chunks[node.start:node.end])
+
+    def patients(self) -> List[Dict]:
+        if self.table is None:
+            return []
+
+        headers = []
+        for th in self.headers:
+            # Get text or id as fallback
+            header_text = self.text(th).strip()
+            if not header_text and th.attrs.get("id"):
+                header_text = th.attrs.get("id").replace("th", "")
+            headers.append(header_text)
+
+        patients = []
+        for row in self.rows[1:]:  # Skip header row
+            patient_data = {
+                "patient_id": row.attrs.get("pid", ""),
+                "patient_name": row.attrs.get("pnam", ""),
+                "location": row.attrs.get("location", ""),
+            }
+
+            for i, cell in enumerate(row.cells):
+                if i >= len(headers):
+                    continue
+                # Clean the header name for use as a key
+                header_key = headers[i].replace(" ", "_").replace("(", "").replace(")", "").lower()
+
+                if i == 0:
+                    # Time cell
+                    time_link = cell.time_link or cell
+                    patient_data["appointment_time"] = self.text(time_link).strip()
+                elif "patient" in header_key or cell.patient_link:
+                    # Patient info cell - patient link and the MRN span within it
+                    patient_link = cell.patient_link
+                    if patient_link:
+                        patient_data["patient_display"] = self.text(patient_link).strip()
+                        if patient_link.span:
+                            patient_data["mrn"] = self.text(patient_link.span).strip()
+                else:
+                    patient_data[header_key] = self.text(cell).strip()
+                    # Extract room status if available
+                    if header_key == "room" and cell.room_link:
+                        patient_data["room_status"] = self.text(cell.room_link).strip()
+
+            patients.append(patient_data)
+
+        return patients
+
+
+def parse_visit_table(html_content: str) -> List[Dict]:
+    """
+    Rows of the `tblPatientVisits` table of a visit list, one dictionary per patient.
+
+    Args:
+        html_content: HTML string containing the table
+
+    Returns:
+        List of dictionaries where each dictionary represents a patient row
+        with all values as strings
+    """
+    parser = VisitTableParser()
+    parser.feed(html_content)
+    parser.close()
+    return parser.patients()
@@ -0,0 +1,67 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from submodule_integrations.oncoemr.oncoemr_integration import OncoEmrIntegration
+
+# the fixture pages and reference parsers of the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+
+class FakeClock:
+    """Stands in for the `time` module of the module under test; only moves when advanced."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+class FakeRequester:
+    """
+    `network_requester` answering every request from a script of outcomes.
+
+    Each call takes the next outcome, and the last one repeats; an exception is raised
+    instead of returned. Calls are recorded as (method, url, params).
+    """
+
+    def __init__(self, *outcomes, delay: float = 0.0):
+        self.outcomes = list(outcomes) or [{}]
+        self.delay = delay
+        self.calls = []
+
+    async def request(self, method, url, process_response=None, **kwargs):
+        self.calls.append((method, url, kwargs.get("params")))
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def make_integration():
+    """Builds an integration whose requests go to a `FakeRequester`."""
+
+    def make(requester: FakeRequester, **kwargs) -> OncoEmrIntegration:
+        return OncoEmrIntegration(
+            domain="emr.example.com",
+            token="ASP.NET_SessionId=test",
+            location_id="L_1",
+            network_requester=requester,
+            **kwargs,
+        )
+
+    return make
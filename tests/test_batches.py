@@ -0,0 +1,103 @@
+import asyncio
+from collections import Counter
+
+from conftest import FakeRequester
+
+from submodule_integrations.utils.errors import IntegrationAPIError
+
+
+def test_submit_many_serializes_items_of_the_same_patient_and_note(make_integration):
+    integration = make_integration(FakeRequester())
+    running = Counter()
+    most_running = Counter()
+
+    async def no_catalog():
+        return []
+
+    async def submit(note_name, patient_id, fields, **_):
+        key = (patient_id, note_name.lower().replace("-", " "))
+        running[key] += 1
+        running["all"] += 1
+        for name, count in running.items():
+            most_running[name] = max(most_running[name], count)
+        await asyncio.sleep(0.01)
+        running[key] -= 1
+        running["all"] -= 1
+        return {"success": True}
+
+    integration._fetch_available_note_types = no_catalog
+    integration.generic_notes_submit = submit
+    items = [
+        {"note_name": "Follow Up", "patient_id": "P_1", "fields": {}},
+        {"note_name": "Follow-up", "patient_id": "P_1", "fields": {}},
+        {"note_name": "Follow Up", "patient_id": "P_1", "fields": {}},
+        {"note_name": "Follow Up", "patient_id": "P_2", "fields": {}},
+        {"note_name": "Consultation", "patient_id": "P_1", "fields": {}},
+    ]
+
+    results = asyncio.run(integration.generic_notes_submit_many(items, concurrency=4))
+
+    assert [result["success"] for result in results] == [True] * 5
+    assert most_running[("P_1", "follow up")] == 1
+    # the other patient and the other note run alongside the first patient's follow-ups
+    assert most_running["all"] == 3
+
+
+def test_submit_many_reports_a_failing_item_without_stopping_the_others(make_integration):
+    integration = make_integration(FakeRequester())
+
+    async def no_catalog():
+        return []
+
+    async def submit(note_name, patient_id, fields, **_):
+        await asyncio.sleep(0.01)
+        if patient_id == "P_2":
+            raise IntegrationAPIError("oncoemr", "Note `Follow Up` not found", 404, "not_found")
+        return {"success": True}
+
+    integration._fetch_available_note_types = no_catalog
+    integration.generic_notes_submit = submit
+    items = [{"note_name": "Follow Up", "patient_id": patient_id, "fields": {}} for patient_id in ("P_1", "P_2", "P_3")]
+
+    results = asyncio.run(integration.generic_notes_submit_many(items))
+
+    assert results[0] == {"patient_id": "P_1", "note_name": "Follow Up", "success": True}
+    assert results[1] == {
+        "patient_id": "P_2",
+        "note_name": "Follow Up",
+        "success": False,
+        "error": {"status_code": 404, "error_code": "not_found", "message": "Note `Follow Up` not found"},
+    }
+    assert results[2]["success"] is True
+
+
+def test_fetch_many_reports_a_failing_note_without_cancelling_the_others(make_integration):
+    integration = make_integration(FakeRequester())
+    finished = []
+
+    async def nothing(*_, **__):
+        return []
+
+    async def read(note_name, patient_id):
+        if note_name == "Missing":
+            raise IntegrationAPIError("oncoemr", f"Note `{note_name}` not found", 404, "not_found")
+        # still running when the missing note fails
+        await asyncio.sleep(0.01)
+        finished.append(note_name)
+        return {"patient_id": patient_id, "note_name": note_name, "fields": {}}
+
+    integration._verify_patient_exists = nothing
+    integration._fetch_available_note_types = nothing
+    integration._fetch_unsigned_notes = nothing
+    integration._read_generic_note = read
+
+    results = asyncio.run(integration.generic_notes_fetch_many("P_1", ["Follow Up", "Missing", "Consultation"]))
+
+    assert sorted(finished) == ["Consultation", "Follow Up"]
+    assert [result["note_name"] for result in results] == ["Follow Up", "Missing", "Consultation"]
+    assert results[1] == {
+        "patient_id": "P_1",
+        "note_name": "Missing",
+        "error": {"status_code": 404, "error_code": "not_found", "message": "Note `Missing` not found"},
+    }
+    assert "error" not in results[0] and "error" not in results[2]
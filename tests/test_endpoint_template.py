@@ -0,0 +1,48 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from submodule_integrations.oncoemr.oncoemr_metrics import endpoint_template
+
+BASE_URL = "https://emr.example.com"
+GROUP_ID = "G_1A2B3C4D5E"
+
+_SOURCE = (Path(__file__).resolve().parent.parent / "oncoemr_integration.py").read_text(encoding="utf-8")
+# `self.url + "/path"`, `self.url + f"/{self.group_id}/path"`, `f"{self.url}/path"` and `endpoint = "/path"`
+_REQUESTED_PATH = re.compile(r'(?:self\.url \+ f?"|f"\{self\.url\}|endpoint = ")(/[^"?]*)')
+REQUESTED_PATHS = sorted(set(_REQUESTED_PATH.findall(_SOURCE)))
+
+
+def _expected_template(path: str) -> str:
+    return re.sub(r"/{2,}", "/", path).replace("{self.group_id}", "{id}")
+
+
+def test_requested_paths_are_found():
+    assert "/PatientOrders2" in REQUESTED_PATHS
+    assert "/{self.group_id}/PatientOrders" in REQUESTED_PATHS
+    assert len(REQUESTED_PATHS) > 20
+
+
+@pytest.mark.parametrize("path", REQUESTED_PATHS)
+def test_only_id_segments_are_templated(path):
+    url = BASE_URL + path.replace("{self.group_id}", GROUP_ID)
+
+    assert endpoint_template(url) == _expected_template(path)
+
+
+@pytest.mark.parametrize(
+    "path, template",
+    [
+        ("/U_BENCHMD0000/Notes", "/{id}/Notes"),
+        ("/Notes/3f2504e0-4f89-11d3-9a0c-0305e82c3301", "/Notes/{id}"),
+        ("/PatientOrders2", "/PatientOrders2"),
+        ("/WebForms/pages_pd/PD_DocOncoNoteDB.aspx", "/WebForms/pages_pd/PD_DocOncoNoteDB.aspx"),
+    ],
+)
+def test_id_shapes(path, template):
+    assert endpoint_template(BASE_URL + path) == template
+
+
+def test_ajax_method_is_kept():
+    assert endpoint_template(BASE_URL + "/WebForms/OncoEMR.aspx", {"M": "GetNotes"}) == "/WebForms/OncoEMR.aspx?M=GetNotes"
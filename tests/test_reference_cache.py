@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from submodule_integrations.oncoemr import oncoemr_cache
+from submodule_integrations.oncoemr.oncoemr_cache import ReferenceDataCache
+
+TTL = 60
+MAX_STALE = 600
+
+
+class Loader:
+    """Returns a new version of the catalog per load; `gate` holds loads back until set."""
+
+    def __init__(self):
+        self.loads = 0
+        self.fail = False
+        self.gate = None
+
+    async def __call__(self):
+        self.loads += 1
+        version = self.loads
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("OncoEMR unavailable")
+        return [f"physician v{version}"]
+
+
+@pytest.fixture
+def cache(clock, monkeypatch) -> ReferenceDataCache:
+    monkeypatch.setattr(oncoemr_cache, "time", clock)
+    return ReferenceDataCache(ttls={"physicians": TTL}, max_stale=MAX_STALE)
+
+
+async def _settle():
+    """Lets background refreshes run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_entry_is_served_within_its_ttl(cache, clock):
+    loader = Loader()
+
+    async def run():
+        first = await cache.get("physicians", loader)
+        clock.advance(TTL - 1)
+        return first, await cache.get("physicians", loader)
+
+    assert asyncio.run(run()) == (["physician v1"], ["physician v1"])
+    assert loader.loads == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(cache, clock):
+    loader = Loader()
+
+    async def run():
+        await cache.get("physicians", loader)
+        clock.advance(TTL + 1)
+        loader.gate = asyncio.Event()
+        stale = [await cache.get("physicians", loader) for _ in range(3)]
+        await _settle()
+        loader.gate.set()
+        await _settle()
+        return stale, await cache.get("physicians", loader)
+
+    stale, refreshed = asyncio.run(run())
+
+    assert stale == [["physician v1"]] * 3
+    assert refreshed == ["physician v2"]
+    assert loader.loads == 2
+
+
+def test_expired_entry_is_loaded_inline(cache, clock):
+    loader = Loader()
+
+    async def run():
+        await cache.get("physicians", loader)
+        clock.advance(TTL + MAX_STALE + 1)
+        return await cache.get("physicians", loader)
+
+    assert asyncio.run(run()) == ["physician v2"]
+    assert loader.loads == 2
+
+
+def test_concurrent_misses_share_one_load(cache):
+    loader = Loader()
+
+    async def run():
+        return await asyncio.gather(*(cache.get("physicians", loader) for _ in range(4)))
+
+    assert asyncio.run(run()) == [["physician v1"]] * 4
+    assert loader.loads == 1
+
+
+def test_failed_refresh_keeps_serving_the_stale_entry(cache, clock):
+    loader = Loader()
+
+    async def run():
+        await cache.get("physicians", loader)
+        clock.advance(TTL + 1)
+        loader.fail = True
+        stale = await cache.get("physicians", loader)
+        await _settle()
+        # the next read tries another refresh
+        still_stale = await cache.get("physicians", loader)
+        await _settle()
+        return stale, still_stale
+
+    assert asyncio.run(run()) == (["physician v1"], ["physician v1"])
+    assert loader.loads == 3
+
+
+def test_invalidated_entry_is_not_repopulated_by_an_earlier_load(cache):
+    loader = Loader()
+
+    async def run():
+        loader.gate = asyncio.Event()
+        load = asyncio.ensure_future(cache.get("physicians", loader))
+        await _settle()
+        cache.invalidate("physicians")
+        loader.gate.set()
+        await load
+        loader.gate = None
+        return await cache.get("physicians", loader)
+
+    assert asyncio.run(run()) == ["physician v2"]
+
+
+def test_aclose_cancels_pending_refreshes(cache, clock):
+    loader = Loader()
+
+    async def run():
+        await cache.get("physicians", loader)
+        clock.advance(TTL + 1)
+        loader.gate = asyncio.Event()
+        await cache.get("physicians", loader)
+        await _settle()
+        refreshes = set(cache._refresh_tasks)
+        await cache.aclose()
+        return refreshes
+
+    refreshes = asyncio.run(run())
+
+    assert len(refreshes) == 1
+    assert all(task.cancelled() for task in refreshes)
+    assert not cache._refresh_tasks
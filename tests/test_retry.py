@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from conftest import FakeRequester
+
+from submodule_integrations.oncoemr import oncoemr_transport
+from submodule_integrations.oncoemr.oncoemr_transport import RetryBudget, RetryPolicy, retry_budget_scope
+from submodule_integrations.utils.errors import IntegrationAPIError
+
+URL = "https://emr.example.com/pc/demographics"
+
+
+def _unavailable():
+    return IntegrationAPIError("oncoemr", "Service Unavailable", 503)
+
+
+def _refused():
+    connection_key = SimpleNamespace(host="emr.example.com", port=443, ssl=True)
+    return aiohttp.ClientConnectorError(connection_key, OSError("Connection refused"))
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    """Retries without sleeping; the delays chosen are kept."""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return delays
+
+
+def test_backoff_ceiling_doubles_up_to_max_delay(monkeypatch):
+    monkeypatch.setattr(oncoemr_transport.random, "uniform", lambda low, high: (low, high))
+    policy = RetryPolicy(base_delay=0.25, max_delay=4.0)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 7)] == [
+        (0, 0.25), (0, 0.5), (0, 1.0), (0, 2.0), (0, 4.0), (0, 4.0)
+    ]
+
+
+def test_backoff_is_jittered_within_the_ceiling():
+    policy = RetryPolicy(base_delay=0.25, max_delay=4.0)
+    delays = {policy.backoff(3) for _ in range(100)}
+
+    assert all(0 <= delay <= 1.0 for delay in delays)
+    assert len(delays) > 1
+
+
+def test_budget_runs_out():
+    budget = RetryBudget(2)
+
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+def test_transient_get_failures_are_retried(make_integration, no_backoff):
+    requester = FakeRequester(_unavailable(), asyncio.TimeoutError(), {"ok": True})
+    integration = make_integration(requester)
+
+    assert asyncio.run(integration._make_request("GET", URL)) == {"ok": True}
+    assert len(requester.calls) == 3
+    assert len(no_backoff) == 2
+
+
+def test_retries_stop_at_max_attempts(make_integration, no_backoff):
+    requester = FakeRequester(_unavailable())
+    integration = make_integration(requester, retry_policy=RetryPolicy(max_attempts=3, operation_budget=10))
+
+    with pytest.raises(IntegrationAPIError):
+        asyncio.run(integration._make_request("GET", URL))
+    assert len(requester.calls) == 3
+
+
+def test_operation_budget_is_shared_and_runs_out(make_integration, no_backoff):
+    requester = FakeRequester(_unavailable())
+    integration = make_integration(requester, retry_policy=RetryPolicy(max_attempts=5, operation_budget=3))
+
+    @retry_budget_scope
+    async def operation(self):
+        for params in ({"PID": "P_1"}, {"PID": "P_2"}):
+            try:
+                await self._make_request("GET", URL, params=params)
+            except IntegrationAPIError:
+                pass
+
+    asyncio.run(operation(integration))
+    # 3 retries for the first request use up the budget, the second is not retried
+    assert [call[2]["PID"] for call in requester.calls] == ["P_1"] * 4 + ["P_2"]
+
+
+def test_post_is_not_retried(make_integration, no_backoff):
+    requester = FakeRequester(_unavailable(), {"ok": True})
+    integration = make_integration(requester)
+
+    with pytest.raises(IntegrationAPIError):
+        asyncio.run(integration._make_request("POST", URL, data={"a": "1"}))
+    assert len(requester.calls) == 1
+
+
+def test_post_is_retried_when_the_connection_was_refused(make_integration, no_backoff):
+    requester = FakeRequester(_refused(), {"ok": True})
+    integration = make_integration(requester)
+
+    assert asyncio.run(integration._make_request("POST", URL, data={"a": "1"})) == {"ok": True}
+    assert len(requester.calls) == 2
+
+
+def test_read_only_post_is_retried(make_integration, no_backoff):
+    requester = FakeRequester(_unavailable(), {"ok": True})
+    integration = make_integration(requester)
+
+    assert asyncio.run(integration._make_request("POST", URL, idempotent=True, json={})) == {"ok": True}
+    assert len(requester.calls) == 2
@@ -0,0 +1,149 @@
+import asyncio
+import random
+
+import aiohttp
+import pytest
+
+from submodule_integrations.oncoemr import oncoemr_transport
+from submodule_integrations.oncoemr.oncoemr_transport import AdaptiveRequestScheduler
+from submodule_integrations.utils.errors import IntegrationAPIError
+
+DOMAIN = "emr.example.com"
+
+
+@pytest.fixture
+def scheduler(clock, monkeypatch) -> AdaptiveRequestScheduler:
+    monkeypatch.setattr(oncoemr_transport, "time", clock)
+    return AdaptiveRequestScheduler()
+
+
+def _record(scheduler, clock, latency: float, endpoint: str = "/pc/json"):
+    # completions arrive `limit` at a time, as with that many workers in flight
+    clock.advance(latency / scheduler.limit(DOMAIN))
+    scheduler.record(DOMAIN, latency, throttled=False, endpoint=endpoint)
+
+
+@pytest.mark.parametrize("sigma", [0.2, 0.3, 0.5])
+def test_jitter_without_load_does_not_shrink_the_limit(scheduler, clock, sigma):
+    rng = random.Random(0)
+    limits = []
+    for _ in range(5000):
+        _record(scheduler, clock, 0.05 * rng.lognormvariate(0, sigma))
+        limits.append(scheduler.limit(DOMAIN))
+
+    assert min(limits) >= scheduler.initial_limit
+    assert limits[-1] == scheduler.max_limit
+
+
+def test_slow_endpoints_are_judged_against_their_own_latency(scheduler, clock):
+    rng = random.Random(0)
+    limits = []
+    for index in range(2000):
+        if index % 5 == 0:
+            _record(scheduler, clock, rng.uniform(0.8, 1.5), endpoint="/pages_pd/PD_NoteEdit.aspx")
+        else:
+            _record(scheduler, clock, rng.uniform(0.04, 0.075))
+        limits.append(scheduler.limit(DOMAIN))
+
+    assert limits == sorted(limits)
+
+
+def test_sustained_slowdown_shrinks_the_limit(scheduler, clock):
+    for _ in range(200):
+        _record(scheduler, clock, 0.05)
+    limit = scheduler.limit(DOMAIN)
+
+    for _ in range(30):
+        _record(scheduler, clock, 0.4)
+
+    assert scheduler.limit(DOMAIN) <= limit // 2
+
+
+def test_successes_grow_the_limit_by_one_per_window(scheduler):
+    for _ in range(scheduler.initial_limit + 1):
+        scheduler.record(DOMAIN, 0.05, throttled=False)
+
+    assert scheduler.limit(DOMAIN) == scheduler.initial_limit + 1
+
+
+def test_throttling_halves_the_limit_once_per_round_trip(scheduler, clock):
+    scheduler.record(DOMAIN, 0.05, throttled=False)
+    limit = scheduler.limit(DOMAIN)
+
+    clock.advance(1)
+    scheduler.record(DOMAIN, 0.05, throttled=True)
+    scheduler.record(DOMAIN, 0.05, throttled=True)
+    assert scheduler.limit(DOMAIN) == limit // 2
+
+    clock.advance(1)
+    scheduler.record(DOMAIN, 0.05, throttled=True)
+    assert scheduler.limit(DOMAIN) == limit // 4
+
+
+def test_limit_stays_within_bounds(scheduler, clock):
+    for _ in range(20):
+        clock.advance(1)
+        scheduler.record(DOMAIN, 0.05, throttled=True)
+    assert scheduler.limit(DOMAIN) == scheduler.min_limit
+
+    for _ in range(5000):
+        scheduler.record(DOMAIN, 0.05, throttled=False)
+    assert scheduler.limit(DOMAIN) == scheduler.max_limit
+
+
+@pytest.mark.parametrize(
+    "error, throttling",
+    [
+        (IntegrationAPIError("oncoemr", "Too Many Requests", 429), True),
+        (IntegrationAPIError("oncoemr", "Internal Server Error", 500), True),
+        (IntegrationAPIError("oncoemr", "Service Unavailable", 503), True),
+        (asyncio.TimeoutError(), True),
+        (aiohttp.ServerDisconnectedError(), True),
+        (IntegrationAPIError("oncoemr", "Not Found", 404), False),
+        (ValueError("unexpected payload"), False),
+    ],
+)
+def test_failures_shrink_the_limit_only_when_throttling(scheduler, clock, error, throttling):
+    async def fail():
+        async with scheduler.slot(DOMAIN):
+            raise error
+
+    clock.advance(1)
+    with pytest.raises(type(error)):
+        asyncio.run(fail())
+
+    expected = scheduler.initial_limit // 2 if throttling else scheduler.initial_limit
+    assert scheduler.limit(DOMAIN) == expected
+    assert scheduler.in_flight(DOMAIN) == 0
+
+
+def test_waiters_are_served_in_arrival_order():
+    async def run():
+        scheduler = AdaptiveRequestScheduler(initial_limit=1)
+        order = []
+
+        async def request(name):
+            async with scheduler.slot(DOMAIN):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(request(name) for name in "abcd"))
+        return order
+
+    assert asyncio.run(run()) == list("abcd")
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        scheduler = AdaptiveRequestScheduler(initial_limit=1)
+        await scheduler.acquire(DOMAIN)
+        waiter = asyncio.ensure_future(scheduler.acquire(DOMAIN))
+        await asyncio.sleep(0)
+        # cancelled and then dropped by the release before its handler runs
+        waiter.cancel()
+        scheduler.release(DOMAIN)
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return scheduler.in_flight(DOMAIN), scheduler.queued(DOMAIN)
+
+    assert asyncio.run(run()) == (0, 0)
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from conftest import FakeRequester
+
+from submodule_integrations.oncoemr.oncoemr_transport import SingleFlight, request_key
+from submodule_integrations.utils.errors import IntegrationAPIError
+
+URL = "https://emr.example.com/PartialPage/GetPageInfoForPatient"
+
+
+async def _gather(*calls):
+    return await asyncio.gather(*calls, return_exceptions=True)
+
+
+def test_request_key_ignores_the_cache_buster():
+    assert request_key("get", URL, {"PID": "P_1", "_": 1}) == request_key("GET", URL, {"_": 2, "PID": "P_1"})
+    assert request_key("GET", URL, {"PID": "P_1"}) != request_key("GET", URL, {"PID": "P_2"})
+    assert request_key("GET", URL, {"PID": "P_1"}) != request_key("POST", URL, {"PID": "P_1"})
+
+
+def test_concurrent_identical_gets_share_one_request(make_integration):
+    requester = FakeRequester({"HeaderData": {}}, delay=0.01)
+    integration = make_integration(requester)
+
+    results = asyncio.run(_gather(*(
+        integration._make_request("GET", URL, params={"PID": "P_1", "_": stamp}) for stamp in range(5)
+    )))
+
+    assert results == [{"HeaderData": {}}] * 5
+    assert len(requester.calls) == 1
+
+
+def test_different_gets_and_posts_are_not_coalesced(make_integration):
+    requester = FakeRequester({}, delay=0.01)
+    integration = make_integration(requester)
+
+    asyncio.run(_gather(
+        integration._make_request("GET", URL, params={"PID": "P_1"}),
+        integration._make_request("GET", URL, params={"PID": "P_2"}),
+        integration._make_request("POST", URL, data={"PID": "P_1"}),
+        integration._make_request("POST", URL, data={"PID": "P_1"}),
+    ))
+
+    assert len(requester.calls) == 4
+
+
+def test_coalesce_false_gets_are_not_merged(make_integration):
+    requester = FakeRequester({}, delay=0.01)
+    integration = make_integration(requester)
+
+    asyncio.run(_gather(*(integration._make_request("GET", URL, coalesce=False) for _ in range(3))))
+
+    assert len(requester.calls) == 3
+
+
+def test_blank_note_forms_are_not_merged_but_note_reads_are(make_integration):
+    requester = FakeRequester("<html></html>", delay=0.01)
+    integration = make_integration(requester)
+
+    asyncio.run(_gather(
+        integration._get_note_page("T_1", "P_1"),
+        integration._get_note_page("T_1", "P_1"),
+        integration._get_note_page("T_1", "P_1", note_id="N_1"),
+        integration._get_note_page("T_1", "P_1", note_id="N_1"),
+    ))
+
+    assert sorted("NID" if "NID" in params else "FID" for _, _, params in requester.calls) == ["FID", "FID", "NID"]
+
+
+def test_failure_reaches_every_caller_and_is_not_kept(make_integration):
+    requester = FakeRequester(IntegrationAPIError("oncoemr", "Not Found", 404), {"ok": True}, delay=0.01)
+    integration = make_integration(requester)
+
+    async def run():
+        first = await _gather(*(integration._make_request("GET", URL) for _ in range(3)))
+        return first, await integration._make_request("GET", URL)
+
+    first, later = asyncio.run(run())
+
+    assert all(isinstance(result, IntegrationAPIError) for result in first)
+    assert later == {"ok": True}
+    assert len(requester.calls) == 2
+
+
+def test_cancelled_leader_does_not_cancel_the_other_callers():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "page"
+
+    async def run():
+        flight = SingleFlight()
+        leader = asyncio.ensure_future(flight.do("key", fetch))
+        follower = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await _gather(leader, follower)
+        return results, flight.in_flight()
+
+    (leader, follower), in_flight = asyncio.run(run())
+
+    assert isinstance(leader, asyncio.CancelledError)
+    assert follower == "page"
+    assert in_flight == 0
+    assert len(calls) == 1
+
+
+def test_cancelled_call_reaches_the_waiters_and_is_not_kept():
+    async def cancelled():
+        # the shared call itself is cancelled, e.g. by a shutdown
+        await asyncio.sleep(0.01)
+        raise asyncio.CancelledError()
+
+    async def ok():
+        return "page"
+
+    async def run():
+        flight = SingleFlight()
+        results = await _gather(*(flight.do("key", cancelled) for _ in range(2)))
+        return results, flight.in_flight(), await flight.do("key", ok)
+
+    results, in_flight, later = asyncio.run(run())
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert in_flight == 0
+    assert later == "page"
+
+
+def test_failed_call_is_retrieved_when_every_caller_was_cancelled():
+    async def run():
+        flight = SingleFlight()
+        loop = asyncio.get_running_loop()
+        unretrieved = []
+        loop.set_exception_handler(lambda _, context: unretrieved.append(context))
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("bad page")
+
+        caller = asyncio.ensure_future(flight.do("key", fail))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.02)
+        return unretrieved
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,46 @@
+import random
+
+import fixtures
+import pytest
+from visit_list_parity import FRAGMENTS, HEADER, reference_parse
+
+from submodule_integrations.oncoemr.oncoemr_integration import OncoEmrIntegration
+
+_quirks = [
+    HEADER + '<tr pid="P1"><td><br>08:00<br/></td><td><a id="ancp1">Doe <span>MRN-1</span></a></td>'
+    '<td><a class="room-name">R1</a><pre>  ready  </pre></td><td><script>x</script>Arrived</td></tr></table>',
+    HEADER + '<tr pid="P2"><td><img src=x>9:00</img></td><td><input>Doe</input></td><td><textarea> </textarea>'
+    '</td><td>&amp;&nbsp;&#65;&foo;</td><td><template>t</template><ruby>a<rt>b</rt></ruby></td></tr>',
+]
+
+
+def _rows(patients):
+    # key order is part of the contract, it is the order of the response fields
+    return [list(row.items()) for row in patients]
+
+
+def _random_documents(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        markup = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(5, 80)))
+        yield HEADER + markup if rng.random() < 0.7 else markup
+
+
+@pytest.mark.parametrize("scale", [fixtures.Scale(), fixtures.Scale(visit_rows=1)])
+def test_fixture_visit_list_matches_the_tree_parse(scale):
+    visit_html = fixtures.visit_list(scale)["sViewHtml"]
+
+    rows = OncoEmrIntegration._parse_patient_table(visit_html)
+
+    assert len(rows) == scale.visit_rows
+    assert _rows(rows) == _rows(reference_parse(visit_html))
+
+
+@pytest.mark.parametrize("visit_html", _quirks)
+def test_quirky_rows_match_the_tree_parse(visit_html):
+    assert _rows(OncoEmrIntegration._parse_patient_table(visit_html)) == _rows(reference_parse(visit_html))
+
+
+def test_random_markup_matches_the_tree_parse():
+    for visit_html in _random_documents(300):
+        assert _rows(OncoEmrIntegration._parse_patient_table(visit_html)) == _rows(reference_parse(visit_html)), visit_html